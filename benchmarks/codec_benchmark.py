@@ -0,0 +1,120 @@
+"""
+Benchmark message storage formats for conversation history.
+
+Compares the legacy JSON strings against the msgpack codec, with and
+without zstd compression, on a synthetic session. Reports bytes stored
+per session and encode/decode cost per message.
+
+Usage:
+    python -m benchmarks.codec_benchmark [--turns 100] [--reply-chars 1500]
+"""
+
+import argparse
+import json
+import os
+import random
+import string
+import time
+from typing import Any, Callable, Dict, List
+
+# Settings require an API key at import time; the benchmark never calls the LLM
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from src.memory.codec import MessageCodec
+
+
+def build_session(turns: int, reply_chars: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Build a synthetic conversation of short prompts and long replies."""
+    rng = random.Random(seed)
+    words = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9)))
+        for _ in range(400)
+    ]
+
+    def text(chars: int) -> str:
+        out: List[str] = []
+        length = 0
+        while length < chars:
+            word = rng.choice(words)
+            out.append(word)
+            length += len(word) + 1
+        return " ".join(out)
+
+    messages = []
+    for _ in range(turns):
+        prompt = text(rng.randint(40, 300))
+        reply = text(rng.randint(reply_chars // 2, reply_chars * 2))
+        messages.append({"role": "user", "content": prompt, "tokens": len(prompt) // 4})
+        messages.append({"role": "assistant", "content": reply, "tokens": len(reply) // 4})
+    return messages
+
+
+def measure(
+    name: str,
+    encode: Callable[[Dict[str, Any]], bytes],
+    decode: Callable[[bytes], Dict[str, Any]],
+    messages: List[Dict[str, Any]],
+    rounds: int
+) -> Dict[str, Any]:
+    """Measure stored size and per-message encode/decode time for one format."""
+    encoded = [encode(msg) for msg in messages]
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for msg in messages:
+            encode(msg)
+    encode_us = (time.perf_counter() - start) / (rounds * len(messages)) * 1e6
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for raw in encoded:
+            decode(raw)
+    decode_us = (time.perf_counter() - start) / (rounds * len(messages)) * 1e6
+
+    return {
+        "format": name,
+        "bytes_per_session": sum(len(raw) for raw in encoded),
+        "encode_us_per_message": round(encode_us, 2),
+        "decode_us_per_message": round(decode_us, 2),
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print a table plus JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--reply-chars", type=int, default=1500)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    messages = build_session(args.turns, args.reply_chars)
+
+    legacy = {
+        "name": "json (legacy)",
+        "encode": lambda msg: json.dumps(msg).encode("utf-8"),
+        "decode": json.loads,
+    }
+    msgpack_codec = MessageCodec("msgpack", compression_threshold=0)
+    zstd_codec = MessageCodec("msgpack", compression_threshold=1024)
+
+    results = [
+        measure(legacy["name"], legacy["encode"], legacy["decode"], messages, args.rounds),
+        measure("msgpack", msgpack_codec.encode, msgpack_codec.decode, messages, args.rounds),
+        measure("msgpack+zstd", zstd_codec.encode, zstd_codec.decode, messages, args.rounds),
+    ]
+
+    baseline = results[0]["bytes_per_session"]
+    print(f"{len(messages)} messages per session\n")
+    print(f"{'format':<16}{'bytes/session':>15}{'vs json':>10}{'enc us/msg':>12}{'dec us/msg':>12}")
+    for row in results:
+        ratio = row["bytes_per_session"] / baseline
+        print(
+            f"{row['format']:<16}{row['bytes_per_session']:>15}{ratio:>10.2f}"
+            f"{row['encode_us_per_message']:>12}{row['decode_us_per_message']:>12}"
+        )
+    print()
+    print(json.dumps({"messages": len(messages), "results": results}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+Load-test /chat end to end against the fake LLM provider.
+
+Starts the API in a uvicorn subprocess with ``LLM_BACKENDS=["fake"]`` and
+the chosen memory backend (or targets a running server with --url), then
+drives many concurrent sessions through several turns each. Reports time
+to first token, streaming tokens/s, p50/p95/p99 latency, errors and, with
+Redis memory, Redis commands per request (from INFO commandstats). Results
+are printed and written as JSON for comparing builds.
+
+Usage:
+    python -m benchmarks.load_test [--sessions 100] [--turns 3] [--concurrency 50]
+        [--memory inprocess|redis] [--redis-url redis://localhost:6379]
+        [--first-token-ms 300] [--token-ms 10] [--reply-tokens 200]
+        [--error-rate 0] [--output load_test.json]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    """Summarize samples by mean and nearest-rank p50/p95/p99."""
+    if not values:
+        return {"mean": None, "p50": None, "p95": None, "p99": None}
+    ordered = sorted(values)
+
+    def rank(pct: float) -> float:
+        index = min(len(ordered), max(1, math.ceil(pct / 100 * len(ordered)))) - 1
+        return round(ordered[index], 3)
+
+    return {
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "p50": rank(50),
+        "p95": rank(95),
+        "p99": rank(99),
+    }
+
+
+def free_port() -> int:
+    """Return a TCP port that is free right now."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args: argparse.Namespace, port: int) -> subprocess.Popen:
+    """Start the API with the fake LLM provider in a subprocess."""
+    env = dict(os.environ)
+    env.setdefault("GEMINI_API_KEY", "benchmark")
+    env.update({
+        "LLM_BACKENDS": '["fake"]',
+        "MEMORY_BACKEND": args.memory,
+        "REDIS_URL": args.redis_url,
+        "FAKE_LLM_REPLY_TOKENS": str(args.reply_tokens),
+        "FAKE_LLM_CHUNK_TOKENS": str(args.chunk_tokens),
+        "FAKE_LLM_FIRST_TOKEN_DELAY_MS": str(args.first_token_ms),
+        "FAKE_LLM_TOKEN_DELAY_MS": str(args.token_ms),
+        "FAKE_LLM_ERROR_RATE": str(args.error_rate),
+        "LOG_LEVEL": env.get("LOG_LEVEL", "WARNING"),
+    })
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        env=env
+    )
+
+
+async def wait_healthy(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    """Poll /health until the server answers."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError("Server did not become healthy")
+        await asyncio.sleep(0.2)
+
+
+async def redis_commands(redis_url: str) -> Optional[int]:
+    """Return the commands Redis has processed, or None if unreachable."""
+    try:
+        import redis.asyncio as redis
+        client = redis.from_url(redis_url)
+        try:
+            stats = await client.info("commandstats")
+        finally:
+            await client.aclose()
+    except Exception:
+        return None
+    return sum(entry["calls"] for entry in stats.values())
+
+
+async def chat_turn(client: httpx.AsyncClient, session_id: str, message: str) -> Dict[str, Any]:
+    """Send one /chat request and time its stream."""
+    start = time.perf_counter()
+    ttft = None
+    text: List[str] = []
+    error = None
+    try:
+        async with client.stream("POST", "/chat", json={"session_id": session_id, "message": message}) as response:
+            if response.status_code != 200:
+                await response.aread()
+                error = f"HTTP {response.status_code}"
+            else:
+                data: List[str] = []
+                async for line in response.aiter_lines():
+                    if line.startswith("data:"):
+                        data.append(line[6:] if line.startswith("data: ") else line[5:])
+                        continue
+                    if line or not data:
+                        continue
+                    event = "\n".join(data)
+                    data = []
+                    if event == "[DONE]":
+                        break
+                    if event.startswith('{"error"'):
+                        error = json.loads(event)["error"]
+                        break
+                    if ttft is None:
+                        ttft = time.perf_counter() - start
+                    text.append(event)
+    except httpx.HTTPError as e:
+        error = f"{type(e).__name__}: {e}"
+
+    latency = time.perf_counter() - start
+    tokens = len("".join(text).split())
+    streaming = latency - ttft if ttft is not None else 0.0
+    return {
+        "ttft": ttft,
+        "latency": latency,
+        "tokens": tokens,
+        "tokens_per_second": tokens / streaming if streaming > 0 else None,
+        "error": error,
+    }
+
+
+async def run_session(
+    client: httpx.AsyncClient,
+    index: int,
+    turns: int,
+    run_id: str,
+    slots: asyncio.Semaphore,
+    results: List[Dict[str, Any]]
+) -> None:
+    """Run one session's turns in order."""
+    session_id = f"load-{run_id}-{index}"
+    async with slots:
+        for turn in range(turns):
+            message = f"Session {index}, turn {turn}: how do Redis streams handle consumer groups?"
+            results.append(await chat_turn(client, session_id, message))
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Drive the load and summarize it."""
+    server = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        server = start_server(args, port)
+        url = f"http://127.0.0.1:{port}"
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+            await wait_healthy(client)
+            redis_before = await redis_commands(args.redis_url) if args.memory == "redis" else None
+
+            results: List[Dict[str, Any]] = []
+            slots = asyncio.Semaphore(args.concurrency)
+            run_id = str(int(time.time()))
+            start = time.perf_counter()
+            await asyncio.gather(*[
+                run_session(client, index, args.turns, run_id, slots, results)
+                for index in range(args.sessions)
+            ])
+            wall = time.perf_counter() - start
+
+            redis_after = await redis_commands(args.redis_url) if redis_before is not None else None
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    ok = [r for r in results if r["error"] is None]
+    errors: Dict[str, int] = {}
+    for r in results:
+        if r["error"] is not None:
+            errors[r["error"]] = errors.get(r["error"], 0) + 1
+    redis_ops = None
+    if redis_after is not None and results:
+        # Less the INFO call that took the first reading
+        redis_ops = round((redis_after - redis_before - 1) / len(results), 2)
+
+    return {
+        "config": {
+            "url": args.url,
+            "memory": args.memory,
+            "sessions": args.sessions,
+            "turns": args.turns,
+            "concurrency": args.concurrency,
+            "reply_tokens": args.reply_tokens,
+            "chunk_tokens": args.chunk_tokens,
+            "first_token_ms": args.first_token_ms,
+            "token_ms": args.token_ms,
+            "error_rate": args.error_rate,
+        },
+        "requests": len(results),
+        "errors": sum(errors.values()),
+        "error_kinds": errors,
+        "wall_seconds": round(wall, 3),
+        "requests_per_second": round(len(results) / wall, 2) if wall else None,
+        "tokens_per_second": round(sum(r["tokens"] for r in ok) / wall, 1) if wall else None,
+        "ttft_ms": percentiles([r["ttft"] * 1000 for r in ok if r["ttft"] is not None]),
+        "latency_ms": percentiles([r["latency"] * 1000 for r in ok]),
+        "stream_tokens_per_second": percentiles(
+            [r["tokens_per_second"] for r in ok if r["tokens_per_second"] is not None]
+        ),
+        "redis_ops_per_request": redis_ops,
+    }
+
+
+def main() -> None:
+    """Run the load test and print a summary plus JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="Target a running server instead of starting one")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=50, help="Sessions in flight at once")
+    parser.add_argument("--memory", choices=["inprocess", "redis"], default="inprocess")
+    parser.add_argument("--redis-url", default="redis://localhost:6379")
+    parser.add_argument("--reply-tokens", type=int, default=200)
+    parser.add_argument("--chunk-tokens", type=int, default=4)
+    parser.add_argument("--first-token-ms", type=float, default=300.0)
+    parser.add_argument("--token-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(args))
+
+    print(
+        f"{summary['requests']} requests ({summary['errors']} errors) in {summary['wall_seconds']}s: "
+        f"{summary['requests_per_second']} req/s, {summary['tokens_per_second']} tokens/s\n"
+    )
+    print(f"{'metric':<28}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name in ("ttft_ms", "latency_ms", "stream_tokens_per_second"):
+        row = summary[name]
+        print(f"{name:<28}" + "".join(f"{str(row[key]):>10}" for key in ("mean", "p50", "p95", "p99")))
+    if args.memory == "redis":
+        ops = summary["redis_ops_per_request"]
+        print(f"\nRedis commands per request: {'unavailable (INFO commandstats failed)' if ops is None else ops}")
+    print()
+
+    output = json.dumps(summary, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
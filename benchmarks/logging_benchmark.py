@@ -0,0 +1,212 @@
+"""
+Benchmark logging overhead per chat request.
+
+Replays the log calls of one /chat turn (request, history loaded, history
+retrieved with its token count, messages added, response completed)
+against a synthetic history, at WARNING, INFO and DEBUG level, for:
+
+- eager: f-string messages and the token count always computed, written
+  synchronously (the behaviour before lazy logging)
+- lazy-sync: %-style arguments and the token count only when DEBUG is
+  on, written synchronously
+- lazy-queue: the same calls through the queue handler, formatted and
+  written by the listener thread
+
+Reports the time each request spends in logging on the calling thread
+(what the event loop would wait for) and the time until every record is
+written. Writes go to a local file, which rarely blocks; --flush-latency-us
+simulates stdout piped to a slow log collector.
+
+Usage:
+    python -m benchmarks.logging_benchmark [--requests 2000] [--turns 20]
+        [--format text|json] [--sink PATH] [--flush-latency-us 0]
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import random
+import string
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, TextIO
+
+# Settings require an API key at import time; the benchmark never calls the LLM
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from src.core.logging import (
+    ContextualFormatter, JSONFormatter, RequestIdFilter, _QueueHandler, _QueueListener, set_request_id
+)
+from src.memory.inprocess_memory import InProcessConversationMemory
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - [%(request_id)s] - %(name)s - %(message)s"
+
+
+def build_history(turns: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Build a conversation of short prompts and long replies."""
+    rng = random.Random(seed)
+
+    def text(words: int) -> str:
+        return " ".join(
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9))) for _ in range(words)
+        )
+
+    history = []
+    for _ in range(turns):
+        history.append({"role": "user", "content": text(20)})
+        history.append({"role": "assistant", "content": text(250)})
+    return history
+
+
+class SlowSink:
+    """File wrapper whose flushes block for a fixed time, like a full pipe."""
+
+    def __init__(self, stream: TextIO, latency: float):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, text: str) -> int:
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+        if self.latency:
+            time.sleep(self.latency)
+
+    def close(self) -> None:
+        self.stream.close()
+
+
+def eager_request(logger: logging.Logger, memory: InProcessConversationMemory, history: List[Dict[str, Any]]) -> None:
+    """Log one turn the way call sites did before lazy logging."""
+    session_id = "bench-session"
+    logger.info(f"Chat request - session: {session_id}, message_length: {42}")
+    logger.info(f"Loaded {len(history)} messages from history for session {session_id}")
+    logger.debug(
+        f"Retrieved {len(history)} messages for session {session_id} "
+        f"(read: {len(history)}, tokens: {memory._get_messages_token_count(history)})"
+    )
+    logger.debug(f"Added {2} message(s) to session {session_id}")
+    logger.info(f"Completed streaming response for session {session_id} ({1500} chars)")
+
+
+def lazy_request(logger: logging.Logger, memory: InProcessConversationMemory, history: List[Dict[str, Any]]) -> None:
+    """Log one turn the way call sites do now."""
+    session_id = "bench-session"
+    logger.info("Chat request - session: %s, message_length: %s", session_id, 42)
+    logger.info("Loaded %s messages from history for session %s", len(history), session_id)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Retrieved %s messages for session %s (read: %s, tokens: %s)",
+            len(history), session_id, len(history), memory._get_messages_token_count(history)
+        )
+    logger.debug("Added %s message(s) to session %s", 2, session_id)
+    logger.info("Completed streaming response for session %s (%s chars)", session_id, 1500)
+
+
+def measure(
+    name: str,
+    level: str,
+    log_request: Callable[..., None],
+    use_queue: bool,
+    args: argparse.Namespace,
+    memory: InProcessConversationMemory,
+    history: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Run one variant and time it."""
+    logger = logging.getLogger(f"chatbot.benchmark.{name}.{level}")
+    logger.setLevel(getattr(logging, level))
+    logger.propagate = False
+    logger.handlers.clear()
+
+    sink = SlowSink(open(args.sink, "a"), args.flush_latency_us / 1e6)
+    output = logging.StreamHandler(sink)
+    output.setFormatter(JSONFormatter() if args.format == "json" else ContextualFormatter(TEXT_FORMAT))
+
+    listener = None
+    if use_queue:
+        handler = _QueueHandler(queue.Queue(args.queue_size))
+        handler.addFilter(RequestIdFilter())
+        listener = _QueueListener(handler.queue, output)
+        listener.start()
+    else:
+        handler = output
+    logger.addHandler(handler)
+
+    try:
+        start = time.perf_counter()
+        for index in range(args.requests):
+            set_request_id(f"req-{index}")
+            log_request(logger, memory, history)
+        calling = time.perf_counter() - start
+        if listener is not None:
+            listener.stop()
+        output.flush()
+        total = time.perf_counter() - start
+    finally:
+        logger.handlers.clear()
+        sink.close()
+
+    return {
+        "variant": name,
+        "level": level,
+        "calling_us_per_request": round(calling / args.requests * 1e6, 2),
+        "total_us_per_request": round(total / args.requests * 1e6, 2),
+        "dropped": handler.dropped if use_queue else 0,
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print a table plus JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=20, help="Turns of history per request")
+    parser.add_argument("--format", choices=["text", "json"], default="text")
+    parser.add_argument("--queue-size", type=int, default=10000)
+    parser.add_argument("--sink", help="File records are written to (a temporary file by default)")
+    parser.add_argument("--flush-latency-us", type=float, default=0.0, help="Simulated blocking per write")
+    args = parser.parse_args()
+
+    temp_dir = None
+    if args.sink is None:
+        temp_dir = tempfile.TemporaryDirectory()
+        args.sink = os.path.join(temp_dir.name, "benchmark.log")
+
+    memory = InProcessConversationMemory()
+    history = build_history(args.turns)
+    variants = [
+        ("eager", eager_request, False),
+        ("lazy-sync", lazy_request, False),
+        ("lazy-queue", lazy_request, True),
+    ]
+    results = [
+        measure(name, level, log_request, use_queue, args, memory, history)
+        for level in ("WARNING", "INFO", "DEBUG")
+        for name, log_request, use_queue in variants
+    ]
+    if temp_dir is not None:
+        temp_dir.cleanup()
+
+    print(
+        f"{args.requests} requests, {len(history)} history messages, {args.format} format, "
+        f"{args.flush_latency_us:g} us flush latency\n"
+    )
+    print(f"{'variant':<14}{'level':<10}{'calling us/req':>16}{'total us/req':>15}{'dropped':>9}")
+    for row in results:
+        print(
+            f"{row['variant']:<14}{row['level']:<10}{row['calling_us_per_request']:>16}"
+            f"{row['total_us_per_request']:>15}{row['dropped']:>9}"
+        )
+    print()
+    print(json.dumps({
+        "requests": args.requests,
+        "format": args.format,
+        "flush_latency_us": args.flush_latency_us,
+        "results": results,
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark SSE framing of a streamed reply.
+
+Streams a synthetic reply of small chunks (some containing newlines)
+through the legacy one-frame-per-chunk encoding and through the
+coalescing stage with the spec-correct encoder. Reports frames and bytes
+per response, time to first frame, and whether a spec-compliant parser
+recovers the original text.
+
+Usage:
+    python -m benchmarks.sse_benchmark [--chunks 400] [--interval-ms 2] [--window-ms 20]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import string
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List
+
+# Settings require an API key at import time; the benchmark never calls the LLM
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from src.api.chat import _stream_until_disconnect, format_sse_event
+
+
+def build_chunks(count: int, seed: int = 0) -> List[str]:
+    """Build small LLM-like chunks; about one in twenty contains a newline."""
+    rng = random.Random(seed)
+    chunks = []
+    for _ in range(count):
+        word = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(1, 6)))
+        chunk = " " + word
+        if rng.random() < 0.05:
+            chunk += "\n" if rng.random() < 0.5 else "\n\n- "
+        chunks.append(chunk)
+    return chunks
+
+
+async def fake_stream(chunks: List[str], interval: float) -> AsyncIterator[str]:
+    """Yield chunks at a fixed interval, like a streaming LLM."""
+    for chunk in chunks:
+        await asyncio.sleep(interval)
+        yield chunk
+
+
+def legacy_frame(chunk: str) -> str:
+    """Frame encoding used before coalescing (one frame per chunk)."""
+    return f"data: {chunk}\n\n"
+
+
+def parse_sse(payload: str) -> List[str]:
+    """Parse an SSE payload as a browser would, returning event data."""
+    events = []
+    data: List[str] = []
+    for line in payload.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        if line == "":
+            if data:
+                events.append("\n".join(data))
+            data = []
+        elif line.startswith("data:"):
+            value = line[5:]
+            data.append(value[1:] if value.startswith(" ") else value)
+    return events
+
+
+async def measure(
+    name: str,
+    stream: AsyncIterator[str],
+    frame: Callable[[str], str],
+    expected: str
+) -> Dict[str, Any]:
+    """Consume a chunk stream, framing each item, and collect statistics."""
+    start = time.perf_counter()
+    first_frame_ms = None
+    frames: List[str] = []
+    async for chunk in stream:
+        if first_frame_ms is None:
+            first_frame_ms = (time.perf_counter() - start) * 1000
+        frames.append(frame(chunk))
+    payload = "".join(frames)
+    return {
+        "encoding": name,
+        "frames": len(frames),
+        "bytes": len(payload.encode("utf-8")),
+        "first_frame_ms": round(first_frame_ms or 0.0, 2),
+        "total_ms": round((time.perf_counter() - start) * 1000, 1),
+        "text_intact": "".join(parse_sse(payload)) == expected,
+    }
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Run the legacy and coalesced variants on the same reply."""
+    chunks = build_chunks(args.chunks)
+    expected = "".join(chunks)
+    interval = args.interval_ms / 1000
+    return [
+        await measure("legacy", fake_stream(chunks, interval), legacy_frame, expected),
+        await measure(
+            f"coalesced ({args.window_ms:g} ms)",
+            _stream_until_disconnect(
+                fake_stream(chunks, interval),
+                None,
+                coalesce_window=args.window_ms / 1000,
+                coalesce_max_bytes=args.max_bytes
+            ),
+            lambda chunk: format_sse_event("chunk", chunk),
+            expected
+        ),
+    ]
+
+
+def main() -> None:
+    """Run the benchmark and print a table plus JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--chunks", type=int, default=400)
+    parser.add_argument("--interval-ms", type=float, default=2.0)
+    parser.add_argument("--window-ms", type=float, default=20.0)
+    parser.add_argument("--max-bytes", type=int, default=4096)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    print(f"{args.chunks} chunks, one every {args.interval_ms:g} ms\n")
+    print(f"{'encoding':<20}{'frames':>8}{'bytes':>9}{'first ms':>10}{'total ms':>10}{'intact':>8}")
+    for row in results:
+        print(
+            f"{row['encoding']:<20}{row['frames']:>8}{row['bytes']:>9}"
+            f"{row['first_frame_ms']:>10}{row['total_ms']:>10}{str(row['text_intact']):>8}"
+        )
+    print()
+    print(json.dumps({"chunks": args.chunks, "results": results}))
+
+
+if __name__ == "__main__":
+    main()
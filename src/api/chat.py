@@ -1,78 +1,794 @@
 """Chat API endpoint with Server-Sent Events streaming."""
 
+import time
 import uuid
-from typing import AsyncIterator
-from fastapi import APIRouter, HTTPException, status
+import asyncio
+from typing import Any, AsyncIterator, Coroutine, Dict, List, Optional, Set, Tuple
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request, Response, status
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.types import Receive
 
-from src.schemas.chat import ChatRequest
-from src.llm.gemini_client import GeminiClient
-from src.memory.redis_memory import memory
+from src.api.rate_limit import enforce_batch_rate_limit, enforce_rate_limit
+from src.api.sse import encode_sse, json_dumps
+from src.core.replay import ReplayBuffer
+from src.schemas.chat import ChatBatchRequest, ChatBatchResult, ChatRequest, ChatResponse
+from src.llm.factory import create_llm_client
+from src.llm.response_cache import CachedLLMClient
+from src.llm.scheduler import FairScheduler, ScheduledLLMClient, SchedulerOverloaded, SchedulerQueueFull, set_tenant
+from src.llm.single_flight import SingleFlightLLMClient
+from src.memory.factory import memory
+from src.memory.compaction import ConversationCompactor
+from src.memory.session_lock import SessionBusy, SessionLease, SessionLeaseLost, SessionLockManager
+from src.memory.stream_buffer import StreamWriter, TERMINAL_EVENTS, parse_event_id, stream_buffer
+from src.core.config import settings
 from src.core.logging import get_logger, set_request_id, clear_request_id
+from src.core.metrics import metrics
 
 logger = get_logger("api.chat")
 
 router = APIRouter()
 
-# Initialize LLM client (singleton-like for this module)
-llm_client = GeminiClient()
+# Initialize LLM client (singleton-like for this module); several
+# configured backends are routed between by latency and health
+llm_client = create_llm_client()
 
+# Caps concurrent upstream calls, queueing the excess fairly per tenant
+llm_scheduler = FairScheduler(
+    settings.llm_max_concurrency,
+    settings.llm_max_queue,
+    settings.llm_queue_timeout_seconds
+)
+llm_client = ScheduledLLMClient(llm_client, llm_scheduler)
 
-async def generate_sse_stream(
-    session_id: str,
-    message: str
+if settings.llm_coalesce_enabled:
+    llm_client = SingleFlightLLMClient(llm_client)
+
+# Serves repeated requests without an LLM call (None = disabled)
+response_cache = CachedLLMClient(llm_client) if settings.response_cache_enabled else None
+if response_cache is not None:
+    llm_client = response_cache
+
+# Folds turns that no longer fit the history budget into a rolling summary
+compactor = ConversationCompactor(memory, llm_client)
+
+# Serializes turns of the same session (see session_lock_policy)
+session_locks = SessionLockManager()
+
+# Turns in flight per session with their message, for the 'coalesce' policy
+_inflight_turns: Dict[str, Tuple[str, ReplayBuffer]] = {}
+
+# Appended to replies that were cut off, so the next turn knows
+TRUNCATED_MARKER = "\n\n[response truncated]"
+
+# Sentinels passed from the upstream reader to the SSE generator
+_END = object()
+_CANCELLED = object()
+
+# Writes detached from cancelled requests (kept referenced until done)
+_pending_writes: Set[asyncio.Task] = set()
+
+# Bounds turns in flight across all batch requests
+_batch_semaphore = asyncio.Semaphore(settings.batch_max_concurrency)
+
+
+class ClientDisconnected(Exception):
+    """Raised when the SSE client goes away before the reply is complete."""
+
+
+def _set_tenant(session_id: str, api_key: Optional[str]) -> None:
+    """Attribute the LLM calls of a request for fair scheduling (see ``llm_fair_share_by``)."""
+    if settings.llm_fair_share_by == "api_key":
+        set_tenant(api_key or "anonymous")
+    else:
+        set_tenant(session_id)
+
+
+def _overloaded_error(error: SchedulerOverloaded) -> HTTPException:
+    """Map a rejected LLM call to 429 (queue full) or 503 (waited too long) with Retry-After."""
+    return HTTPException(
+        status_code=(
+            status.HTTP_429_TOO_MANY_REQUESTS
+            if isinstance(error, SchedulerQueueFull)
+            else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
+def _check_llm_capacity() -> None:
+    """
+    Refuse a request up front if the LLM call queue is full.
+    
+    Checked before the turn touches history; a call that later waits too
+    long for a slot still fails with ``SchedulerTimeout``.
+    
+    Raises:
+        HTTPException: 429 with Retry-After if the queue is full
+    """
+    if llm_scheduler.is_full():
+        raise _overloaded_error(
+            SchedulerQueueFull("LLM request queue is full", llm_scheduler.retry_after())
+        )
+
+
+async def _wait_for_disconnect(receive: Receive) -> None:
+    """Return once the client has disconnected."""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def _stream_until_disconnect(
+    stream: AsyncIterator[str],
+    receive: Optional[Receive],
+    coalesce_window: Optional[float] = None,
+    coalesce_max_bytes: Optional[int] = None
 ) -> AsyncIterator[str]:
     """
-    Generate Server-Sent Events stream for chat response.
+    Relay chunks from an LLM stream, cancelling it when the client disconnects.
+    
+    The LLM stream is read by its own task, so a disconnect cancels the
+    pending upstream read (and the provider request) immediately instead of
+    after the next chunk arrives.
+    
+    Small chunks are coalesced: the first chunk is relayed at once (so
+    time-to-first-token is unchanged), later chunks are held for up to
+    ``coalesce_window`` seconds or until ``coalesce_max_bytes`` accumulate,
+    then relayed as one.
+    
+    Args:
+        stream: LLM token stream
+        receive: ASGI receive channel to watch (None = no disconnect detection)
+        coalesce_window: Seconds to batch chunks for (uses config if None, 0 = off)
+        coalesce_max_bytes: Flush a batch once it reaches this size (uses config if None)
+        
+    Yields:
+        str: Token chunks from the LLM, possibly joined
+        
+    Raises:
+        ClientDisconnected: If the client went away before the stream ended
+    """
+    if coalesce_window is None:
+        coalesce_window = settings.sse_coalesce_window_ms / 1000
+    if coalesce_max_bytes is None:
+        coalesce_max_bytes = settings.sse_coalesce_max_bytes
+    loop = asyncio.get_running_loop()
+    
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def read_upstream() -> None:
+        try:
+            async for chunk in stream:
+                queue.put_nowait(chunk)
+        except Exception as e:
+            queue.put_nowait(e)
+        else:
+            queue.put_nowait(_END)
+    
+    reader = asyncio.create_task(read_upstream())
+    # A done callback also fires if the reader is cancelled before it starts
+    reader.add_done_callback(lambda task: queue.put_nowait(_CANCELLED) if task.cancelled() else None)
+    watcher = None
+    if receive is not None:
+        watcher = asyncio.create_task(_wait_for_disconnect(receive))
+        watcher.add_done_callback(lambda _: reader.cancel())
+    
+    try:
+        first = True
+        item = await queue.get()
+        while True:
+            if item is _END:
+                return
+            if item is _CANCELLED:
+                raise ClientDisconnected()
+            if isinstance(item, Exception):
+                raise item
+            
+            if first or coalesce_window <= 0:
+                first = False
+                yield item
+                item = await queue.get()
+                continue
+            
+            # Batch until the window closes, the size cap is hit or the
+            # stream ends; a control item ends the batch and is handled next
+            batch = [item]
+            size = len(item.encode("utf-8"))
+            deadline = loop.time() + coalesce_window
+            item = None
+            while size < coalesce_max_bytes:
+                if queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = queue.get_nowait()
+                if not isinstance(item, str):
+                    break
+                batch.append(item)
+                size += len(item.encode("utf-8"))
+                item = None
+            
+            yield "".join(batch)
+            if item is None:
+                item = await queue.get()
+    finally:
+        reader.cancel()
+        if watcher is not None:
+            watcher.cancel()
+
+
+def _run_detached(coro: Coroutine[Any, Any, Any]) -> None:
+    """Run a write in its own task so it survives cancellation of the request."""
+    task = asyncio.create_task(coro)
+    _pending_writes.add(task)
+    task.add_done_callback(_pending_writes.discard)
+
+
+async def _save_truncated_reply(
+    session_id: str,
+    partial_response: str,
+    fence: Optional[int] = None
+) -> None:
+    """Store an interrupted reply, marked as truncated, if the session lease is still held."""
+    try:
+        content = partial_response + TRUNCATED_MARKER if partial_response else TRUNCATED_MARKER.strip()
+        await memory.add_message(session_id, "assistant", content, fence)
+        logger.info(
+            "Saved truncated response for session %s (%s chars)", session_id, len(partial_response)
+        )
+    except Exception as e:
+        logger.error("Failed to save truncated response for session %s: %s", session_id, e)
+
+
+async def _start_turn(
+    session_id: str,
+    message: str,
+    pruning_strategy: Optional[str] = None,
+    fence: Optional[int] = None
+) -> List[Dict[str, str]]:
+    """
+    Load history, store the user message and build the LLM prompt.
+    
+    History is loaded and the user message appended in a single round trip.
     
     Args:
         session_id: Unique session identifier
         message: User message
+        pruning_strategy: History pruning strategy (uses config default if None)
+        fence: Fencing token of the session lease (None = not distributed)
+        
+    Returns:
+        Messages to send to the LLM (history + new user message)
+        
+    Raises:
+        SessionLeaseLost: If another holder took the session over
+    """
+    history = await memory.get_history_and_append(
+        session_id, "user", message, strategy=pruning_strategy, fence=fence
+    )
+    logger.info("Loaded %s messages from history for session %s", len(history), session_id)
+    return history + [{"role": "user", "content": message}]
+
+
+async def _finish_turn(
+    session_id: str,
+    lease: SessionLease,
+    partial_response: Optional[str]
+) -> None:
+    """Save an interrupted reply (if any), then release the session."""
+    try:
+        if partial_response is not None:
+            await _save_truncated_reply(session_id, partial_response, lease.fence)
+    finally:
+        await lease.release()
+
+
+async def _acquire_session(session_id: str) -> SessionLease:
+    """Acquire a session for a turn, waiting as long as ``session_lock_policy`` allows."""
+    timeout = 0 if settings.session_lock_policy == "reject" else settings.session_lock_wait_seconds
+    return await session_locks.acquire(session_id, timeout)
+
+
+async def _coalesce_turn(
+    session_id: str,
+    message: str,
+    run: AsyncIterator[Tuple[str, Optional[str]]]
+) -> AsyncIterator[Tuple[str, Optional[str]]]:
+    """
+    Run a turn, or join an identical turn already in flight.
+    
+    Only applies with the 'coalesce' policy: a request repeating the message
+    of a turn in flight for the same session in this process (a double
+    submit, a client retry) receives that turn's events instead of queueing
+    a duplicate, and writes nothing to memory. Otherwise ``run`` is relayed.
+    
+    Args:
+        session_id: Unique session identifier
+        message: User message
+        run: Events of the turn, used if this request runs it
         
     Yields:
-        str: SSE-formatted data chunks
+        Tuple of (event kind, data)
     """
+    if settings.session_lock_policy != "coalesce":
+        async for event in run:
+            yield event
+        return
+    
+    inflight = _inflight_turns.get(session_id)
+    if inflight is not None and inflight[0] == message:
+        await run.aclose()
+        logger.info("Joining in-flight turn for session %s", session_id)
+        async for event in inflight[1].subscribe():
+            yield event
+        return
+    
+    # Only one turn per session is joinable; a different message queues
+    events = None
+    if inflight is None:
+        events = ReplayBuffer()
+        _inflight_turns[session_id] = (message, events)
+    
+    terminated = False
     try:
-        # 1. Load conversation history from Redis
-        history = await memory.get_history(session_id)
-        logger.info(f"Loaded {len(history)} messages from history for session {session_id}")
+        async for kind, data in run:
+            if events is not None:
+                events.publish((kind, data))
+            terminated = kind in TERMINAL_EVENTS
+            yield kind, data
+    except Exception as e:
+        if events is not None:
+            events.publish(("error", str(e)))
+        terminated = True
+        raise
+    finally:
+        if events is not None:
+            if not terminated:
+                events.publish(("error", "Stream interrupted"))
+            events.close()
+            del _inflight_turns[session_id]
+
+
+async def _complete_turn_events(
+    session_id: str,
+    message: str,
+    pruning_strategy: Optional[str]
+) -> AsyncIterator[Tuple[str, Optional[str]]]:
+    """Run a non-streaming turn under the session lock, yielding the reply as one chunk."""
+    lease = None
+    interrupted = False
+    outcome = "error"
+    try:
+        start = time.perf_counter()
+        lease = await _acquire_session(session_id)
+        acquired = time.perf_counter()
+        metrics.observe_stage("lock", acquired - start)
+        
+        messages = await _start_turn(session_id, message, pruning_strategy, lease.fence)
+        interrupted = True
+        loaded = time.perf_counter()
+        metrics.observe_stage("history", loaded - acquired)
         
-        # 2. Append user message to history
-        await memory.add_message(session_id, "user", message)
+        reply = await llm_client.generate(messages)
+        generated = time.perf_counter()
+        metrics.observe_stage("llm", generated - loaded)
+        
+        interrupted = False
+        # Rejected if another replica took the session over meanwhile
+        await memory.add_message(session_id, "assistant", reply, lease.fence)
+        await lease.release()
+        saved = time.perf_counter()
+        metrics.observe_stage("persist", saved - generated)
+        metrics.observe_stage("turn", saved - start)
+        outcome = "done"
+        
+        logger.info("Completed response for session %s (%s chars)", session_id, len(reply))
+        yield "chunk", reply
+        yield "done", None
+    except SessionBusy:
+        outcome = "busy"
+        raise
+    except SessionLeaseLost:
+        # Another request owns the session now; do not write over it
+        interrupted = False
+        outcome = "lease_lost"
+        raise
+    finally:
+        metrics.record_turn("complete", outcome)
+        if lease is not None:
+            _run_detached(_finish_turn(session_id, lease, "" if interrupted else None))
+
+
+async def complete_turn(
+    session_id: str,
+    message: str,
+    pruning_strategy: Optional[str] = None
+) -> Tuple[str, Dict[str, float]]:
+    """
+    Run one chat turn with a single non-streaming LLM call.
+    
+    The turn holds the session lock like a streamed one (see
+    ``generate_reply_events``). If the LLM call fails after the user message
+    was stored, an empty reply marked as truncated is saved so history keeps
+    alternating turns.
+    
+    Args:
+        session_id: Unique session identifier
+        message: User message
+        pruning_strategy: History pruning strategy (uses config default if None)
+        
+    Returns:
+        Tuple of (reply, durations in milliseconds of the 'lock', 'history',
+        'prune' (part of 'history'), 'llm', 'persist' and 'turn' stages, or
+        only 'coalesced' when the request joined an identical turn in flight)
+        
+    Raises:
+        SessionBusy: If the session stayed busy (see ``session_lock_policy``)
+    """
+    start = time.perf_counter()
+    chunks = []
+    error = None
+    with metrics.collect_timings() as timings:
+        run = _complete_turn_events(session_id, message, pruning_strategy)
+        async for kind, data in _coalesce_turn(session_id, message, run):
+            if kind == "chunk":
+                chunks.append(data)
+            elif kind == "error":
+                error = data
+    
+    if error is not None:
+        # Only reached when following another request's turn
+        raise RuntimeError(error)
+    if not timings:
+        timings["coalesced"] = (time.perf_counter() - start) * 1000
+    return "".join(chunks), timings
+
+
+def _server_timing(timings: Dict[str, float]) -> str:
+    """Format stage durations (ms) as a Server-Timing header value."""
+    return ", ".join(f"{name};dur={duration:.1f}" for name, duration in timings.items())
+
+
+async def generate_reply_events(
+    session_id: str,
+    message: str,
+    pruning_strategy: Optional[str] = None,
+    receive: Optional[Receive] = None
+) -> AsyncIterator[Tuple[str, Optional[str]]]:
+    """
+    Run one chat turn and yield its events.
+    
+    The whole turn (history load, generation and persisting the reply) holds
+    the session lock, so concurrent requests for a session cannot read the
+    same history or interleave their writes. A request that finds the
+    session busy queues, fails, or joins the running turn, depending on
+    ``session_lock_policy``.
+    
+    If the turn is interrupted after the user message was stored (client
+    disconnect, cancellation or an LLM error), whatever was generated so far
+    is saved with ``TRUNCATED_MARKER`` so history keeps alternating turns.
+    
+    Args:
+        session_id: Unique session identifier
+        message: User message
+        pruning_strategy: History pruning strategy (uses config default if None)
+        receive: ASGI receive channel used to detect client disconnects
         
-        # 3. Prepare messages for LLM (history + new user message)
-        messages = history + [{"role": "user", "content": message}]
+    Yields:
+        Tuple of (event kind, data): ('chunk', text) for each LLM chunk,
+        then ('done', None) or ('error', message)
+    """
+    run = _stream_turn_events(session_id, message, pruning_strategy, receive)
+    async for event in _coalesce_turn(session_id, message, run):
+        yield event
+
+
+async def _stream_turn_events(
+    session_id: str,
+    message: str,
+    pruning_strategy: Optional[str],
+    receive: Optional[Receive]
+) -> AsyncIterator[Tuple[str, Optional[str]]]:
+    """Run a streamed turn under the session lock (see ``generate_reply_events``)."""
+    lease = None
+    full_response_chunks = []
+    # Set once the user message is stored, cleared once the reply is
+    interrupted = False
+    # Anything but a normal end (e.g. cancellation) counts as an interruption
+    outcome = "interrupted"
+    
+    try:
+        start = time.perf_counter()
+        lease = await _acquire_session(session_id)
+        acquired = time.perf_counter()
+        metrics.observe_stage("lock", acquired - start)
         
-        # 4. Stream response from LLM
-        full_response_chunks = []
+        # 1. Load history, append the user message and build the prompt
+        messages = await _start_turn(session_id, message, pruning_strategy, lease.fence)
+        interrupted = True
+        loaded = time.perf_counter()
+        metrics.observe_stage("history", loaded - acquired)
         
-        async for chunk in llm_client.generate_stream(messages):
+        # 2. Stream response from LLM (cancelled if the client disconnects)
+        async for chunk in _stream_until_disconnect(llm_client.generate_stream(messages), receive):
+            if not full_response_chunks:
+                # The first chunk is never held back for coalescing
+                metrics.observe_stage("llm_first_token", time.perf_counter() - loaded)
             # Collect chunks for saving later
             full_response_chunks.append(chunk)
-            
-            # Format as SSE and yield
-            # SSE format: "data: <content>\n\n"
-            sse_chunk = f"data: {chunk}\n\n"
-            yield sse_chunk
+            yield "chunk", chunk
+        generated = time.perf_counter()
+        metrics.observe_stage("llm", generated - loaded)
         
-        # 5. Save complete assistant response to memory
+        # 3. Save complete assistant response to memory, unless another
+        # replica took the session over meanwhile
+        interrupted = False
         full_response = "".join(full_response_chunks)
-        await memory.add_message(session_id, "assistant", full_response)
+        await memory.add_message(session_id, "assistant", full_response, lease.fence)
+        await lease.release()
+        saved = time.perf_counter()
+        metrics.observe_stage("persist", saved - generated)
+        metrics.observe_stage("turn", saved - start)
+        outcome = "done"
         
-        logger.info(f"Completed streaming response for session {session_id} ({len(full_response)} chars)")
+        logger.info("Completed streaming response for session %s (%s chars)", session_id, len(full_response))
         
-        # Send final SSE message to indicate completion
-        yield "data: [DONE]\n\n"
+        yield "done", None
+        
+    except ClientDisconnected:
+        outcome = "disconnected"
+        logger.info("Client disconnected from session %s, cancelled LLM stream", session_id)
+        
+    except SessionBusy as e:
+        outcome = "busy"
+        logger.info("Rejected turn for session %s: %s", session_id, e)
+        yield "error", str(e)
+        
+    except SessionLeaseLost as e:
+        # Another request owns the session now; do not write over it
+        interrupted = False
+        outcome = "lease_lost"
+        logger.warning("Discarded response for session %s: %s", session_id, e)
+        yield "error", str(e)
         
     except Exception as e:
-        logger.error(f"Error in SSE stream generation: {str(e)}", exc_info=True)
-        # Send error in SSE format
-        error_msg = f"data: {{\"error\": \"An error occurred: {str(e)}\"}}\n\n"
-        yield error_msg
+        outcome = "error"
+        logger.error("Error in SSE stream generation: %s", e, exc_info=True)
+        yield "error", str(e)
+    
+    finally:
+        metrics.record_turn("stream", outcome)
+        if lease is not None:
+            # The request may be cancelled, so the write and release run detached
+            partial_response = "".join(full_response_chunks) if interrupted else None
+            _run_detached(_finish_turn(session_id, lease, partial_response))
+
+
+async def _count_stream(frames: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Count an SSE response in the active-stream gauge and its events and bytes."""
+    metrics.active_streams.inc()
+    try:
+        async for frame in frames:
+            metrics.stream_events.inc()
+            metrics.stream_bytes.inc(len(frame.encode("utf-8")))
+            yield frame
+    finally:
+        metrics.active_streams.dec()
+        # Close the inner stream now rather than when it is garbage collected
+        await frames.aclose()
+
+
+def format_sse_event(kind: str, data: Optional[str], event_id: Optional[str] = None) -> str:
+    """
+    Format a reply event as an SSE frame.
+    
+    Args:
+        kind: Event kind ('chunk', 'done' or 'error')
+        data: Event payload
+        event_id: SSE event ID, sent so clients can resume with Last-Event-ID
+        
+    Returns:
+        str: SSE frame
+    """
+    if kind == "done":
+        # Final SSE message to indicate completion
+        return encode_sse("[DONE]", event_id)
+    if kind == "error":
+        return encode_sse(json_dumps({"error": f"An error occurred: {data}"}), event_id)
+    # SSE format: "data: <content>\n\n", one data line per line of content
+    return encode_sse(data, event_id)
+
+
+async def generate_sse_stream(
+    session_id: str,
+    message: str,
+    pruning_strategy: Optional[str] = None,
+    receive: Optional[Receive] = None,
+    stream_id: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    Generate Server-Sent Events stream for chat response.
+    
+    With resumable streams enabled and a ``stream_id`` given, events carry
+    IDs and are buffered in Redis, and generation runs in its own task so
+    it outlives a dropped connection (see ``_produce_buffered_reply``).
+    Otherwise a disconnect cancels the LLM request right away.
+    
+    Args:
+        session_id: Unique session identifier
+        message: User message
+        pruning_strategy: History pruning strategy (uses config default if None)
+        receive: ASGI receive channel used to detect client disconnects
+        stream_id: ID of the reply stream to buffer events under
+        
+    Yields:
+        str: SSE-formatted data chunks
+    """
+    if stream_buffer is None or stream_id is None:
+        async for kind, data in generate_reply_events(session_id, message, pruning_strategy, receive):
+            yield format_sse_event(kind, data)
+        return
+    
+    writer = await stream_buffer.open(stream_id, session_id)
+    queue: asyncio.Queue = asyncio.Queue()
+    producer = asyncio.create_task(
+        _produce_buffered_reply(session_id, message, pruning_strategy, writer, queue)
+    )
+    detached = False
+    
+    def detach() -> None:
+        nonlocal detached
+        if not detached and not producer.done():
+            detached = True
+            # The client went away; keep generating while it may reconnect
+            _run_detached(_cancel_unless_resumed(producer, stream_id))
+    
+    # Servers may not close this generator on disconnect, so watch for it
+    watcher = None
+    if receive is not None:
+        watcher = asyncio.create_task(_wait_for_disconnect(receive))
+        watcher.add_done_callback(lambda task: None if task.cancelled() else detach())
+    
+    try:
+        while True:
+            item = await queue.get()
+            if item is _END:
+                return
+            seq, kind, data = item
+            yield format_sse_event(kind, data, f"{stream_id}:{seq}")
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        detach()
+
+
+async def _produce_buffered_reply(
+    session_id: str,
+    message: str,
+    pruning_strategy: Optional[str],
+    writer: StreamWriter,
+    queue: asyncio.Queue
+) -> None:
+    """
+    Run a chat turn, sending its events to the local client and the buffer.
+    
+    Args:
+        session_id: Unique session identifier
+        message: User message
+        pruning_strategy: History pruning strategy (uses config default if None)
+        writer: Buffer writer for the reply stream
+        queue: Queue feeding the original client's SSE response
+    """
+    terminated = False
+    try:
+        async for kind, data in generate_reply_events(session_id, message, pruning_strategy):
+            seq = writer.append(kind, data)
+            queue.put_nowait((seq, kind, data))
+            terminated = kind in TERMINAL_EVENTS
+    finally:
+        if not terminated:
+            # Cancelled (or disconnected): let resumed readers stop
+            writer.append("error", "Stream interrupted")
+        queue.put_nowait(_END)
+        await writer.close()
 
 
-@router.post("/chat")
-async def chat_endpoint(request: ChatRequest) -> StreamingResponse:
+async def _cancel_unless_resumed(producer: asyncio.Task, stream_id: str) -> None:
+    """
+    Cancel a buffered reply whose client left, unless a client resumed it.
+    
+    Args:
+        producer: Task generating the reply
+        stream_id: Unique stream identifier
+    """
+    await asyncio.wait({producer}, timeout=settings.stream_resume_grace_seconds)
+    if producer.done():
+        return
+    if await stream_buffer.is_resumed(stream_id):
+        return
+    logger.info("No client resumed stream %s, cancelling LLM stream", stream_id)
+    producer.cancel()
+
+
+async def resume_sse_stream(stream_id: str, last_seq: int) -> AsyncIterator[str]:
+    """
+    Replay a buffered reply after an event and follow its live tail.
+    
+    Args:
+        stream_id: Unique stream identifier
+        last_seq: Sequence number of the last event the client received
+        
+    Yields:
+        str: SSE-formatted data chunks
+    """
+    async for seq, kind, data in stream_buffer.read(stream_id, last_seq):
+        yield format_sse_event(kind, data, f"{stream_id}:{seq}" if seq else None)
+
+
+def _parse_last_event_id(last_event_id: str) -> Tuple[str, int]:
+    """
+    Split a Last-Event-ID header into stream ID and sequence number.
+    
+    Raises:
+        HTTPException: 400 if the header is malformed
+    """
+    parsed = parse_event_id(last_event_id)
+    if parsed is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Malformed Last-Event-ID header"
+        )
+    return parsed
+
+
+async def _resume_response(
+    request: ChatRequest,
+    last_event_id: str,
+    request_id: str
+) -> StreamingResponse:
+    """
+    Build the response for a reconnect carrying Last-Event-ID.
+    
+    Raises:
+        HTTPException: 400 if the header is malformed, 404 if the stream
+            does not exist, has expired or belongs to another session
+    """
+    stream_id, last_seq = _parse_last_event_id(last_event_id)
+    if await stream_buffer.get_session(stream_id) != request.session_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Stream not found or expired"
+        )
+    
+    await stream_buffer.mark_resumed(stream_id)
+    logger.info("Resuming stream %s after event %s", stream_id, last_seq)
+    
+    return StreamingResponse(
+        _count_stream(resume_sse_stream(stream_id, last_seq)),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Request-ID": request_id
+        }
+    )
+
+
+@router.post("/chat", dependencies=[Depends(enforce_rate_limit)])
+async def chat_endpoint(
+    request: ChatRequest,
+    http_request: Request,
+    last_event_id: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+    api_key: Optional[str] = Header(default=None, alias="X-API-Key")
+) -> StreamingResponse:
     """
     Stream chat responses using Server-Sent Events.
     
@@ -80,11 +796,28 @@ async def chat_endpoint(request: ChatRequest) -> StreamingResponse:
     1. Validates the incoming request
     2. Loads conversation history from Redis
     3. Sends the conversation to Gemini via LangChain
-    4. Streams the response token-by-token via SSE
-    5. Saves the conversation back to Redis
+    4. Streams the response token-by-token via SSE, cancelling the LLM
+       request if the client disconnects
+    5. Saves the conversation back to Redis (partial replies are saved
+       marked as truncated)
+    6. Compacts old turns into a rolling summary after the stream ends
+       (when summarization is enabled)
+    
+    Turns of the same session never overlap: a request arriving while one is
+    running waits for it, is refused with 409, or receives its reply,
+    depending on ``session_lock_policy``. Requests over their rate limit,
+    or arriving while the LLM call queue is full, are refused with 429 and
+    a Retry-After header.
+    
+    With resumable streams enabled, events carry IDs. A reconnect that sends
+    the same request with ``Last-Event-ID`` replays the buffered reply from
+    that point instead of generating a new one.
     
     Args:
         request: ChatRequest with session_id and message
+        http_request: Raw request, used to detect client disconnects
+        last_event_id: ID of the last event received before a disconnect
+        api_key: Client API key, used for fair scheduling
         
     Returns:
         StreamingResponse: SSE stream of chat response
@@ -101,27 +834,265 @@ async def chat_endpoint(request: ChatRequest) -> StreamingResponse:
     set_request_id(request_id)
     
     try:
+        if last_event_id and stream_buffer is not None:
+            return await _resume_response(request, last_event_id, request_id)
+        
+        # Fail fast while the response status can still be set; the turn
+        # itself rechecks when it takes the lock
+        if settings.session_lock_policy == "reject" and await session_locks.is_locked(request.session_id):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Another request for this session is in progress"
+            )
+        
+        # Likewise for LLM capacity; a call that later waits too long for a
+        # slot ends the stream with an error event
+        _check_llm_capacity()
+        _set_tenant(request.session_id, api_key)
+        
         logger.info(
-            f"Chat request - session: {request.session_id}, "
-            f"message_length: {len(request.message)}"
+            "Chat request - session: %s, message_length: %s",
+            request.session_id, len(request.message)
         )
         
+        # Summarization runs after the response is sent, off the request path
+        background = None
+        if settings.summarization_enabled:
+            background = BackgroundTask(compactor.maybe_compact, request.session_id)
+        
         # Create streaming response
         return StreamingResponse(
-            generate_sse_stream(request.session_id, request.message),
+            _count_stream(generate_sse_stream(
+                request.session_id,
+                request.message,
+                request.pruning_strategy,
+                http_request.receive,
+                stream_id=request_id
+            )),
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
                 "Connection": "keep-alive",
                 "X-Request-ID": request_id
-            }
+            },
+            background=background
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error processing chat request: {str(e)}", exc_info=True)
+        logger.error("Error processing chat request: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to process chat request: {str(e)}"
         )
     finally:
         clear_request_id()
+
+
+@router.post("/chat/completions", response_model=ChatResponse, dependencies=[Depends(enforce_rate_limit)])
+async def chat_completions_endpoint(
+    request: ChatRequest,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    api_key: Optional[str] = Header(default=None, alias="X-API-Key")
+) -> ChatResponse:
+    """
+    Return a complete chat response as JSON.
+    
+    For server-to-server callers that do not need streaming. History and
+    persistence work as for ``/chat``, but the LLM is called once without
+    streaming. The ``Server-Timing`` header reports the time spent waiting
+    for the session lock, loading history (pruning included), calling the
+    LLM and persisting the reply, plus the whole turn and the total.
+    Responds 409 if the session stays busy (see ``session_lock_policy``),
+    429 with Retry-After if over a rate limit, and 429 or 503 with
+    Retry-After if no LLM capacity is available.
+    
+    Args:
+        request: ChatRequest with session_id and message
+        response: Response whose headers are set
+        background_tasks: Tasks run after the response is sent
+        api_key: Client API key, used for fair scheduling
+        
+    Returns:
+        ChatResponse: Session ID and the complete response
+        
+    Example:
+        ```bash
+        curl -X POST http://localhost:8000/chat/completions \\
+          -H "Content-Type: application/json" \\
+          -d '{"session_id": "test-123", "message": "Hello!"}'
+        ```
+    """
+    request_id = str(uuid.uuid4())
+    set_request_id(request_id)
+    start = time.perf_counter()
+    
+    try:
+        logger.info(
+            "Completion request - session: %s, message_length: %s",
+            request.session_id, len(request.message)
+        )
+        _check_llm_capacity()
+        _set_tenant(request.session_id, api_key)
+        
+        reply, timings = await complete_turn(
+            request.session_id,
+            request.message,
+            request.pruning_strategy
+        )
+        timings["total"] = (time.perf_counter() - start) * 1000
+        
+        response.headers["X-Request-ID"] = request_id
+        response.headers["Server-Timing"] = _server_timing(timings)
+        
+        # Summarization runs after the response is sent, off the request path
+        if settings.summarization_enabled:
+            background_tasks.add_task(compactor.maybe_compact, request.session_id)
+        
+        return ChatResponse(session_id=request.session_id, response=reply)
+        
+    except HTTPException:
+        raise
+    except SessionBusy as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except SchedulerOverloaded as e:
+        raise _overloaded_error(e)
+    except Exception as e:
+        logger.error("Error processing completion request: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to process chat request: {str(e)}"
+        )
+    finally:
+        clear_request_id()
+
+
+async def _run_batch_session(
+    turns: List[Tuple[int, ChatRequest]],
+    results: asyncio.Queue,
+    api_key: Optional[str] = None
+) -> None:
+    """
+    Run one session's batch items in order, reporting each result.
+    
+    Failures are reported per item and do not stop the remaining items. If
+    the session itself fails, every item not reported yet gets its error,
+    so each index is reported exactly once.
+    
+    Args:
+        turns: (index, item) pairs of a single session, in request order
+        results: Queue receiving a ChatBatchResult per item
+        api_key: Client API key, used for fair scheduling
+    """
+    session_id = turns[0][1].session_id
+    reported = 0
+    try:
+        _set_tenant(session_id, api_key)
+        for index, item in turns:
+            async with _batch_semaphore:
+                try:
+                    reply, _ = await complete_turn(item.session_id, item.message, item.pruning_strategy)
+                    result = ChatBatchResult(index=index, session_id=item.session_id, response=reply)
+                except Exception as e:
+                    logger.error("Batch item %s failed for session %s: %s", index, item.session_id, e)
+                    result = ChatBatchResult(index=index, session_id=item.session_id, error=str(e))
+            results.put_nowait(result)
+            reported += 1
+        
+        if settings.summarization_enabled:
+            async with _batch_semaphore:
+                await compactor.maybe_compact(session_id)
+    except Exception as e:
+        logger.error("Batch session %s failed: %s", session_id, e, exc_info=True)
+        for index, item in turns[reported:]:
+            results.put_nowait(ChatBatchResult(index=index, session_id=item.session_id, error=str(e)))
+
+
+async def generate_batch_results(
+    items: List[ChatRequest],
+    api_key: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    Run batch items concurrently and yield NDJSON results as they complete.
+    
+    Items are grouped by session; sessions run concurrently (bounded by
+    ``batch_max_concurrency``) while each session's items run in order, so
+    turns of one session never interleave. The stream ends once every
+    session has finished, compaction included; if the client disconnects,
+    outstanding items are cancelled.
+    
+    Args:
+        items: Batch items
+        api_key: Client API key, used for fair scheduling
+        
+    Yields:
+        str: One JSON line per item, in completion order
+    """
+    sessions: Dict[str, List[Tuple[int, ChatRequest]]] = {}
+    for index, item in enumerate(items):
+        sessions.setdefault(item.session_id, []).append((index, item))
+    
+    results: asyncio.Queue = asyncio.Queue()
+    workers = [
+        asyncio.create_task(_run_batch_session(turns, results, api_key))
+        for turns in sessions.values()
+    ]
+    
+    try:
+        for _ in range(len(items)):
+            result = await results.get()
+            yield json_dumps(result.model_dump(exclude_none=True)) + "\n"
+        # Sessions compact after reporting their last item; let them finish
+        await asyncio.gather(*workers)
+    finally:
+        # Only cuts work short on an early exit (disconnect or error)
+        for worker in workers:
+            worker.cancel()
+
+
+@router.post("/chat/batch", dependencies=[Depends(enforce_batch_rate_limit)])
+async def chat_batch_endpoint(
+    request: ChatBatchRequest,
+    api_key: Optional[str] = Header(default=None, alias="X-API-Key")
+) -> StreamingResponse:
+    """
+    Run many independent chat turns and stream results as NDJSON.
+    
+    For offline jobs (evaluation runs, scheduled digests) that would
+    otherwise make one ``/chat`` call per turn. Each turn works like
+    ``/chat/completions``. One JSON line is written per item as it
+    completes, with its ``index`` in the request and either ``response``
+    or ``error``; a failing item does not fail the batch.
+    
+    Args:
+        request: ChatBatchRequest with the items to run
+        api_key: Client API key, used for fair scheduling
+        
+    Returns:
+        StreamingResponse: NDJSON stream of ChatBatchResult lines
+        
+    Example:
+        ```bash
+        curl -N -X POST http://localhost:8000/chat/batch \\
+          -H "Content-Type: application/json" \\
+          -d '{"items": [{"session_id": "a", "message": "Hi"}, {"session_id": "b", "message": "Hello"}]}'
+        ```
+    """
+    request_id = str(uuid.uuid4())
+    set_request_id(request_id)
+    
+    try:
+        logger.info(
+            "Batch request - items: %s, sessions: %s",
+            len(request.items), len({item.session_id for item in request.items})
+        )
+        
+        return StreamingResponse(
+            generate_batch_results(request.items, api_key),
+            media_type="application/x-ndjson",
+            headers={"X-Request-ID": request_id}
+        )
+    finally:
+        clear_request_id()
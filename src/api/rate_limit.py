@@ -0,0 +1,308 @@
+"""Token-bucket rate limiting of chat requests."""
+
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Header, HTTPException, Request, status
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.memory.factory import memory
+from src.memory.stream_buffer import parse_event_id, stream_buffer
+from src.schemas.chat import ChatBatchRequest, ChatRequest
+
+logger = get_logger("api.rate_limit")
+
+# Checks several token buckets and takes from all of them, or from none.
+# KEYS[i] = bucket i (hash with 'tokens' and 'ts')
+# ARGV[3i-2] = capacity, ARGV[3i-1] = refill per millisecond, ARGV[3i] = cost
+# Returns {1, 0} if allowed, else {0, milliseconds until it would be}.
+TOKEN_BUCKET_SCRIPT = """
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[3 * i - 2])
+    local rate = tonumber(ARGV[3 * i - 1])
+    local cost = tonumber(ARGV[3 * i])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    if tokens < cost then
+        wait = math.max(wait, math.ceil((cost - tokens) / rate))
+    end
+end
+if wait > 0 then
+    return {0, wait}
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[3 * i - 2])
+    local rate = tonumber(ARGV[3 * i - 1])
+    redis.call('HSET', key, 'tokens', levels[i] - tonumber(ARGV[3 * i]), 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate))
+end
+return {1, 0}
+"""
+
+# A bucket check: (name, capacity, refill per millisecond, cost)
+Bucket = Tuple[str, float, float, float]
+
+
+class LocalRateLimiter:
+    """
+    In-process token buckets, used while Redis is unavailable.
+
+    Limits then apply per worker instead of across the deployment.
+    """
+
+    def __init__(self, max_buckets: int = 10000):
+        """
+        Initialize the limiter.
+
+        Args:
+            max_buckets: Buckets kept; the least recently used are dropped
+        """
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def check(self, buckets: List[Bucket]) -> int:
+        """
+        Take from every bucket if all have enough tokens.
+
+        Args:
+            buckets: Buckets to check
+
+        Returns:
+            int: 0 if allowed, else milliseconds until the request would be
+        """
+        now = time.monotonic() * 1000
+        levels = []
+        wait = 0
+        for name, capacity, rate, cost in buckets:
+            tokens, ts = self._buckets.get(name, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+            levels.append(tokens)
+            if tokens < cost:
+                wait = max(wait, math.ceil((cost - tokens) / rate))
+        if wait:
+            return wait
+
+        for (name, _, _, cost), tokens in zip(buckets, levels):
+            self._buckets[name] = (tokens - cost, now)
+            self._buckets.move_to_end(name)
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+        return 0
+
+
+class RateLimiter:
+    """
+    Token-bucket limits on requests and estimated tokens.
+
+    Buckets are checked by a Lua script on the Redis shards of the
+    conversation memory. Session buckets are keyed by the session and
+    client buckets by the client, so a session is limited whichever client
+    calls it; each group is checked in one round trip on its owner's shard
+    (and cluster slot). When the memory is not Redis-backed or Redis fails,
+    an in-process limiter takes over.
+    """
+
+    def __init__(self):
+        """Initialize the limiter."""
+        self.local = LocalRateLimiter()
+        self._script = None
+        self._redis_down = False
+
+    async def check(self, client_id: str, usage: Dict[str, Tuple[int, int]]) -> int:
+        """
+        Charge requests and their estimated tokens, all or nothing.
+
+        Args:
+            client_id: Client identity (hashed API key or address)
+            usage: (requests, estimated tokens) per session ID; the client
+                is charged their sum
+
+        Returns:
+            int: 0 if allowed, else milliseconds until the requests would be
+        """
+        groups = self._buckets(client_id, usage)
+        if not groups:
+            return 0
+
+        shards = memory.redis_shards()
+        if shards is None:
+            return self._check_local(groups)
+
+        try:
+            wait = await self._check_redis(shards, groups)
+        except Exception as e:
+            if not self._redis_down:
+                logger.warning("Rate limiting locally, Redis unavailable: %s", e)
+                self._redis_down = True
+            return self._check_local(groups)
+
+        if self._redis_down:
+            logger.info("Rate limiting through Redis again")
+            self._redis_down = False
+        return wait
+
+    def _buckets(self, client_id: str, usage: Dict[str, Tuple[int, int]]) -> List[Tuple[str, str, List[Bucket]]]:
+        """
+        List the enabled buckets the requests are charged to.
+
+        Returns:
+            (scope, owner ID, buckets named relative to the owner) per
+            owner with enabled limits
+        """
+        limits = []
+        for session_id, (requests, tokens) in usage.items():
+            limits.append(("session", session_id, "requests", settings.rate_limit_session_requests_per_minute, requests))
+            limits.append(("session", session_id, "tokens", settings.rate_limit_session_tokens_per_minute, tokens))
+        total_requests = sum(requests for requests, _ in usage.values())
+        total_tokens = sum(tokens for _, tokens in usage.values())
+        limits.append(("client", client_id, "requests", settings.rate_limit_client_requests_per_minute, total_requests))
+        limits.append(("client", client_id, "tokens", settings.rate_limit_client_tokens_per_minute, total_tokens))
+
+        groups: Dict[Tuple[str, str], List[Bucket]] = {}
+        for scope, owner, name, limit, cost in limits:
+            # A minute's allowance can be used at once; a request larger than a
+            # whole bucket is charged the full bucket so it can still go through
+            if limit > 0:
+                groups.setdefault((scope, owner), []).append((name, limit, limit / 60000, min(cost, limit)))
+        return [(scope, owner, buckets) for (scope, owner), buckets in groups.items()]
+
+    def _check_local(self, groups: List[Tuple[str, str, List[Bucket]]]) -> int:
+        """Check the buckets in process."""
+        return self.local.check([
+            (f"{scope}:{owner}:{name}", *limits)
+            for scope, owner, buckets in groups
+            for name, *limits in buckets
+        ])
+
+    async def _check_redis(self, shards, groups: List[Tuple[str, str, List[Bucket]]]) -> int:
+        """
+        Run the bucket script on each owner's shard.
+
+        The groups live on different shards, so they are charged one after
+        the other; if a later group is over its limit, the tokens taken from
+        the earlier ones are given back.
+        """
+        charged = []
+        for scope, owner, buckets in groups:
+            wait = await self._run_script(shards, scope, owner, buckets)
+            if wait:
+                for charged_scope, charged_owner, charged_buckets in charged:
+                    refund = [(name, capacity, rate, -cost) for name, capacity, rate, cost in charged_buckets]
+                    await self._run_script(shards, charged_scope, charged_owner, refund)
+                return wait
+            charged.append((scope, owner, buckets))
+        return 0
+
+    async def _run_script(self, shards, scope: str, owner: str, buckets: List[Bucket]) -> int:
+        """Run the bucket script for one owner's buckets."""
+        client = shards.client_for(owner)
+        if self._script is None:
+            self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        tag = shards.key_tag(owner)
+        keys = [f"ratelimit:{scope}:{tag}:{name}" for name, _, _, _ in buckets]
+        args = [value for _, capacity, rate, cost in buckets for value in (capacity, rate, cost)]
+        allowed, wait = await self._script(keys=keys, args=args, client=client)
+        return 0 if allowed else int(wait)
+
+
+def _client_id(http_request: Request, api_key: Optional[str]) -> str:
+    """Identify the client by API key (hashed) or, without one, by address."""
+    if api_key:
+        return "key-" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+    host = http_request.client.host if http_request.client else "unknown"
+    return f"addr-{host}"
+
+
+def _estimate_tokens(request: ChatRequest) -> int:
+    """Estimate the tokens of a turn: the message plus the expected reply."""
+    return memory._count_message_tokens("user", request.message) + settings.rate_limit_reply_token_estimate
+
+
+def _rate_limited(wait_ms: int) -> HTTPException:
+    """Build the 429 response for a wait in milliseconds."""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Rate limit exceeded",
+        headers={"Retry-After": str(math.ceil(wait_ms / 1000))}
+    )
+
+
+async def _is_resume(session_id: str, last_event_id: str) -> bool:
+    """Return True if Last-Event-ID names a buffered stream of the session."""
+    if stream_buffer is None:
+        return False
+    parsed = parse_event_id(last_event_id)
+    if parsed is None:
+        return False
+    return await stream_buffer.get_session(parsed[0]) == session_id
+
+
+# Global rate limiter instance
+rate_limiter = RateLimiter()
+
+
+async def enforce_rate_limit(
+    request: ChatRequest,
+    http_request: Request,
+    api_key: Optional[str] = Header(default=None, alias="X-API-Key"),
+    last_event_id: Optional[str] = Header(default=None, alias="Last-Event-ID")
+) -> None:
+    """
+    FastAPI dependency rejecting requests over their rate limits.
+
+    Charges the session and the client one request plus the estimated
+    tokens of the turn: the message plus ``rate_limit_reply_token_estimate``.
+    Reconnects resuming a buffered stream of the same session are not
+    charged; any other Last-Event-ID is.
+
+    Raises:
+        HTTPException: 429 with Retry-After if a limit is exceeded
+    """
+    if not settings.rate_limit_enabled:
+        return
+    if last_event_id and await _is_resume(request.session_id, last_event_id):
+        return
+
+    usage = {request.session_id: (1, _estimate_tokens(request))}
+    wait_ms = await rate_limiter.check(_client_id(http_request, api_key), usage)
+    if wait_ms:
+        logger.info("Rate limited session %s for %s ms", request.session_id, wait_ms)
+        raise _rate_limited(wait_ms)
+
+
+async def enforce_batch_rate_limit(
+    request: ChatBatchRequest,
+    http_request: Request,
+    api_key: Optional[str] = Header(default=None, alias="X-API-Key")
+) -> None:
+    """
+    FastAPI dependency rejecting batches over their rate limits.
+
+    Charges every item like a ``/chat`` request, to its session and to the
+    client; the whole batch is admitted or rejected.
+
+    Raises:
+        HTTPException: 429 with Retry-After if a limit is exceeded
+    """
+    if not settings.rate_limit_enabled:
+        return
+
+    usage: Dict[str, Tuple[int, int]] = {}
+    for item in request.items:
+        requests, tokens = usage.get(item.session_id, (0, 0))
+        usage[item.session_id] = (requests + 1, tokens + _estimate_tokens(item))
+    wait_ms = await rate_limiter.check(_client_id(http_request, api_key), usage)
+    if wait_ms:
+        logger.info("Rate limited batch of %s items for %s ms", len(request.items), wait_ms)
+        raise _rate_limited(wait_ms)
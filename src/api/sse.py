@@ -0,0 +1,53 @@
+"""Server-Sent Events encoding."""
+
+import json
+import re
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Line terminators recognized by the SSE spec
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+
+def json_dumps(value: Any) -> str:
+    """Serialize to compact JSON, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def encode_sse(
+    data: str,
+    event_id: Optional[str] = None,
+    event: Optional[str] = None
+) -> str:
+    """
+    Encode one SSE event.
+
+    Each line of ``data`` gets its own ``data:`` field, so payloads
+    containing line breaks reach the client intact (the client joins the
+    fields with '\n'). One space follows each colon, which the client strips,
+    so leading whitespace in the payload is preserved.
+
+    Args:
+        data: Event payload
+        event_id: Value for the ``id:`` field (sets the client's Last-Event-ID)
+        event: Value for the ``event:`` field (None = default 'message' event)
+
+    Returns:
+        str: Encoded event, terminated by a blank line
+    """
+    fields = []
+    if event_id is not None:
+        fields.append(f"id: {event_id}\n")
+    if event is not None:
+        fields.append(f"event: {event}\n")
+    for line in _LINE_BREAK.split(data):
+        fields.append(f"data: {line}\n")
+    fields.append("\n")
+    return "".join(fields)
@@ -12,20 +12,112 @@ class Settings(BaseSettings):
     gemini_model: str = "gemini-2.5-flash"
     gemini_temperature: float = 0.7
     gemini_max_tokens: int = 2048
+    llm_backends: list[str] = []  # "provider:model[:API_KEY_ENV_VAR]" specs to route between (empty = gemini_model)
+    llm_router_failure_threshold: int = 5  # consecutive failures before a backend is ejected
+    llm_router_open_seconds: float = 30.0  # ejected backends get a probe call after this
+    llm_router_ramp_seconds: float = 60.0  # recovered backends regain their full traffic share over this
+    llm_coalesce_enabled: bool = True  # identical concurrent requests share one upstream call
+    llm_max_concurrency: int = 64  # upstream calls in flight per worker
+    llm_max_queue: int = 256  # calls waiting for a slot; more are rejected with 429
+    llm_queue_timeout_seconds: float = 30.0  # waiting calls give up with 503 after this
+    llm_fair_share_by: str = "session"  # queue fairly per "session" or per "api_key" (X-API-Key header)
+    llm_retry_attempts: int = 3  # attempts for failures before the first chunk; 1 disables retries
+    llm_retry_backoff_seconds: float = 0.5  # base of the jittered exponential backoff
+    llm_retry_max_backoff_seconds: float = 8.0
+    llm_hedge_percentile: float = 95.0  # hedge attempts slower to first chunk than this; 0 disables
+    llm_hedge_min_delay_seconds: float = 0.5
+    llm_hedge_max_delay_seconds: float = 10.0  # also used until enough latency samples are seen
+    
+    # Response Cache Configuration
+    response_cache_enabled: bool = False
+    response_cache_ttl_seconds: int = 3600
+    response_cache_max_bytes: int = 64 * 1024 * 1024  # Redis tier; least recently used evicted beyond this
+    response_cache_local_max_bytes: int = 8 * 1024 * 1024  # in-process tier
+    response_cache_max_entry_bytes: int = 64 * 1024  # larger responses are not cached
+    response_cache_max_temperature: float = 0.0  # requests sampled hotter bypass the cache
+    
+    # Fake LLM Configuration (LLM_BACKENDS='["fake"]'; for load tests)
+    fake_llm_reply_tokens: int = 200
+    fake_llm_chunk_tokens: int = 4
+    fake_llm_first_token_delay_ms: float = 300.0
+    fake_llm_token_delay_ms: float = 10.0
+    fake_llm_error_rate: float = 0.0  # fraction failing before the first chunk
+    fake_llm_midstream_error_rate: float = 0.0  # fraction failing halfway through
+    fake_llm_seed: int = 0
     
     # Redis Configuration
     redis_url: str = "redis://localhost:6379"
+    redis_urls: list[str] = []  # shard sessions across these nodes (empty = redis_url only)
+    redis_cluster: bool = False  # treat redis_url as a Redis Cluster endpoint
     redis_ttl_seconds: int = 86400  # 24 hours default
+    redis_max_connections: int = 50  # per shard
+    redis_pool_timeout: float = 5.0  # seconds to wait for a free pooled connection
+    redis_socket_timeout: Optional[float] = None
+    redis_socket_connect_timeout: Optional[float] = 5.0
+    redis_health_check_interval: int = 30  # seconds; 0 disables
     
     # Memory Configuration
+    memory_backend: str = "redis"  # redis, inprocess, sqlite
+    sqlite_memory_path: str = "chat_memory.db"
     max_history_tokens: int = 4000
     max_history_turns: int = 20
+    history_read_mode: str = "windowed"  # "windowed" or "full"
+    history_read_chunk_size: int = 32
+    pruning_strategy: str = "token_window"  # token_window, newest_n, first_turn_plus_tail
+    
+    # Retention Configuration
+    history_retention_messages: int = 200  # 0 = keep everything until TTL
+    history_archive: str = "none"  # none, jsonl, sqlite
+    history_archive_path: Optional[str] = None
+    
+    # Storage Codec Configuration
+    history_codec: str = "json"  # json or msgpack; switch to msgpack once every replica can decode it
+    history_compression_threshold: int = 1024  # bytes; 0 disables zstd compression
+    
+    # In-process History Cache Configuration
+    history_cache_enabled: bool = False
+    history_cache_max_sessions: int = 1024
+    history_cache_ttl_seconds: float = 300.0
+    
+    # Session Lock Configuration
+    session_lock_policy: str = "queue"  # concurrent turns per session: queue, reject (409) or coalesce
+    session_lock_wait_seconds: float = 30.0  # queued turns give up after this
+    session_lock_distributed: bool = False  # also take a Redis lease, for multiple replicas
+    session_lock_lease_seconds: float = 30.0  # renewed while held
+    
+    # Rate Limit Configuration (per minute; 0 disables a limit)
+    rate_limit_enabled: bool = False
+    rate_limit_session_requests_per_minute: float = 20
+    rate_limit_session_tokens_per_minute: float = 0
+    rate_limit_client_requests_per_minute: float = 120  # per API key, or per address without one
+    rate_limit_client_tokens_per_minute: float = 200000
+    rate_limit_reply_token_estimate: int = 500  # charged per request on top of the message tokens
+    
+    # Batch Configuration
+    batch_max_concurrency: int = 16  # turns in flight across all /chat/batch requests
+    
+    # SSE Configuration
+    sse_coalesce_window_ms: float = 20.0  # batch chunks after the first one; 0 disables
+    sse_coalesce_max_bytes: int = 4096  # flush a batch early once it is this large
+    
+    # Resumable Stream Configuration
+    stream_resume_enabled: bool = False
+    stream_buffer_ttl_seconds: int = 300
+    stream_resume_grace_seconds: float = 15.0  # keep generating this long after a disconnect
+    stream_resume_idle_timeout_seconds: float = 30.0  # give up following a silent stream
+    
+    # Summarization Configuration
+    summarization_enabled: bool = False
+    summary_max_tokens: int = 512
+    summary_target_ratio: float = 0.5  # compact the tail down to this share of its budget
     
     # Application Configuration
     app_name: str = "LLM Chatbot Service"
     app_version: str = "1.0.0"
     log_level: str = "INFO"
+    log_queue_size: int = 10000  # records buffered for the log writer thread; 0 writes synchronously
     environment: str = "development"
+    metrics_enabled: bool = True  # Prometheus metrics at /metrics (needs prometheus_client)
     
     # CORS Configuration
     cors_origins: list[str] = ["*"]
@@ -1,8 +1,13 @@
 """Structured logging configuration."""
 
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
 import sys
-from typing import Optional
+from typing import Any, Dict, Optional
 from contextvars import ContextVar
 
 from src.core.config import settings
@@ -11,55 +16,198 @@ from src.core.config import settings
 # Context variable for request ID tracking
 request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
 
+# Listener writing queued records, while the pipeline runs
+_listener: Optional["_QueueListener"] = None
+_output_handler: Optional[logging.Handler] = None
+
+# LogRecord attributes that are not extra fields
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "request_id",
+}
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    Stamps records with the request ID of the current context.
+
+    Runs in the thread that logs, so the ID is captured before the record
+    is handed to another thread for formatting.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Set ``record.request_id`` (kept if already set)."""
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get() or "-"
+        return True
+
 
 class ContextualFormatter(logging.Formatter):
     """Custom formatter that includes request_id in log messages."""
-    
+
     def format(self, record: logging.LogRecord) -> str:
         """Format log record with request context."""
-        request_id = request_id_var.get()
-        if request_id:
-            record.request_id = request_id
-        else:
-            record.request_id = "-"
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get() or "-"
         return super().format(record)
 
 
+class JSONFormatter(ContextualFormatter):
+    """
+    Formats records as one JSON object per line.
+
+    Messages, exceptions and ``extra`` fields are escaped by the JSON
+    encoder, so quotes and newlines in them cannot break the line.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format log record as a JSON line."""
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get() or "-"
+        entry: Dict[str, Any] = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "request_id": record.request_id,
+            "name": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the listener thread without blocking.
+
+    Only the message arguments are interpolated here (they may change once
+    the call returns); timestamps, JSON encoding, tracebacks and the write
+    itself happen on the listener thread. When the queue is full records
+    are dropped and counted, and the count is logged once there is room.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Return a copy of the record with its message interpolated."""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Queue the record, or drop it if the queue is full."""
+        if self.dropped:
+            try:
+                self.queue.put_nowait(self._dropped_record(record))
+            except queue.Full:
+                self.dropped += 1
+                return
+            self.dropped = 0
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _dropped_record(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Build the warning reporting dropped records."""
+        warning = logging.LogRecord(
+            "chatbot.logging", logging.WARNING, __file__, 0,
+            f"Dropped {self.dropped} log records, the log queue was full", None, None
+        )
+        warning.request_id = record.request_id
+        return warning
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    """Queue listener that can be stopped while the queue is full."""
+
+    def enqueue_sentinel(self) -> None:
+        """Wait for room for the stop marker instead of failing."""
+        self.queue.put(self._sentinel)
+
+
 def setup_logging() -> None:
-    """Configure application logging."""
-    
+    """
+    Configure application logging.
+
+    With ``log_queue_size`` above zero, records are put on a bounded queue
+    and formatted and written by a listener thread, so logging never blocks
+    the event loop on stdout. With zero they are written synchronously.
+    """
+    global _listener, _output_handler
+    shutdown_logging()
+
+    level = getattr(logging, settings.log_level.upper())
+
     # Create logger
     logger = logging.getLogger("chatbot")
-    logger.setLevel(getattr(logging, settings.log_level.upper()))
-    
+    logger.setLevel(level)
+
     # Remove existing handlers
     logger.handlers.clear()
-    
+
     # Create console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(getattr(logging, settings.log_level.upper()))
-    
+    console_handler.setLevel(level)
+
     # Create formatter
     if settings.environment == "production":
-        # JSON-like structured format for production
-        formatter = ContextualFormatter(
-            '{"timestamp": "%(asctime)s", "level": "%(levelname)s", '
-            '"request_id": "%(request_id)s", "name": "%(name)s", '
-            '"message": "%(message)s"}'
-        )
+        # One JSON object per line for production
+        formatter: logging.Formatter = JSONFormatter()
     else:
         # Human-readable format for development
         formatter = ContextualFormatter(
             "%(asctime)s - %(levelname)s - [%(request_id)s] - %(name)s - %(message)s"
         )
-    
+
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
+    _output_handler = console_handler
+
+    if settings.log_queue_size > 0:
+        queue_handler = _QueueHandler(queue.Queue(settings.log_queue_size))
+        queue_handler.setLevel(level)
+        queue_handler.addFilter(RequestIdFilter())
+        _listener = _QueueListener(queue_handler.queue, console_handler)
+        _listener.start()
+        logger.addHandler(queue_handler)
+    else:
+        logger.addHandler(console_handler)
+
     # Prevent propagation to root logger
     logger.propagate = False
 
 
+def shutdown_logging() -> None:
+    """
+    Write out queued records and stop the listener thread.
+
+    Records logged afterwards are written synchronously.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+
+    logger = logging.getLogger("chatbot")
+    logger.handlers.clear()
+    if _output_handler is not None:
+        logger.addHandler(_output_handler)
+
+
+atexit.register(shutdown_logging)
+
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance with the given name."""
     return logging.getLogger(f"chatbot.{name}")
@@ -0,0 +1,223 @@
+"""Prometheus metrics for chat turn stages, streams, LLM calls and Redis round trips."""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from src.core.config import settings
+from src.core.logging import get_logger
+
+try:
+    import prometheus_client
+except ImportError:
+    prometheus_client = None
+
+logger = get_logger("core.metrics")
+
+# Stage durations (ms) recorded in the current request, for Server-Timing
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+# Seconds; from tokenizer-sized work up to a long generation
+_STAGE_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+_REDIS_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+_SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class _NoopMetric:
+    """Stands in for every metric when metrics are off."""
+
+    def labels(self, *args, **kwargs) -> "_NoopMetric":
+        return self
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+    def observe(self, value: float) -> None:
+        pass
+
+
+_NOOP = _NoopMetric()
+
+
+class Metrics:
+    """
+    Application metrics, exported in the Prometheus text format.
+
+    Everything is recorded in process with plain counter and histogram
+    updates, so metrics are cheap enough to keep on; they are only
+    serialized when ``/metrics`` is scraped. Without ``prometheus_client``
+    (or with ``metrics_enabled`` off) every call is a no-op.
+
+    Stage durations are also collected per request while ``collect_timings``
+    is active, for the ``Server-Timing`` header.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None):
+        """
+        Initialize the metrics.
+
+        Args:
+            enabled: Record metrics (uses config if None)
+        """
+        enabled = settings.metrics_enabled if enabled is None else enabled
+        if enabled and prometheus_client is None:
+            logger.warning("prometheus_client is not installed, metrics are disabled")
+        self.enabled = enabled and prometheus_client is not None
+        self.registry = None
+
+        if not self.enabled:
+            self.stage_seconds = self.turns = self.active_streams = _NOOP
+            self.stream_events = self.stream_bytes = _NOOP
+            self.redis_round_trips = self.redis_seconds = self.redis_bytes = _NOOP
+            self.llm_retries = self.llm_hedges = _NOOP
+            return
+
+        # A registry of our own, so instances do not clash on registration
+        self.registry = prometheus_client.CollectorRegistry()
+        prometheus_client.ProcessCollector(registry=self.registry)
+        prometheus_client.PlatformCollector(registry=self.registry)
+        prometheus_client.GCCollector(registry=self.registry)
+
+        self.stage_seconds = prometheus_client.Histogram(
+            "chatbot_chat_stage_seconds",
+            "Duration of chat turn stages",
+            ["stage"],
+            buckets=_STAGE_BUCKETS,
+            registry=self.registry
+        )
+        self.turns = prometheus_client.Counter(
+            "chatbot_chat_turns_total",
+            "Chat turns by mode (stream or complete) and outcome",
+            ["mode", "outcome"],
+            registry=self.registry
+        )
+        self.active_streams = prometheus_client.Gauge(
+            "chatbot_active_streams",
+            "SSE responses currently streaming",
+            registry=self.registry
+        )
+        self.stream_events = prometheus_client.Counter(
+            "chatbot_stream_events_total",
+            "SSE events sent to clients",
+            registry=self.registry
+        )
+        self.stream_bytes = prometheus_client.Counter(
+            "chatbot_stream_bytes_total",
+            "Bytes of SSE events sent to clients",
+            registry=self.registry
+        )
+        self.redis_round_trips = prometheus_client.Counter(
+            "chatbot_redis_round_trips_total",
+            "Conversation memory round trips to Redis",
+            ["operation"],
+            registry=self.registry
+        )
+        self.redis_seconds = prometheus_client.Histogram(
+            "chatbot_redis_round_trip_seconds",
+            "Duration of conversation memory round trips to Redis",
+            ["operation"],
+            buckets=_REDIS_BUCKETS,
+            registry=self.registry
+        )
+        self.redis_bytes = prometheus_client.Histogram(
+            "chatbot_redis_payload_bytes",
+            "Payload size of conversation memory round trips to Redis",
+            ["operation", "direction"],
+            buckets=_SIZE_BUCKETS,
+            registry=self.registry
+        )
+        self.llm_retries = prometheus_client.Counter(
+            "chatbot_llm_retries_total",
+            "LLM attempts retried after failing before the first chunk",
+            ["model"],
+            registry=self.registry
+        )
+        self.llm_hedges = prometheus_client.Counter(
+            "chatbot_llm_hedges_total",
+            "Hedged LLM requests started because no first chunk arrived in time",
+            ["model"],
+            registry=self.registry
+        )
+
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        """
+        Record the duration of a turn stage.
+
+        Args:
+            stage: Stage name (e.g. 'history', 'prune', 'llm_first_token')
+            seconds: Duration
+        """
+        self.stage_seconds.labels(stage).observe(seconds)
+        timings = _timings.get()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + seconds * 1000
+
+    @contextmanager
+    def collect_timings(self) -> Iterator[Dict[str, float]]:
+        """
+        Collect the stage durations (ms) recorded in this context.
+
+        Yields:
+            dict: Filled in as stages are observed
+        """
+        timings: Dict[str, float] = {}
+        token = _timings.set(timings)
+        try:
+            yield timings
+        finally:
+            _timings.reset(token)
+
+    def record_turn(self, mode: str, outcome: str) -> None:
+        """Count a finished turn ('done', 'error', 'disconnected', 'busy', ...)."""
+        self.turns.labels(mode, outcome).inc()
+
+    def record_llm_retry(self, model: str) -> None:
+        """Count a retried LLM attempt."""
+        self.llm_retries.labels(model).inc()
+
+    def record_llm_hedge(self, model: str) -> None:
+        """Count a hedged LLM request."""
+        self.llm_hedges.labels(model).inc()
+
+    def observe_redis(self, operation: str, seconds: float, sent: int, received: int) -> None:
+        """
+        Record a Redis round trip.
+
+        Args:
+            operation: Memory operation that made it
+            seconds: Duration
+            sent: Bytes of command arguments
+            received: Bytes of reply payload
+        """
+        self.redis_round_trips.labels(operation).inc()
+        self.redis_seconds.labels(operation).observe(seconds)
+        self.redis_bytes.labels(operation, "sent").observe(sent)
+        self.redis_bytes.labels(operation, "received").observe(received)
+
+    def render(self) -> Tuple[bytes, str]:
+        """
+        Serialize all metrics for a scrape.
+
+        Returns:
+            Tuple of (body, content type)
+        """
+        return prometheus_client.generate_latest(self.registry), prometheus_client.CONTENT_TYPE_LATEST
+
+
+def payload_size(value: Any) -> int:
+    """Return the bytes in a Redis reply or argument list (strings and bytes, nested)."""
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(payload_size(item) for item in value)
+    return 0
+
+
+# Global metrics instance
+metrics = Metrics()
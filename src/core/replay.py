@@ -0,0 +1,55 @@
+"""Replay buffers for fanning one event stream out to several readers."""
+
+import asyncio
+from typing import Any, AsyncIterator, List
+
+
+class ReplayBuffer:
+    """
+    Records the items of a stream so readers can join at any time.
+
+    Every reader receives all items from the beginning, then follows new
+    ones as they are published, until the buffer is closed.
+    """
+
+    def __init__(self):
+        """Initialize an empty, open buffer."""
+        self.items: List[Any] = []
+        self.closed = False
+        self._changed = asyncio.Event()
+
+    def _notify(self) -> None:
+        """Wake current readers; later waits use a fresh event."""
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def publish(self, item: Any) -> None:
+        """
+        Append an item and wake waiting readers.
+
+        Args:
+            item: Item to record
+        """
+        self.items.append(item)
+        self._notify()
+
+    def close(self) -> None:
+        """Mark the stream as complete; readers stop after the last item."""
+        self.closed = True
+        self._notify()
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        """
+        Yield every item from the beginning, then new ones until closed.
+
+        Yields:
+            Recorded items, in publication order
+        """
+        index = 0
+        while True:
+            while index < len(self.items):
+                yield self.items[index]
+                index += 1
+            if self.closed:
+                return
+            await self._changed.wait()
@@ -1,7 +1,9 @@
 """Base LLM client abstraction for provider-agnostic interface."""
 
+import hashlib
+import json
 from abc import ABC, abstractmethod
-from typing import AsyncIterator, List, Dict, Any
+from typing import AsyncIterator, List, Dict, Any, Optional
 
 
 class BaseLLMClient(ABC):
@@ -42,6 +44,9 @@ class BaseLLMClient(ABC):
         """
         Generate complete (non-streaming) response from the LLM.
         
+        The default collects the streamed tokens. Providers with a
+        non-streaming API should override this with a direct call.
+        
         Args:
             messages: List of message dicts with 'role' and 'content' keys
             **kwargs: Additional provider-specific parameters
@@ -57,3 +62,53 @@ class BaseLLMClient(ABC):
         async for chunk in self.generate_stream(messages, **kwargs):
             chunks.append(chunk)
         return "".join(chunks)
+    
+    def model_settings(self) -> Dict[str, Any]:
+        """
+        Return the settings that shape responses (model name, sampling...).
+        
+        Used to tell requests apart; providers should list every setting
+        that can change the output.
+        
+        Returns:
+            dict: Setting names and values
+        """
+        return {}
+    
+    def request_key(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> str:
+        """
+        Return a stable hash identifying a request.
+        
+        Covers the messages as the provider sees them (roles other than
+        'system' and 'assistant' are sent as 'user'), the model settings and
+        any extra parameters, so equal keys mean interchangeable responses.
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content' keys
+            **kwargs: Additional provider-specific parameters
+            
+        Returns:
+            str: Hex digest
+        """
+        normalized = [
+            [
+                msg.get("role") if msg.get("role") in ("system", "assistant") else "user",
+                msg.get("content", "")
+            ]
+            for msg in messages
+        ]
+        payload = json.dumps(
+            [normalized, self.model_settings(), kwargs],
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """Return client counters (None if the client keeps none)."""
+        return None
@@ -0,0 +1,71 @@
+"""LLM client selection."""
+
+import os
+from typing import Dict
+
+from src.core.config import settings
+from src.llm.base import BaseLLMClient
+
+
+def create_llm_backend(spec: str) -> BaseLLMClient:
+    """
+    Create an LLM client from a backend spec.
+    
+    Specs have the form ``provider:model``, optionally followed by
+    ``:ENV_VAR`` naming the environment variable holding the API key
+    (``gemini_api_key`` is used otherwise). The ``fake`` provider streams
+    synthetic replies shaped by the ``fake_llm_*`` settings.
+    
+    Args:
+        spec: Backend spec, e.g. ``gemini:gemini-2.5-flash``
+        
+    Returns:
+        BaseLLMClient: The client
+        
+    Raises:
+        ValueError: If the spec is malformed, the provider unknown or the
+            key variable unset
+    """
+    provider, _, rest = spec.partition(":")
+    model, _, key_var = rest.partition(":")
+    api_key = None
+    if key_var:
+        api_key = os.environ.get(key_var)
+        if not api_key:
+            raise ValueError(f"Environment variable '{key_var}' for LLM backend '{spec}' is not set")
+
+    if provider == "gemini":
+        from src.llm.gemini_client import GeminiClient
+        return GeminiClient(model=model or None, api_key=api_key)
+    if provider == "fake":
+        from src.llm.fake_client import FakeLLMClient
+        return FakeLLMClient()
+    raise ValueError(f"Unknown LLM provider in backend '{spec}'. Use 'gemini' or 'fake'.")
+
+
+def create_llm_client() -> BaseLLMClient:
+    """
+    Create the LLM client for the configured backends.
+    
+    Several backends are wrapped in a ``RoutedLLMClient``; with none
+    configured, a Gemini client for ``gemini_model`` is used.
+    
+    Returns:
+        BaseLLMClient: The client
+    """
+    if not settings.llm_backends:
+        from src.llm.gemini_client import GeminiClient
+        return GeminiClient()
+    if len(settings.llm_backends) == 1:
+        return create_llm_backend(settings.llm_backends[0])
+
+    from src.llm.router import RoutedLLMClient
+    backends: Dict[str, BaseLLMClient] = {}
+    for spec in settings.llm_backends:
+        # Key variables stay out of backend names (logs and stats)
+        provider, _, rest = spec.partition(":")
+        name = f"{provider}:{rest.partition(':')[0]}"
+        if name in backends:
+            name = f"{name}#{sum(1 for other in backends if other.startswith(name))}"
+        backends[name] = create_llm_backend(spec)
+    return RoutedLLMClient(backends)
@@ -0,0 +1,156 @@
+"""Deterministic fake LLM client for load tests and offline development."""
+
+import asyncio
+import hashlib
+import json
+import random
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.llm.base import BaseLLMClient
+
+logger = get_logger("llm.fake")
+
+_WORDS = (
+    "the a to of and in is it you that for on with as be this are can redis "
+    "session stream token memory reply model cache latency request server "
+    "history message chunk window budget shard queue event client worker"
+).split()
+
+
+class FakeLLMError(Exception):
+    """Injected failure of the fake client."""
+
+
+class FakeLLMClient(BaseLLMClient):
+    """
+    Streams synthetic replies without calling a provider.
+
+    The reply is derived from the messages, so the same conversation always
+    gets the same text (and cache and coalescing behave as with a real
+    model). Chunk size, delays and error injection are configurable; errors
+    are drawn from a seeded generator, so a run is reproducible.
+    """
+
+    def __init__(
+        self,
+        reply_tokens: Optional[int] = None,
+        chunk_tokens: Optional[int] = None,
+        first_token_delay: Optional[float] = None,
+        token_delay: Optional[float] = None,
+        error_rate: Optional[float] = None,
+        midstream_error_rate: Optional[float] = None,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize the client (unset arguments use config).
+
+        Args:
+            reply_tokens: Tokens (words) per reply
+            chunk_tokens: Tokens per streamed chunk
+            first_token_delay: Seconds before the first chunk
+            token_delay: Seconds per token after the first chunk
+            error_rate: Fraction of calls failing before the first chunk
+            midstream_error_rate: Fraction of calls failing halfway through
+            seed: Seed of the error injection
+        """
+        self.reply_tokens = settings.fake_llm_reply_tokens if reply_tokens is None else reply_tokens
+        self.chunk_tokens = max(1, settings.fake_llm_chunk_tokens if chunk_tokens is None else chunk_tokens)
+        self.first_token_delay = (
+            settings.fake_llm_first_token_delay_ms / 1000 if first_token_delay is None else first_token_delay
+        )
+        self.token_delay = settings.fake_llm_token_delay_ms / 1000 if token_delay is None else token_delay
+        self.error_rate = settings.fake_llm_error_rate if error_rate is None else error_rate
+        self.midstream_error_rate = (
+            settings.fake_llm_midstream_error_rate if midstream_error_rate is None else midstream_error_rate
+        )
+        self._rng = random.Random(settings.fake_llm_seed if seed is None else seed)
+
+        self.calls = 0
+        self.errors = 0
+        self.tokens = 0
+        logger.info(
+            "Initialized fake LLM client: %s tokens per reply, %s per chunk",
+            self.reply_tokens, self.chunk_tokens
+        )
+
+    def model_settings(self) -> Dict[str, Any]:
+        """Return the reply shape, which determines the response."""
+        return {"model": "fake", "reply_tokens": self.reply_tokens}
+
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """Return call, error and token counters."""
+        return {"fake": {"calls": self.calls, "errors": self.errors, "tokens": self.tokens}}
+
+    def _reply(self, messages: List[Dict[str, str]]) -> List[str]:
+        """Build the reply tokens for a conversation."""
+        digest = hashlib.sha256(
+            json.dumps([[m.get("role"), m.get("content")] for m in messages]).encode("utf-8")
+        ).digest()
+        rng = random.Random(digest)
+        return [rng.choice(_WORDS) for _ in range(self.reply_tokens)]
+
+    def _fail(self, message: str) -> None:
+        """Count and raise an injected error."""
+        self.errors += 1
+        raise FakeLLMError(message)
+
+    async def generate_stream(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream a synthetic reply.
+
+        Args:
+            messages: Conversation history in generic format
+            **kwargs: Ignored
+
+        Yields:
+            str: Chunks of ``chunk_tokens`` words
+
+        Raises:
+            FakeLLMError: When an error is injected
+        """
+        self.calls += 1
+        words = self._reply(messages)
+        fail_before = self._rng.random() < self.error_rate
+        fail_midway = not fail_before and self._rng.random() < self.midstream_error_rate
+
+        await asyncio.sleep(self.first_token_delay)
+        if fail_before:
+            self._fail("Injected failure before the first chunk")
+
+        for start in range(0, len(words), self.chunk_tokens):
+            if fail_midway and start >= len(words) // 2:
+                self._fail("Injected failure mid-stream")
+            if start:
+                await asyncio.sleep(self.token_delay * self.chunk_tokens)
+            chunk = words[start:start + self.chunk_tokens]
+            self.tokens += len(chunk)
+            yield (" " if start else "") + " ".join(chunk)
+
+    async def generate(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> str:
+        """
+        Generate a complete synthetic reply, taking as long as streaming it would.
+
+        Args:
+            messages: Conversation history in generic format
+            **kwargs: Ignored
+
+        Returns:
+            str: Complete reply
+
+        Raises:
+            FakeLLMError: When an error is injected
+        """
+        chunks = []
+        async for chunk in self.generate_stream(messages, **kwargs):
+            chunks.append(chunk)
+        return "".join(chunks)
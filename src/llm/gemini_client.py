@@ -1,15 +1,64 @@
 """Gemini LLM client using LangChain for minimal abstraction."""
 
-from typing import AsyncIterator, List, Dict
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, List, Dict, Optional, Tuple
+from google.api_core.exceptions import ClientError, TooManyRequests
 from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_google_genai.chat_models import ChatGoogleGenerativeAIError
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from tenacity import AsyncRetrying, RetryCallState, retry_if_exception, stop_after_attempt, wait_random_exponential
 
 from src.llm.base import BaseLLMClient
 from src.core.config import settings
 from src.core.logging import get_logger
+from src.core.metrics import metrics
 
 logger = get_logger("llm.gemini")
 
+# Time-to-first-chunk samples the hedging deadline is computed from
+_TTFT_WINDOW = 200
+# Samples needed before the percentile is trusted (until then the
+# maximum hedge delay applies)
+_TTFT_MIN_SAMPLES = 20
+
+
+def _is_retryable(error: BaseException) -> bool:
+    """Return True for errors worth another attempt (not bad requests)."""
+    # Cancellation reaches the retry policy too and must propagate
+    if not isinstance(error, Exception) or isinstance(error, ChatGoogleGenerativeAIError):
+        return False
+    if isinstance(error, ClientError) and not isinstance(error, TooManyRequests):
+        return False
+    return True
+
+
+class _LatencyWindow:
+    """Rolling window of latency samples."""
+
+    def __init__(self, size: int):
+        """
+        Initialize the window.
+
+        Args:
+            size: Samples kept; older ones are dropped
+        """
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        """Record a sample."""
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the given percentile, or None with too few samples."""
+        if len(self._samples) < _TTFT_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        index = math.ceil(pct / 100 * len(ordered)) - 1
+        return ordered[min(max(index, 0), len(ordered) - 1)]
+
 
 class GeminiClient(BaseLLMClient):
     """
@@ -18,18 +67,170 @@ class GeminiClient(BaseLLMClient):
     This is the ONLY place where LangChain is used - as a thin wrapper
     around the Gemini API. All other logic (memory, history, etc.) is
     implemented manually.
+    
+    Failures before the first chunk are retried with jittered exponential
+    backoff; once a chunk has been yielded, errors propagate, since a retry
+    would repeat text the caller already has. An attempt that produces no
+    chunk within a deadline (a percentile of recent time-to-first-chunk) is
+    hedged with a second one; the first to stream wins and the other is
+    cancelled.
     """
     
-    def __init__(self):
-        """Initialize the Gemini client with configuration."""
+    def __init__(self, model: Optional[str] = None, api_key: Optional[str] = None):
+        """
+        Initialize the Gemini client with configuration.
+        
+        Args:
+            model: Model name (uses config if None)
+            api_key: API key (uses config if None)
+        """
+        self.model_name = model or settings.gemini_model
         self.model = ChatGoogleGenerativeAI(
-            model=settings.gemini_model,
-            google_api_key=settings.gemini_api_key,
+            model=self.model_name,
+            google_api_key=api_key or settings.gemini_api_key,
             temperature=settings.gemini_temperature,
             max_tokens=settings.gemini_max_tokens,
-            streaming=True
+            streaming=True,
+            # Retries are ours (see _retrying), so llm_retry_attempts bounds the attempts
+            max_retries=0
         )
-        logger.info(f"Initialized Gemini client with model: {settings.gemini_model}")
+        self.ttft = _LatencyWindow(_TTFT_WINDOW)
+        self.attempts = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        logger.info("Initialized Gemini client with model: %s", self.model_name)
+    
+    def model_settings(self) -> Dict[str, Any]:
+        """Return the model name and sampling settings."""
+        return {
+            "model": self.model_name,
+            "temperature": settings.gemini_temperature,
+            "max_tokens": settings.gemini_max_tokens,
+        }
+    
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """Return attempt, retry and hedging counters."""
+        return {
+            "gemini": {
+                "attempts": self.attempts,
+                "retries": self.retries,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "ttft_p50_seconds": self.ttft.percentile(50),
+                "ttft_p95_seconds": self.ttft.percentile(95),
+                "hedge_delay_seconds": self._hedge_delay(),
+            }
+        }
+    
+    def _hedge_delay(self) -> Optional[float]:
+        """Return seconds without a first chunk before hedging (None = never)."""
+        if settings.llm_hedge_percentile <= 0:
+            return None
+        observed = self.ttft.percentile(settings.llm_hedge_percentile)
+        if observed is None:
+            return settings.llm_hedge_max_delay_seconds
+        return min(max(observed, settings.llm_hedge_min_delay_seconds), settings.llm_hedge_max_delay_seconds)
+    
+    def _retrying(self) -> AsyncRetrying:
+        """Build the retry policy for failures before any output."""
+        return AsyncRetrying(
+            stop=stop_after_attempt(max(1, settings.llm_retry_attempts)),
+            wait=wait_random_exponential(
+                multiplier=settings.llm_retry_backoff_seconds,
+                max=settings.llm_retry_max_backoff_seconds
+            ),
+            retry=retry_if_exception(_is_retryable),
+            before_sleep=self._on_retry,
+            reraise=True
+        )
+    
+    def _on_retry(self, retry_state: RetryCallState) -> None:
+        """Count and log a retry."""
+        self.retries += 1
+        metrics.record_llm_retry(self.model_name)
+        logger.warning(
+            "Gemini attempt %s failed before the first chunk, retrying in %.2fs: %s",
+            retry_state.attempt_number, retry_state.next_action.sleep, retry_state.outcome.exception()
+        )
+    
+    async def _open(self, langchain_messages: List) -> Tuple[AsyncIterator, Optional[str], float]:
+        """
+        Start a stream and read up to its first non-empty chunk.
+        
+        Args:
+            langchain_messages: Messages in LangChain format
+            
+        Returns:
+            Tuple of the stream (positioned after the first chunk), the first
+            chunk (None if the response was empty) and the seconds it took
+        """
+        self.attempts += 1
+        start = time.perf_counter()
+        stream = self.model.astream(langchain_messages)
+        try:
+            async for chunk in stream:
+                if hasattr(chunk, 'content') and chunk.content:
+                    return stream, chunk.content, time.perf_counter() - start
+        except BaseException:
+            # Also runs when a losing hedge is cancelled, aborting its request
+            await stream.aclose()
+            raise
+        return stream, None, time.perf_counter() - start
+    
+    async def _first_chunk(self, langchain_messages: List) -> Tuple[AsyncIterator, Optional[str]]:
+        """
+        Run one (possibly hedged) attempt until a stream produces its first chunk.
+        
+        Args:
+            langchain_messages: Messages in LangChain format
+            
+        Returns:
+            Tuple of the winning stream and its first chunk
+            
+        Raises:
+            Exception: The last error, if every attempt failed
+        """
+        loop = asyncio.get_running_loop()
+        delay = self._hedge_delay()
+        deadline = None if delay is None else loop.time() + delay
+        primary = asyncio.create_task(self._open(langchain_messages))
+        pending = {primary}
+        hedged = False
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                timeout = None if hedged or deadline is None else max(0.0, deadline - loop.time())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    self.hedges += 1
+                    metrics.record_llm_hedge(self.model_name)
+                    logger.info("No first chunk after %.2fs, hedging with a second request", delay)
+                    pending.add(asyncio.create_task(self._open(langchain_messages)))
+                    continue
+                
+                winner = None
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                    elif winner is None:
+                        winner = task
+                    else:
+                        # Both attempts started streaming at once; drop one
+                        await task.result()[0].aclose()
+                if winner is not None:
+                    stream, first, elapsed = winner.result()
+                    self.ttft.add(elapsed)
+                    if winner is not primary:
+                        self.hedge_wins += 1
+                    return stream, first
+                # A failure before the deadline is left to the retry policy
+                # rather than hedged
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
     
     def _convert_messages(self, messages: List[Dict[str, str]]) -> List:
         """
@@ -75,15 +276,62 @@ class GeminiClient(BaseLLMClient):
             # Convert to LangChain message format
             langchain_messages = self._convert_messages(messages)
             
-            logger.info(f"Generating streaming response with {len(messages)} messages")
+            logger.info("Generating streaming response with %s messages", len(messages))
             
-            # Stream response using LangChain's astream
-            async for chunk in self.model.astream(langchain_messages):
-                if hasattr(chunk, 'content') and chunk.content:
-                    yield chunk.content
+            async for attempt in self._retrying():
+                with attempt:
+                    stream, first = await self._first_chunk(langchain_messages)
+            
+            try:
+                if first is not None:
+                    yield first
+                async for chunk in stream:
+                    if hasattr(chunk, 'content') and chunk.content:
+                        yield chunk.content
+            finally:
+                await stream.aclose()
             
             logger.info("Streaming response completed")
             
+        except asyncio.CancelledError:
+            # Closing astream aborts the request, so no more tokens are billed
+            logger.info("Streaming response cancelled")
+            raise
+        except Exception as e:
+            logger.error("Error generating streaming response: %s", e)
+            raise
+    
+    async def generate(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> str:
+        """
+        Generate a complete response with a single non-streaming call.
+        
+        Args:
+            messages: Conversation history in generic format
+            **kwargs: Additional parameters (unused for now)
+            
+        Returns:
+            str: Complete response from Gemini
+        """
+        try:
+            langchain_messages = self._convert_messages(messages)
+            
+            logger.info("Generating response with %s messages", len(messages))
+            
+            # ainvoke without streaming callbacks issues one generate_content
+            # request instead of consuming a stream. Nothing is returned
+            # until it completes, so any failure can be retried.
+            async for attempt in self._retrying():
+                with attempt:
+                    self.attempts += 1
+                    response = await self.model.ainvoke(langchain_messages)
+            
+            logger.info("Response completed")
+            return response.content
+            
         except Exception as e:
-            logger.error(f"Error generating streaming response: {str(e)}")
+            logger.error("Error generating response: %s", e)
             raise
@@ -0,0 +1,336 @@
+"""Response cache for repeated LLM requests, in process and in Redis."""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.llm.base import BaseLLMClient
+from src.memory.sharding import RedisShardRouter
+
+logger = get_logger("llm.response_cache")
+
+# Stores an entry and evicts least recently used entries beyond the budget.
+# KEYS[1] = entry key, KEYS[2] = LRU index (zset of entry keys by last use),
+# KEYS[3] = entry sizes (hash), KEYS[4] = total bytes counter
+# ARGV[1] = value, ARGV[2] = TTL in seconds, ARGV[3] = byte budget, ARGV[4] = now (ms)
+# Expired entries stay in the index until evicted, so they keep counting
+# towards the budget and are the first to go.
+STORE_SCRIPT = """
+local size = string.len(ARGV[1])
+local old = tonumber(redis.call('HGET', KEYS[3], KEYS[1]) or '0')
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('HSET', KEYS[3], KEYS[1], size)
+redis.call('ZADD', KEYS[2], ARGV[4], KEYS[1])
+local total = redis.call('INCRBY', KEYS[4], size - old)
+local evicted = 0
+while total > tonumber(ARGV[3]) do
+    local oldest = redis.call('ZPOPMIN', KEYS[2])
+    if #oldest == 0 then
+        break
+    end
+    local freed = tonumber(redis.call('HGET', KEYS[3], oldest[1]) or '0')
+    redis.call('HDEL', KEYS[3], oldest[1])
+    redis.call('DEL', oldest[1])
+    total = redis.call('DECRBY', KEYS[4], freed)
+    evicted = evicted + 1
+end
+return evicted
+"""
+
+# All cache keys share one hash tag, so the script's keys live on one node
+_CACHE_TAG = "llm-cache"
+
+
+def _temperatures(model_settings: Dict[str, Any]) -> List[float]:
+    """List the sampling temperatures in model settings (routers list several backends)."""
+    if "backends" in model_settings:
+        return [t for backend in model_settings["backends"] for t in _temperatures(backend)]
+    # Clients without a temperature (the fake client) reply deterministically
+    return [model_settings.get("temperature") or 0.0]
+
+
+class _LocalTier:
+    """Byte-bounded LRU of cached responses with a per-entry TTL."""
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        """
+        Initialize the tier.
+
+        Args:
+            max_bytes: Total response size kept
+            ttl_seconds: Seconds an entry stays valid
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.bytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, List[str], int]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """Return the cached chunks of a response, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, chunks, size = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return chunks
+
+    def put(self, key: str, chunks: List[str], size: int) -> None:
+        """Store a response, evicting the least recently used ones if over budget."""
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, chunks, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        """Drop an entry."""
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CachedLLMClient(BaseLLMClient):
+    """
+    Serves repeated requests from a response cache.
+
+    Responses are keyed by ``request_key`` (messages, model settings and
+    parameters), so only an identical conversation hits. Lookups try a
+    local in-process tier, then Redis; a Redis hit fills the local tier.
+    Responses are stored with their original chunk boundaries and replayed
+    chunk by chunk, so hits take the normal streaming path.
+
+    Only requests sampled at up to ``response_cache_max_temperature`` are
+    cached; at higher temperatures each call should get a fresh sample, so
+    they bypass both lookup and store.
+
+    The cache is best effort: Redis errors count as misses.
+    """
+
+    def __init__(self, inner: BaseLLMClient, shards: Optional[RedisShardRouter] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            inner: Client answering cache misses
+            shards: Redis shards to store responses on (connects from settings if None)
+        """
+        self.inner = inner
+        self.shards = shards
+        self.local = _LocalTier(settings.response_cache_local_max_bytes, settings.response_cache_ttl_seconds)
+        self._store_script = None
+        self._pending: Set[asyncio.Task] = set()
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.stores = 0
+        self.redis_evictions = 0
+        self.errors = 0
+        self.bypassed = 0
+
+    async def connect(self):
+        """Connect to the configured Redis shards."""
+        if self.shards is None:
+            self.shards = await RedisShardRouter.from_settings()
+
+    async def disconnect(self):
+        """Close Redis connections."""
+        if self.shards is not None:
+            await self.shards.close()
+            self.shards = None
+
+    async def _client(self):
+        """Return the client of the shard holding the cache, connecting if needed."""
+        if self.shards is None:
+            await self.connect()
+        return self.shards.client_for(_CACHE_TAG)
+
+    def _get_key(self, name: str) -> str:
+        """Get Redis key of a cache entry or structure."""
+        return f"llm:cache:{self.shards.key_tag(_CACHE_TAG)}:{name}"
+
+    def model_settings(self) -> Dict[str, Any]:
+        """Return the wrapped client's model settings."""
+        return self.inner.model_settings()
+
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """Return cache counters, merged with the wrapped client's."""
+        hits = self.local_hits + self.redis_hits
+        lookups = hits + self.misses
+        return {
+            "response_cache": {
+                "hits": hits,
+                "local_hits": self.local_hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "bytes_saved": self.bytes_saved,
+                "stores": self.stores,
+                "errors": self.errors,
+                "bypassed": self.bypassed,
+                "local_entries": len(self.local),
+                "local_bytes": self.local.bytes,
+                "local_evictions": self.local.evictions,
+                "redis_evictions": self.redis_evictions,
+            },
+            **(self.inner.stats() or {}),
+        }
+
+    def _cacheable(self, **kwargs) -> bool:
+        """Return True if the request's temperature allows serving it from the cache."""
+        if "temperature" in kwargs:
+            temperatures = [kwargs["temperature"] or 0.0]
+        else:
+            temperatures = _temperatures(self.model_settings())
+        if max(temperatures) <= settings.response_cache_max_temperature:
+            return True
+        self.bypassed += 1
+        return False
+
+    async def _lookup(self, key: str) -> Optional[List[str]]:
+        """Return cached chunks from the local tier or Redis, counting the result."""
+        chunks = self.local.get(key)
+        if chunks is not None:
+            self.local_hits += 1
+            return chunks
+
+        try:
+            client = await self._client()
+            entry_key = self._get_key(key)
+            pipe = client.pipeline(transaction=False)
+            pipe.get(entry_key)
+            pipe.zadd(self._get_key("lru"), {entry_key: int(time.time() * 1000)}, xx=True)
+            raw, _ = await pipe.execute()
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Response cache lookup failed: %s", e)
+            raw = None
+
+        if raw is None:
+            self.misses += 1
+            return None
+
+        self.redis_hits += 1
+        chunks = json.loads(raw)
+        self.local.put(key, chunks, len(raw))
+        return chunks
+
+    async def _store(self, key: str, chunks: List[str]) -> None:
+        """Store a response in both tiers."""
+        if not chunks:
+            return
+        raw = json.dumps(chunks, ensure_ascii=False).encode("utf-8")
+        if len(raw) > settings.response_cache_max_entry_bytes:
+            return
+        self.local.put(key, chunks, len(raw))
+        try:
+            client = await self._client()
+            if self._store_script is None:
+                self._store_script = client.register_script(STORE_SCRIPT)
+            evicted = await self._store_script(
+                keys=[
+                    self._get_key(key),
+                    self._get_key("lru"),
+                    self._get_key("sizes"),
+                    self._get_key("bytes"),
+                ],
+                args=[
+                    raw,
+                    settings.response_cache_ttl_seconds,
+                    settings.response_cache_max_bytes,
+                    int(time.time() * 1000),
+                ],
+                client=client
+            )
+            self.stores += 1
+            self.redis_evictions += evicted
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Response cache store failed: %s", e)
+
+    def _store_detached(self, key: str, chunks: List[str]) -> None:
+        """Store a response without delaying the caller."""
+        task = asyncio.create_task(self._store(key, chunks))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _count_saved(self, chunks: List[str]) -> None:
+        """Record the response bytes served without an LLM call."""
+        self.bytes_saved += sum(len(chunk.encode("utf-8")) for chunk in chunks)
+
+    async def generate_stream(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response, replaying it from the cache when possible.
+
+        Only responses that streamed to completion are cached.
+
+        Args:
+            messages: Conversation history in generic format
+            **kwargs: Additional provider-specific parameters
+
+        Yields:
+            str: Token chunks
+        """
+        if not self._cacheable(**kwargs):
+            async for chunk in self.inner.generate_stream(messages, **kwargs):
+                yield chunk
+            return
+
+        key = self.request_key(messages, **kwargs)
+        chunks = await self._lookup(key)
+        if chunks is not None:
+            self._count_saved(chunks)
+            for chunk in chunks:
+                yield chunk
+            return
+
+        chunks = []
+        async for chunk in self.inner.generate_stream(messages, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        self._store_detached(key, chunks)
+
+    async def generate(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> str:
+        """
+        Generate a complete response, served from the cache when possible.
+
+        Args:
+            messages: Conversation history in generic format
+            **kwargs: Additional provider-specific parameters
+
+        Returns:
+            str: Complete response
+        """
+        if not self._cacheable(**kwargs):
+            return await self.inner.generate(messages, **kwargs)
+
+        key = self.request_key(messages, **kwargs)
+        chunks = await self._lookup(key)
+        if chunks is not None:
+            self._count_saved(chunks)
+            return "".join(chunks)
+
+        reply = await self.inner.generate(messages, **kwargs)
+        self._store_detached(key, [reply])
+        return reply
@@ -0,0 +1,260 @@
+"""Latency-aware routing of LLM calls across several backends."""
+
+import random
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.llm.base import BaseLLMClient
+
+logger = get_logger("llm.router")
+
+# Weight of the newest sample in the latency and error-rate averages
+_EWMA_ALPHA = 0.2
+# Traffic share of a re-admitted backend at the start of its ramp
+_MIN_RAMP_SHARE = 0.1
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class _Backend:
+    """A routed client with its health: latency, errors and circuit state."""
+
+    def __init__(self, name: str, client: BaseLLMClient):
+        """
+        Initialize the backend.
+
+        Args:
+            name: Name used in logs and stats
+            client: Client making the calls
+        """
+        self.name = name
+        self.client = client
+        self.ttft: Optional[float] = None
+        self.error_rate = 0.0
+        self.in_flight = 0
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.readmitted_at: Optional[float] = None
+
+        self.requests = 0
+        self.errors = 0
+        self.ejections = 0
+
+    def available(self, now: float) -> bool:
+        """Return True if the backend may take a call, moving it to half-open after its cooldown."""
+        if self.state == OPEN and now - self.opened_at >= settings.llm_router_open_seconds:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            # One probe at a time
+            return self.in_flight == 0
+        return self.state == CLOSED
+
+    def share(self, now: float) -> float:
+        """Return the fraction of calls a re-admitted backend is offered."""
+        if self.readmitted_at is None:
+            return 1.0
+        ramp = settings.llm_router_ramp_seconds
+        share = (now - self.readmitted_at) / ramp if ramp > 0 else 1.0
+        if share >= 1.0:
+            self.readmitted_at = None
+            return 1.0
+        return max(share, _MIN_RAMP_SHARE)
+
+    def cost(self) -> float:
+        """Expected wait for a call: latency scaled by load and error rate."""
+        ttft = self.ttft or 0.0
+        return ttft * (self.in_flight + 1) / max(1.0 - self.error_rate, 0.05)
+
+    def record_success(self, ttft: Optional[float]) -> None:
+        """Record a completed call and its time to first token (None if not measured)."""
+        if ttft is not None:
+            self.ttft = ttft if self.ttft is None else self.ttft + _EWMA_ALPHA * (ttft - self.ttft)
+        self.error_rate -= _EWMA_ALPHA * self.error_rate
+        self.consecutive_failures = 0
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+            self.readmitted_at = time.monotonic()
+            logger.info("LLM backend %s recovered, ramping traffic back up", self.name)
+
+    def record_failure(self) -> None:
+        """Record a failed call, ejecting the backend if it keeps failing."""
+        self.errors += 1
+        self.error_rate += _EWMA_ALPHA * (1.0 - self.error_rate)
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or (
+            self.state == CLOSED
+            and self.consecutive_failures >= settings.llm_router_failure_threshold
+        ):
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.readmitted_at = None
+            self.ejections += 1
+            logger.warning(
+                "Ejected LLM backend %s after %s consecutive failures", self.name, self.consecutive_failures
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Return health and counters."""
+        return {
+            "state": self.state,
+            "ttft_ewma_seconds": self.ttft,
+            "error_rate": round(self.error_rate, 6),
+            "in_flight": self.in_flight,
+            "traffic_share": self.share(time.monotonic()),
+            "requests": self.requests,
+            "errors": self.errors,
+            "ejections": self.ejections,
+            "client": self.client.stats(),
+        }
+
+
+class RoutedLLMClient(BaseLLMClient):
+    """
+    Routes each call to one of several backends.
+
+    Two available backends are sampled at random and the one with the lower
+    expected wait (EWMA time to first token, scaled by calls in flight and
+    error rate) is used, so traffic favours fast backends without piling onto
+    one. A backend with ``llm_router_failure_threshold`` consecutive failures
+    is ejected for ``llm_router_open_seconds``; afterwards a single probe call
+    is let through, and on success its share of traffic ramps back up over
+    ``llm_router_ramp_seconds``.
+
+    A call that fails before producing output moves on to another backend.
+    If every backend is ejected, the one ejected longest ago is tried rather
+    than failing outright.
+    """
+
+    def __init__(self, backends: Dict[str, BaseLLMClient]):
+        """
+        Initialize the router.
+
+        Args:
+            backends: Clients to route between, by name
+        """
+        if not backends:
+            raise ValueError("RoutedLLMClient needs at least one backend")
+        self.backends = [_Backend(name, client) for name, client in backends.items()]
+        self.failovers = 0
+
+    def model_settings(self) -> Dict[str, Any]:
+        """Return the model settings of every backend."""
+        return {"backends": [backend.client.model_settings() for backend in self.backends]}
+
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """Return per-backend health and counters."""
+        return {
+            "router": {
+                "failovers": self.failovers,
+                "backends": {backend.name: backend.stats() for backend in self.backends},
+            }
+        }
+
+    def _pick(self, tried: Set[_Backend]) -> Optional[_Backend]:
+        """Choose a backend not yet tried for this call (None if all were)."""
+        now = time.monotonic()
+        untried = [backend for backend in self.backends if backend not in tried]
+        if not untried:
+            return None
+
+        available = [backend for backend in untried if backend.available(now)]
+        if not available:
+            return min(untried, key=lambda backend: backend.opened_at)
+
+        # Backends being re-admitted take part in a growing fraction of picks
+        admitted = [backend for backend in available if random.random() < backend.share(now)]
+        pool = admitted or available
+        if len(pool) == 1:
+            return pool[0]
+        first, second = random.sample(pool, 2)
+        return first if first.cost() <= second.cost() else second
+
+    async def generate_stream(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response from the best available backend.
+
+        Args:
+            messages: Conversation history in generic format
+            **kwargs: Additional provider-specific parameters
+
+        Yields:
+            str: Token chunks
+
+        Raises:
+            Exception: The last backend's error, if none produced a response
+        """
+        tried: Set[_Backend] = set()
+        while True:
+            backend = self._pick(tried)
+            tried.add(backend)
+            backend.requests += 1
+            backend.in_flight += 1
+            start = time.perf_counter()
+            ttft = None
+            try:
+                async for chunk in backend.client.generate_stream(messages, **kwargs):
+                    if ttft is None:
+                        ttft = time.perf_counter() - start
+                    yield chunk
+            except Exception as e:
+                backend.record_failure()
+                if ttft is not None or len(tried) == len(self.backends):
+                    raise
+                self.failovers += 1
+                logger.warning("LLM backend %s failed before responding, trying another: %s", backend.name, e)
+                continue
+            finally:
+                backend.in_flight -= 1
+
+            backend.record_success(time.perf_counter() - start if ttft is None else ttft)
+            return
+
+    async def generate(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> str:
+        """
+        Generate a complete response from the best available backend.
+
+        Args:
+            messages: Conversation history in generic format
+            **kwargs: Additional provider-specific parameters
+
+        Returns:
+            str: Complete response
+
+        Raises:
+            Exception: The last backend's error, if every backend failed
+        """
+        tried: Set[_Backend] = set()
+        while True:
+            backend = self._pick(tried)
+            tried.add(backend)
+            backend.requests += 1
+            backend.in_flight += 1
+            try:
+                reply = await backend.client.generate(messages, **kwargs)
+            except Exception as e:
+                backend.record_failure()
+                if len(tried) == len(self.backends):
+                    raise
+                self.failovers += 1
+                logger.warning("LLM backend %s failed, trying another: %s", backend.name, e)
+                continue
+            finally:
+                backend.in_flight -= 1
+
+            # Latency here covers the whole response, so it does not feed
+            # the time-to-first-token average
+            backend.record_success(None)
+            return reply
@@ -0,0 +1,262 @@
+"""Admission control and fair scheduling of LLM calls."""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+from src.core.logging import get_logger
+from src.llm.base import BaseLLMClient
+
+logger = get_logger("llm.scheduler")
+
+# Who the current request's LLM calls are attributed to (session or API key)
+_tenant: ContextVar[str] = ContextVar("llm_tenant", default="-")
+
+# Weight of the newest sample in the average slot hold time
+_HOLD_EWMA_ALPHA = 0.2
+
+
+def set_tenant(tenant: str) -> None:
+    """Attribute LLM calls made in the current context to a tenant."""
+    _tenant.set(tenant)
+
+
+def get_tenant() -> str:
+    """Return the tenant LLM calls in the current context are attributed to."""
+    return _tenant.get()
+
+
+class SchedulerOverloaded(Exception):
+    """Raised when an LLM call cannot be admitted."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SchedulerQueueFull(SchedulerOverloaded):
+    """Raised when the wait queue is full."""
+
+
+class SchedulerTimeout(SchedulerOverloaded):
+    """Raised when a call waited too long for a slot."""
+
+
+class FairScheduler:
+    """
+    Caps concurrent LLM calls, queueing the excess fairly.
+
+    At most ``max_concurrency`` calls run at once. Further calls wait in a
+    queue of at most ``max_queue`` entries, one FIFO per tenant; freed slots
+    go to the waiting tenants in turn, so a tenant with many queued calls
+    cannot starve the others. Calls fail fast when the queue is full or
+    after waiting ``queue_timeout`` seconds.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency: Calls allowed to run at once
+            max_queue: Calls allowed to wait for a slot
+            queue_timeout: Seconds a call waits before giving up
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.queued = 0
+        self._queues: Dict[str, Deque[asyncio.Future]] = {}
+        # Tenants with waiting calls, in the order they are served
+        self._rotation: Deque[str] = deque()
+
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.avg_hold_seconds = 0.0
+
+    def is_full(self) -> bool:
+        """Return True if a new call would be rejected right away."""
+        return self.active >= self.max_concurrency and self.queued >= self.max_queue
+
+    def retry_after(self) -> int:
+        """Estimate the seconds until a new call could start."""
+        slots_ahead = self.queued + 1
+        return max(1, math.ceil(self.avg_hold_seconds * slots_ahead / self.max_concurrency))
+
+    @asynccontextmanager
+    async def slot(self, tenant: str) -> AsyncIterator[None]:
+        """
+        Hold a slot for the duration of a call.
+
+        Args:
+            tenant: Tenant the call is attributed to
+
+        Raises:
+            SchedulerQueueFull: If the wait queue is full
+            SchedulerTimeout: If no slot freed up within ``queue_timeout``
+        """
+        await self._acquire(tenant)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            held = time.perf_counter() - start
+            self.avg_hold_seconds += _HOLD_EWMA_ALPHA * (held - self.avg_hold_seconds)
+            self._release()
+
+    async def _acquire(self, tenant: str) -> None:
+        """Take a slot, waiting in the tenant's queue if none is free."""
+        if self.active < self.max_concurrency and not self.queued:
+            self.active += 1
+            self.admitted += 1
+            return
+
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise SchedulerQueueFull("LLM request queue is full", self.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues.get(tenant)
+        if queue is None:
+            queue = self._queues[tenant] = deque()
+            self._rotation.append(tenant)
+        queue.append(future)
+        self.queued += 1
+
+        start = time.perf_counter()
+        try:
+            await asyncio.wait({future}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            self._abandon(tenant, future)
+            raise
+        waited = time.perf_counter() - start
+        self.waited += 1
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+        if not future.done():
+            self._abandon(tenant, future)
+            self.timed_out += 1
+            raise SchedulerTimeout(
+                f"No LLM capacity after waiting {self.queue_timeout:g}s", self.retry_after()
+            )
+        self.admitted += 1
+
+    def _abandon(self, tenant: str, future: asyncio.Future) -> None:
+        """Withdraw a waiting call, passing on its slot if one was granted."""
+        if future.done():
+            self._release()
+            return
+        queue = self._queues[tenant]
+        queue.remove(future)
+        self.queued -= 1
+        if not queue:
+            del self._queues[tenant]
+            self._rotation.remove(tenant)
+
+    def _release(self) -> None:
+        """Free a slot, handing it to the next waiting tenant if any."""
+        if not self._rotation:
+            self.active -= 1
+            return
+        tenant = self._rotation.popleft()
+        queue = self._queues[tenant]
+        future = queue.popleft()
+        self.queued -= 1
+        if queue:
+            self._rotation.append(tenant)
+        else:
+            del self._queues[tenant]
+        # The slot passes to the waiter, so active is unchanged
+        future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return occupancy, queue depth and wait-time counters."""
+        return {
+            "in_flight": self.active,
+            "max_concurrency": self.max_concurrency,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "tenants_waiting": len(self._queues),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "wait_seconds_total": round(self.wait_seconds, 6),
+            "wait_seconds_avg": self.wait_seconds / self.waited if self.waited else 0.0,
+            "wait_seconds_max": round(self.max_wait_seconds, 6),
+            "hold_seconds_avg": round(self.avg_hold_seconds, 6),
+        }
+
+
+class ScheduledLLMClient(BaseLLMClient):
+    """
+    Runs every LLM call through a ``FairScheduler``.
+
+    Calls are attributed to the tenant set with ``set_tenant`` in the
+    calling context.
+    """
+
+    def __init__(self, inner: BaseLLMClient, scheduler: FairScheduler):
+        """
+        Initialize the wrapper.
+
+        Args:
+            inner: Client making the upstream requests
+            scheduler: Scheduler granting slots
+        """
+        self.inner = inner
+        self.scheduler = scheduler
+
+    def model_settings(self) -> Dict[str, Any]:
+        """Return the wrapped client's model settings."""
+        return self.inner.model_settings()
+
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """Return scheduler counters, merged with the wrapped client's."""
+        return {"scheduler": self.scheduler.stats(), **(self.inner.stats() or {})}
+
+    async def generate_stream(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response once a slot is free.
+
+        Args:
+            messages: Conversation history in generic format
+            **kwargs: Additional provider-specific parameters
+
+        Yields:
+            str: Token chunks
+        """
+        async with self.scheduler.slot(get_tenant()):
+            async for chunk in self.inner.generate_stream(messages, **kwargs):
+                yield chunk
+
+    async def generate(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> str:
+        """
+        Generate a complete response once a slot is free.
+
+        Args:
+            messages: Conversation history in generic format
+            **kwargs: Additional provider-specific parameters
+
+        Returns:
+            str: Complete response
+        """
+        async with self.scheduler.slot(get_tenant()):
+            return await self.inner.generate(messages, **kwargs)
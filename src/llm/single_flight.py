@@ -0,0 +1,166 @@
+"""Single-flight wrapper sharing identical in-flight LLM requests."""
+
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from src.core.logging import get_logger
+from src.core.replay import ReplayBuffer
+from src.llm.base import BaseLLMClient
+
+logger = get_logger("llm.single_flight")
+
+
+class _Flight:
+    """One upstream request and the callers following it."""
+
+    def __init__(self, source: AsyncIterator[str]):
+        """
+        Start reading the upstream response.
+
+        Args:
+            source: Upstream chunk stream
+        """
+        self.buffer = ReplayBuffer()
+        self.callers = 0
+        self.task = asyncio.create_task(self._run(source))
+        # Also closes the buffer if the task is cancelled before it starts
+        self.task.add_done_callback(lambda _: self.buffer.close())
+
+    async def _run(self, source: AsyncIterator[str]) -> None:
+        """Publish upstream chunks; an error is published as the last item."""
+        try:
+            async for chunk in source:
+                self.buffer.publish(chunk)
+        except Exception as e:
+            self.buffer.publish(e)
+
+
+class SingleFlightLLMClient(BaseLLMClient):
+    """
+    Shares one upstream request among identical concurrent requests.
+
+    Requests are identified by ``request_key`` (messages, model settings and
+    parameters). While a request is in flight, identical requests follow its
+    response through a replay buffer instead of starting a new generation;
+    a caller that joins late first receives the chunks it missed. Each
+    caller gets the complete response, so every session persists its own
+    reply as usual.
+
+    The upstream request is cancelled only once every caller has left.
+    """
+
+    def __init__(self, inner: BaseLLMClient):
+        """
+        Initialize the wrapper.
+
+        Args:
+            inner: Client making the upstream requests
+        """
+        self.inner = inner
+        self._flights: Dict[str, _Flight] = {}
+        self.requests = 0
+        self.coalesced = 0
+
+    def model_settings(self) -> Dict[str, Any]:
+        """Return the wrapped client's model settings."""
+        return self.inner.model_settings()
+
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """Return request and coalescing counters, merged with the wrapped client's."""
+        return {
+            "coalescing": {
+                "requests": self.requests,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights),
+            },
+            **(self.inner.stats() or {}),
+        }
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        """Stop routing new callers to a flight."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def _follow(
+        self,
+        key: str,
+        start: Callable[[], AsyncIterator[str]]
+    ) -> AsyncIterator[str]:
+        """
+        Join the flight for a key, starting it if none is in flight.
+
+        Args:
+            key: Request key
+            start: Returns the upstream stream when a new flight is needed
+
+        Yields:
+            str: Response chunks from the beginning
+
+        Raises:
+            Exception: The upstream error, if the request failed
+        """
+        self.requests += 1
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(start())
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            self.coalesced += 1
+            logger.info("Joined in-flight LLM request %s (%s callers)", key[:12], flight.callers + 1)
+
+        flight.callers += 1
+        try:
+            async for item in flight.buffer.subscribe():
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            flight.callers -= 1
+            if flight.callers == 0 and not flight.task.done():
+                # Every caller left (clients disconnected); stop generating
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    async def generate_stream(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response, sharing an identical request already in flight.
+
+        Args:
+            messages: Conversation history in generic format
+            **kwargs: Additional provider-specific parameters
+
+        Yields:
+            str: Token chunks
+        """
+        key = "stream:" + self.request_key(messages, **kwargs)
+        async for chunk in self._follow(key, lambda: self.inner.generate_stream(messages, **kwargs)):
+            yield chunk
+
+    async def generate(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> str:
+        """
+        Generate a complete response, sharing an identical request in flight.
+
+        Args:
+            messages: Conversation history in generic format
+            **kwargs: Additional provider-specific parameters
+
+        Returns:
+            str: Complete response
+        """
+        async def complete() -> AsyncIterator[str]:
+            yield await self.inner.generate(messages, **kwargs)
+
+        key = "generate:" + self.request_key(messages, **kwargs)
+        chunks = []
+        async for chunk in self._follow(key, complete):
+            chunks.append(chunk)
+        return "".join(chunks)
@@ -1,13 +1,14 @@
 """FastAPI application entry point."""
 
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.core.config import settings
-from src.core.logging import setup_logging, get_logger
-from src.api.chat import router as chat_router
-from src.memory.redis_memory import memory
+from src.core.logging import setup_logging, shutdown_logging, get_logger
+from src.core.metrics import metrics
+from src.api.chat import router as chat_router, llm_client, response_cache, session_locks, stream_buffer
+from src.memory.factory import memory
 from src.schemas.chat import HealthResponse
 
 # Initialize logging
@@ -20,20 +21,28 @@ async def lifespan(app: FastAPI):
     """
     Lifespan context manager for startup and shutdown events.
     
-    This manages Redis connections and other resources.
+    This manages memory backend connections and other resources.
     """
     # Startup
-    logger.info(f"Starting {settings.app_name} v{settings.app_version}")
-    logger.info(f"Environment: {settings.environment}")
+    logger.info("Starting %s v%s", settings.app_name, settings.app_version)
+    logger.info("Environment: %s", settings.environment)
     
-    # Connect to Redis
+    # Connect the conversation memory backend
     await memory.connect()
+    if session_locks.distributed:
+        await session_locks.connect()
     
     yield
     
     # Shutdown
     logger.info("Shutting down application")
     await memory.disconnect()
+    await session_locks.disconnect()
+    if stream_buffer is not None:
+        await stream_buffer.disconnect()
+    if response_cache is not None:
+        await response_cache.disconnect()
+    shutdown_logging()
 
 
 # Create FastAPI application
@@ -72,6 +81,53 @@ async def health_check() -> HealthResponse:
     )
 
 
+@app.get("/stats/memory", tags=["health"])
+async def memory_stats():
+    """
+    Conversation memory statistics.
+    
+    Returns:
+        dict: In-process history cache counters (null if the cache is disabled)
+            and connection pool utilization per Redis shard
+    """
+    return {
+        "history_cache": memory.cache_stats(),
+        "connection_pools": memory.pool_stats()
+    }
+
+
+@app.get("/stats/llm", tags=["health"])
+async def llm_stats():
+    """
+    LLM client statistics.
+    
+    Returns:
+        dict: Counters of the LLM client layers (response cache hit ratio
+            and bytes saved, request coalescing)
+    """
+    return llm_client.stats() or {}
+
+
+@app.get("/metrics", tags=["health"])
+async def prometheus_metrics() -> Response:
+    """
+    Prometheus metrics.
+    
+    Returns:
+        Response: Turn stage histograms, turn outcomes, active streams, SSE
+            events and bytes, and Redis round trips of the conversation
+            memory, in the Prometheus text format
+        
+    Raises:
+        HTTPException: 404 if metrics are disabled or prometheus_client is
+            not installed
+    """
+    if not metrics.enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrics are disabled")
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
 @app.get("/", tags=["root"])
 async def root():
     """Root endpoint with API information."""
@@ -81,6 +137,11 @@ async def root():
         "endpoints": {
             "health": "/health",
             "chat": "/chat",
+            "chat_completions": "/chat/completions",
+            "chat_batch": "/chat/batch",
+            "memory_stats": "/stats/memory",
+            "llm_stats": "/stats/llm",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
@@ -0,0 +1,153 @@
+"""Append-only cold storage for history trimmed out of Redis."""
+
+import asyncio
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+import aiofiles
+
+from src.core.logging import get_logger
+
+logger = get_logger("memory.archive")
+
+
+class BaseHistoryArchive(ABC):
+    """
+    Abstract base class for history archive sinks.
+
+    Archives receive messages trimmed from the Redis history list, oldest
+    first, so full transcripts are kept without using Redis memory.
+    """
+
+    @abstractmethod
+    async def append(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """
+        Append trimmed messages for a session.
+
+        Args:
+            session_id: Unique session identifier
+            messages: Message records, oldest first
+        """
+        pass
+
+    async def close(self) -> None:
+        """Release any resources held by the archive."""
+        pass
+
+
+class JSONLHistoryArchive(BaseHistoryArchive):
+    """Archive that appends one JSON object per message to a file."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the archive.
+
+        Args:
+            path: Path of the JSONL file to append to
+        """
+        self.path = path
+        self._lock = asyncio.Lock()
+
+    async def append(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """Append messages as JSON lines."""
+        archived_at = time.time()
+        lines = "".join(
+            json.dumps({"session_id": session_id, "archived_at": archived_at, **msg}) + "\n"
+            for msg in messages
+        )
+        # Serialize writers so lines from concurrent sessions never interleave
+        async with self._lock:
+            async with aiofiles.open(self.path, "a", encoding="utf-8") as f:
+                await f.write(lines)
+
+
+class SQLiteHistoryArchive(BaseHistoryArchive):
+    """Archive that inserts messages into a local SQLite database."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the archive.
+
+        Args:
+            path: Path of the SQLite database file
+        """
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = asyncio.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the table if needed."""
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS archived_messages ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "session_id TEXT NOT NULL, "
+                "role TEXT NOT NULL, "
+                "content TEXT NOT NULL, "
+                "tokens INTEGER, "
+                "archived_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_archived_messages_session "
+                "ON archived_messages (session_id)"
+            )
+        return self._connection
+
+    def _insert(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """Insert messages in one transaction (runs in a worker thread)."""
+        connection = self._connect()
+        archived_at = time.time()
+        with connection:
+            connection.executemany(
+                "INSERT INTO archived_messages "
+                "(session_id, role, content, tokens, archived_at) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        session_id,
+                        msg.get("role", ""),
+                        msg.get("content", ""),
+                        msg.get("tokens"),
+                        archived_at
+                    )
+                    for msg in messages
+                ]
+            )
+
+    async def append(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """Insert messages without blocking the event loop."""
+        async with self._lock:
+            await asyncio.to_thread(self._insert, session_id, messages)
+
+    async def close(self) -> None:
+        """Close the database connection."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def create_history_archive(kind: str, path: Optional[str] = None) -> Optional[BaseHistoryArchive]:
+    """
+    Create a history archive from configuration.
+
+    Args:
+        kind: Archive type ('none', 'jsonl' or 'sqlite')
+        path: File path (uses a default per type if None)
+
+    Returns:
+        BaseHistoryArchive instance, or None if archiving is disabled
+
+    Raises:
+        ValueError: If the archive type is unknown
+    """
+    if kind == "none":
+        return None
+    if kind == "jsonl":
+        return JSONLHistoryArchive(path or "history_archive.jsonl")
+    if kind == "sqlite":
+        return SQLiteHistoryArchive(path or "history_archive.db")
+    raise ValueError(f"Unknown history archive type '{kind}'. Use 'none', 'jsonl' or 'sqlite'.")
@@ -0,0 +1,561 @@
+"""Base conversation memory abstraction shared by all storage backends."""
+
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any, List, Dict, Optional, Set, Tuple
+import tiktoken
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.core.metrics import metrics
+from src.memory.pruning import PruningStrategy, get_pruning_strategy
+from src.memory.archive import BaseHistoryArchive, create_history_archive
+
+logger = get_logger("memory")
+
+
+class BaseConversationMemory(ABC):
+    """
+    Abstract base class for conversation memory backends.
+    
+    This abstraction allows swapping the storage (Redis, SQLite, in-process)
+    without changing the rest of the application. Token counting, pruning,
+    summary handling and retention archiving live here, so every backend
+    returns the same history for the same writes. Backends only implement
+    storage.
+    
+    Every backend keeps, per session:
+    - the history list, trimmed to ``history_retention_messages``
+    - an index of all system messages, which are always kept
+    - the rolling summary and how many entries it covers (absolute positions)
+    - the number of entries trimmed so far
+    
+    Sessions expire ``redis_ttl_seconds`` after their last write.
+    """
+    
+    def __init__(self, archive: Optional[BaseHistoryArchive] = None):
+        """
+        Initialize token encoder and retention archive.
+        
+        Args:
+            archive: Sink for messages trimmed by retention (uses config if None)
+        """
+        # Cold storage for history trimmed by retention
+        self.archive = archive or create_history_archive(
+            settings.history_archive, settings.history_archive_path
+        )
+        self._archive_tasks: Set[asyncio.Task] = set()
+        
+        # Use tiktoken for approximate token counting
+        # Gemini uses similar tokenization to GPT models
+        try:
+            self.encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # Fallback to approximate counting if tiktoken fails
+            self.encoder = None
+            logger.warning("Failed to load tiktoken encoder, using approximate token counting")
+    
+    async def connect(self):
+        """Open backend resources (no-op by default)."""
+        pass
+    
+    async def disconnect(self):
+        """Flush pending archive writes and close the archive."""
+        if self._archive_tasks:
+            await asyncio.gather(*self._archive_tasks, return_exceptions=True)
+        if self.archive:
+            await self.archive.close()
+    
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Return in-process cache counters, or None if the backend has no cache."""
+        return None
+    
+    def pool_stats(self) -> Optional[Dict[str, Any]]:
+        """Return connection pool counters, or None if the backend has no pools."""
+        return None
+    
+    def redis_shards(self) -> Optional[Any]:
+        """Return the RedisShardRouter sessions are stored on, or None if not Redis-backed."""
+        return None
+    
+    def _count_tokens(self, text: str) -> int:
+        """
+        Count tokens in text using tiktoken or approximation.
+        
+        Args:
+            text: Text to count tokens for
+            
+        Returns:
+            int: Approximate token count
+        """
+        if self.encoder:
+            return len(self.encoder.encode(text))
+        else:
+            # Rough approximation: 1 token ≈ 4 characters
+            return len(text) // 4
+    
+    def _count_message_tokens(self, role: str, content: str) -> int:
+        """
+        Calculate token count for a single message.
+        
+        Args:
+            role: Message role
+            content: Message content
+            
+        Returns:
+            int: Token count including per-message structure overhead
+        """
+        # Count tokens for role and content
+        # Add overhead for message structure (~4 tokens per message)
+        return self._count_tokens(role) + self._count_tokens(content) + 4
+    
+    def _message_tokens(self, msg: Dict[str, Any]) -> int:
+        """
+        Get the token count for a stored message.
+        
+        Uses the count persisted at write time; older records written
+        before counts were stored are tokenized on the fly.
+        
+        Args:
+            msg: Message dictionary
+            
+        Returns:
+            int: Token count for the message
+        """
+        tokens = msg.get("tokens")
+        if tokens is None:
+            tokens = self._count_message_tokens(msg.get("role", ""), msg.get("content", ""))
+            msg["tokens"] = tokens
+        return tokens
+    
+    def _get_messages_token_count(self, messages: List[Dict[str, Any]]) -> int:
+        """
+        Calculate total token count for a list of messages.
+        
+        Args:
+            messages: List of message dictionaries
+            
+        Returns:
+            int: Total token count
+        """
+        return sum(self._message_tokens(msg) for msg in messages)
+    
+    def _prune_messages(
+        self,
+        messages: List[Dict[str, Any]],
+        max_tokens: Optional[int] = None,
+        max_turns: Optional[int] = None,
+        strategy: Optional[PruningStrategy] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Prune messages to fit within token and turn limits.
+        
+        Default strategy: Keep the most recent messages, preserving system
+        messages. The cut point is found in a single pass over stored
+        token counts.
+        
+        Args:
+            messages: List of messages
+            max_tokens: Maximum total tokens (None = no limit)
+            max_turns: Maximum number of turns (None = no limit)
+            strategy: Pruning strategy (uses config default if None)
+            
+        Returns:
+            List[Dict[str, Any]]: Pruned messages
+        """
+        strategy = strategy or get_pruning_strategy(settings.pruning_strategy)
+        start = time.perf_counter()
+        pruned = strategy.prune(messages, self._message_tokens, max_tokens, max_turns)
+        metrics.observe_stage("prune", time.perf_counter() - start)
+        return pruned
+    
+    @staticmethod
+    def _strip_metadata(messages: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Return messages with only the 'role' and 'content' keys."""
+        return [{"role": msg.get("role", ""), "content": msg.get("content", "")} for msg in messages]
+    
+    @staticmethod
+    def _covered_index(summary: Optional[Dict[str, Any]], trimmed: int) -> int:
+        """
+        Convert a summary's absolute coverage into a current list index.
+        
+        Coverage counts every entry ever appended, while the list itself
+        loses its oldest entries to retention trimming.
+        
+        Args:
+            summary: Parsed rolling summary (None if no summary exists)
+            trimmed: Number of entries trimmed so far
+            
+        Returns:
+            int: Index of the first list entry the summary does not cover
+        """
+        if not summary:
+            return 0
+        return max(summary["covered"] - trimmed, 0)
+    
+    @staticmethod
+    def _render_summary(content: str) -> str:
+        """Render rolling summary text as system message content."""
+        return f"Summary of the earlier conversation:\n{content}"
+    
+    def _summary_message(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Render a rolling summary as a system message."""
+        return {
+            "role": "system",
+            "content": self._render_summary(summary["content"]),
+            "tokens": summary["tokens"]
+        }
+    
+    def _build_message(self, role: str, content: str) -> Dict[str, Any]:
+        """
+        Build a stored message record.
+        
+        The token count is computed once here so reads never re-tokenize.
+        
+        Args:
+            role: Message role ('user', 'assistant', 'system')
+            content: Message content
+            
+        Returns:
+            Dict[str, Any]: Message with 'role', 'content' and 'tokens'
+        """
+        return {
+            "role": role,
+            "content": content,
+            "tokens": self._count_message_tokens(role, content)
+        }
+    
+    async def add_message(
+        self,
+        session_id: str,
+        role: str,
+        content: str,
+        fence: Optional[int] = None
+    ) -> None:
+        """
+        Add a message to conversation history.
+        
+        Args:
+            session_id: Unique session identifier
+            role: Message role ('user', 'assistant', 'system')
+            content: Message content
+            fence: Fencing token of the session lease the write is
+                conditional on (None = unconditional)
+            
+        Raises:
+            SessionLeaseLost: If the lease no longer carries ``fence``
+        """
+        await self.add_messages(session_id, [(role, content)], fence)
+    
+    async def get_history(
+        self,
+        session_id: str,
+        max_tokens: Optional[int] = None,
+        max_turns: Optional[int] = None,
+        strategy: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Retrieve conversation history for a session.
+        
+        Args:
+            session_id: Unique session identifier
+            max_tokens: Maximum tokens to return (uses config default if None)
+            max_turns: Maximum turns to return (uses config default if None)
+            strategy: Name of the pruning strategy (uses config default if None)
+            
+        Returns:
+            List[Dict[str, str]]: Conversation history
+        """
+        return await self._load_history(session_id, max_tokens, max_turns, strategy)
+    
+    async def get_history_and_append(
+        self,
+        session_id: str,
+        role: str,
+        content: str,
+        max_tokens: Optional[int] = None,
+        max_turns: Optional[int] = None,
+        strategy: Optional[str] = None,
+        fence: Optional[int] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Retrieve conversation history and append a message in one round trip.
+        
+        The returned history does not include the appended message, since
+        the reads are queued ahead of the append in the same transaction.
+        
+        Args:
+            session_id: Unique session identifier
+            role: Role of the message to append
+            content: Content of the message to append
+            max_tokens: Maximum tokens to return (uses config default if None)
+            max_turns: Maximum turns to return (uses config default if None)
+            strategy: Name of the pruning strategy (uses config default if None)
+            fence: Fencing token of the session lease the append is
+                conditional on (None = unconditional)
+            
+        Returns:
+            List[Dict[str, str]]: Conversation history before the append
+            
+        Raises:
+            SessionLeaseLost: If the lease no longer carries ``fence``
+        """
+        return await self._load_history(
+            session_id,
+            max_tokens,
+            max_turns,
+            strategy,
+            append=[self._build_message(role, content)],
+            fence=fence
+        )
+    
+    def _assemble_history(
+        self,
+        messages: List[Dict[str, Any]],
+        system_messages: Optional[List[Dict[str, Any]]],
+        summary: Optional[Dict[str, Any]],
+        trimmed: int,
+        max_tokens: Optional[int],
+        max_turns: Optional[int],
+        strategy: PruningStrategy
+    ) -> List[Dict[str, Any]]:
+        """
+        Build pruned history from a session's full stored state.
+        
+        Args:
+            messages: Decoded history list entries, oldest first
+            system_messages: System message index (None if the session has
+                no complete index, e.g. it was written before the index
+                existed; system messages are then taken from the history list)
+            summary: Parsed rolling summary (None if no summary exists)
+            trimmed: Number of entries trimmed from the list by retention
+            max_tokens: Maximum total tokens (None = no limit)
+            max_turns: Maximum number of turns (None = no limit)
+            strategy: Pruning strategy
+            
+        Returns:
+            List[Dict[str, Any]]: Pruned messages, summary included
+        """
+        if not messages:
+            return []
+        
+        # Messages folded into the summary are replaced by it,
+        # except system messages which are always kept
+        covered = self._covered_index(summary, trimmed)
+        if system_messages is not None:
+            messages = system_messages + [
+                msg for msg in messages[covered:] if msg.get("role") != "system"
+            ]
+        elif covered:
+            messages = [
+                msg for msg in messages[:covered] if msg.get("role") == "system"
+            ] + messages[covered:]
+        
+        if summary and max_tokens:
+            max_tokens = max(max_tokens - summary["tokens"], 1)
+        
+        # Apply pruning
+        pruned_messages = self._prune_messages(messages, max_tokens, max_turns, strategy)
+        return self._insert_summary(pruned_messages, summary)
+    
+    def _insert_summary(
+        self,
+        messages: List[Dict[str, Any]],
+        summary: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Insert the rolling summary right after the leading system messages."""
+        if not summary:
+            return messages
+        
+        system_count = 0
+        while system_count < len(messages) and messages[system_count].get("role") == "system":
+            system_count += 1
+        messages.insert(system_count, self._summary_message(summary))
+        return messages
+    
+    def _new_summary(self, content: str, covered: int) -> Dict[str, Any]:
+        """
+        Build a rolling summary record.
+        
+        Args:
+            content: Summary text
+            covered: Number of history entries ever appended that it covers
+            
+        Returns:
+            Dict[str, Any]: Summary with 'content', 'tokens' and 'covered'
+        """
+        return {
+            "content": content,
+            "tokens": self._count_message_tokens("system", self._render_summary(content)),
+            "covered": covered
+        }
+    
+    def _archive_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """
+        Send messages trimmed by retention to the archive in the background.
+        
+        Args:
+            session_id: Unique session identifier
+            messages: Trimmed message records, oldest first
+        """
+        if not self.archive or not messages:
+            return
+        
+        task = asyncio.create_task(self._write_archive(session_id, messages))
+        self._archive_tasks.add(task)
+        task.add_done_callback(self._archive_tasks.discard)
+    
+    async def _write_archive(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """Write trimmed messages to the archive, logging failures."""
+        try:
+            await self.archive.append(session_id, messages)
+            logger.debug("Archived %s messages for session %s", len(messages), session_id)
+        except Exception as e:
+            logger.error("Failed to archive history for session %s: %s", session_id, e)
+    
+    async def _load_history(
+        self,
+        session_id: str,
+        max_tokens: Optional[int] = None,
+        max_turns: Optional[int] = None,
+        strategy: Optional[str] = None,
+        append: Optional[List[Dict[str, Any]]] = None,
+        fence: Optional[int] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Load and prune history, optionally appending messages atomically.
+        
+        Args:
+            session_id: Unique session identifier
+            max_tokens: Maximum tokens to return (uses config default if None)
+            max_turns: Maximum turns to return (uses config default if None)
+            strategy: Name of the pruning strategy (uses config default if None)
+            append: Message records to append after the read (None = read only)
+            fence: Fencing token the append is conditional on (None = unconditional)
+            
+        Returns:
+            List[Dict[str, str]]: Conversation history
+        """
+        max_tokens = max_tokens or settings.max_history_tokens
+        max_turns = max_turns or settings.max_history_turns
+        pruning_strategy = get_pruning_strategy(strategy or settings.pruning_strategy)
+        
+        pruned_messages, read_count = await self._read_history(
+            session_id, max_tokens, max_turns, pruning_strategy, append, fence
+        )
+        
+        # The total sums the stored per-message counts (only records written
+        # before counts were stored are tokenized); skip it unless logged
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Retrieved %s messages for session %s (read: %s, tokens: %s)",
+                len(pruned_messages), session_id, read_count,
+                self._get_messages_token_count(pruned_messages)
+            )
+        
+        return self._strip_metadata(pruned_messages)
+    
+    @abstractmethod
+    async def _read_history(
+        self,
+        session_id: str,
+        max_tokens: Optional[int],
+        max_turns: Optional[int],
+        strategy: PruningStrategy,
+        append: Optional[List[Dict[str, Any]]] = None,
+        fence: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Read pruned history from storage, then append messages if given.
+        
+        The returned history must not include the appended messages.
+        
+        Args:
+            session_id: Unique session identifier
+            max_tokens: Maximum total tokens (None = no limit)
+            max_turns: Maximum number of turns (None = no limit)
+            strategy: Pruning strategy
+            append: Message records to append after the read (None = read only)
+            fence: Fencing token the append is conditional on (None = unconditional)
+            
+        Returns:
+            Tuple of (pruned messages with summary, number of entries read)
+        """
+        pass
+    
+    @abstractmethod
+    async def add_messages(
+        self,
+        session_id: str,
+        messages: List[Tuple[str, str]],
+        fence: Optional[int] = None
+    ) -> None:
+        """
+        Add several messages to conversation history atomically.
+        
+        Appends, refreshes the session TTL and trims to the retention bound.
+        With a fencing token, the write only happens if the session's Redis
+        lease (see ``SessionLockManager``) still carries it, checked in the
+        same atomic step. Backends that are not shared between replicas
+        ignore the token.
+        
+        Args:
+            session_id: Unique session identifier
+            messages: List of (role, content) tuples, oldest first
+            fence: Fencing token the write is conditional on (None = unconditional)
+            
+        Raises:
+            SessionLeaseLost: If the lease no longer carries ``fence``
+        """
+        pass
+    
+    @abstractmethod
+    async def get_compaction_state(
+        self,
+        session_id: str
+    ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]], int]:
+        """
+        Load the rolling summary and the messages it does not cover yet.
+        
+        Args:
+            session_id: Unique session identifier
+            
+        Returns:
+            Tuple of (summary or None, messages after the summarized prefix,
+            absolute position of the first returned message)
+        """
+        pass
+    
+    @abstractmethod
+    async def save_summary(
+        self,
+        session_id: str,
+        content: str,
+        covered: int,
+        expected_covered: int
+    ) -> bool:
+        """
+        Store a new rolling summary if no other compaction won the race.
+        
+        Args:
+            session_id: Unique session identifier
+            content: Summary text
+            covered: Number of history entries ever appended that the summary covers
+            expected_covered: Coverage of the summary this one replaces
+            
+        Returns:
+            bool: True if stored, False if the summary changed concurrently
+        """
+        pass
+    
+    @abstractmethod
+    async def clear_history(self, session_id: str) -> None:
+        """
+        Clear conversation history for a session.
+        
+        Args:
+            session_id: Unique session identifier
+        """
+        pass
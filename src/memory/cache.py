@@ -0,0 +1,111 @@
+"""In-process L1 cache of parsed session history."""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class CachedSession:
+    """Parsed, token-counted state of one session as stored in Redis."""
+
+    messages: List[Dict[str, Any]]
+    # None if the session's system index is incomplete (see RedisConversationMemory)
+    system_messages: Optional[List[Dict[str, Any]]]
+    summary: Optional[Dict[str, Any]]
+    trimmed: int
+    expires_at: float = field(default=0.0)
+
+
+class SessionHistoryCache:
+    """
+    Bounded LRU cache of session history with a per-entry TTL.
+
+    The cache is write-through: the memory layer applies its own writes to
+    cached entries, and drops entries when other replicas announce writes.
+    The TTL bounds staleness if an invalidation is ever missed.
+    """
+
+    def __init__(self, max_sessions: int, ttl_seconds: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_sessions: Maximum number of sessions kept
+            ttl_seconds: Seconds an entry stays valid after it is loaded
+        """
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CachedSession]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, session_id: str) -> Optional[CachedSession]:
+        """
+        Look up a session, counting the hit or miss.
+
+        Args:
+            session_id: Unique session identifier
+
+        Returns:
+            CachedSession if cached and not expired, otherwise None
+        """
+        entry = self.peek(session_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(session_id)
+        return entry
+
+    def peek(self, session_id: str) -> Optional[CachedSession]:
+        """Look up a session without counting it or changing LRU order."""
+        entry = self._entries.get(session_id)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            del self._entries[session_id]
+            return None
+        return entry
+
+    def put(self, session_id: str, entry: CachedSession) -> None:
+        """
+        Store a session, evicting the least recently used one if full.
+
+        Args:
+            session_id: Unique session identifier
+            entry: Parsed session state
+        """
+        entry.expires_at = time.monotonic() + self.ttl_seconds
+        self._entries[session_id] = entry
+        self._entries.move_to_end(session_id)
+
+        while len(self._entries) > self.max_sessions:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, session_id: str) -> None:
+        """Drop a session from the cache."""
+        if self._entries.pop(session_id, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every cached session."""
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_sessions": self.max_sessions,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,130 @@
+"""Versioned storage codec for conversation messages."""
+
+import json
+from typing import Any, Dict, Union
+
+from src.core.logging import get_logger
+
+logger = get_logger("memory.codec")
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Format markers (first byte of a stored record). Legacy JSON records
+# always start with '{', which never collides with these.
+FORMAT_MSGPACK = 0x01
+FORMAT_MSGPACK_ZSTD = 0x02
+_JSON_START = ord("{")
+
+
+class MessageCodec:
+    """
+    Encode and decode stored messages.
+
+    In msgpack format, records are written as a one-byte format marker
+    followed by a msgpack array of ``[role, content, tokens]``,
+    zstd-compressed when larger than the threshold; in JSON format, as the
+    JSON objects written before the codec existed. The reader detects the
+    format per record, so either kind of entry keeps working.
+
+    Falls back to JSON when msgpack is not installed, and skips
+    compression when zstandard is not installed.
+    """
+
+    def __init__(
+        self,
+        format: str = "json",
+        compression_threshold: int = 1024,
+        compression_level: int = 3
+    ):
+        """
+        Initialize the codec.
+
+        Args:
+            format: Write format, 'msgpack' or 'json'
+            compression_threshold: Compress records larger than this many
+                bytes (0 = never compress)
+            compression_level: zstd compression level
+
+        Raises:
+            ValueError: If the format is unknown
+        """
+        if format not in ("msgpack", "json"):
+            raise ValueError(f"Unknown message codec '{format}'. Use 'msgpack' or 'json'.")
+
+        if format == "msgpack" and msgpack is None:
+            logger.warning("msgpack is not installed, storing messages as JSON")
+            format = "json"
+        self.format = format
+
+        self._compressor = None
+        self._decompressor = None
+        if zstandard is not None:
+            self._compressor = zstandard.ZstdCompressor(level=compression_level)
+            self._decompressor = zstandard.ZstdDecompressor()
+        elif format == "msgpack" and compression_threshold:
+            logger.warning("zstandard is not installed, storing messages uncompressed")
+        self.compression_threshold = compression_threshold if self._compressor else 0
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        """
+        Encode a message record for storage.
+
+        Args:
+            message: Message with 'role', 'content' and optional 'tokens'
+
+        Returns:
+            bytes: Encoded record
+        """
+        if self.format == "json":
+            return json.dumps(message).encode("utf-8")
+
+        body = msgpack.packb(
+            [message.get("role", ""), message.get("content", ""), message.get("tokens")]
+        )
+        if self.compression_threshold and len(body) > self.compression_threshold:
+            return bytes((FORMAT_MSGPACK_ZSTD,)) + self._compressor.compress(body)
+        return bytes((FORMAT_MSGPACK,)) + body
+
+    def decode(self, raw: Union[bytes, str]) -> Dict[str, Any]:
+        """
+        Decode a stored record in any supported format.
+
+        Args:
+            raw: Record as read from Redis
+
+        Returns:
+            Dict[str, Any]: Message with 'role' and 'content' ('tokens' if stored)
+
+        Raises:
+            ValueError: If the format marker is unknown or its library is missing
+        """
+        if isinstance(raw, str) or raw[0] == _JSON_START:
+            return json.loads(raw)
+
+        marker = raw[0]
+        if marker == FORMAT_MSGPACK_ZSTD:
+            if self._decompressor is None:
+                raise ValueError("zstd-compressed message found but zstandard is not installed")
+            body = self._decompressor.decompress(raw[1:])
+        elif marker == FORMAT_MSGPACK:
+            body = raw[1:]
+        else:
+            raise ValueError(f"Unknown message format marker: {marker:#x}")
+
+        if msgpack is None:
+            raise ValueError("msgpack-encoded message found but msgpack is not installed")
+
+        role, content, tokens = msgpack.unpackb(body)
+        message = {"role": role, "content": content}
+        if tokens is not None:
+            message["tokens"] = tokens
+        return message
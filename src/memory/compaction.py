@@ -0,0 +1,146 @@
+"""Rolling summarization compaction for long conversations."""
+
+from typing import Any, Dict, List, Optional, Set
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.llm.base import BaseLLMClient
+from src.memory.pruning import find_tail_start
+from src.memory.base import BaseConversationMemory
+
+logger = get_logger("memory.compaction")
+
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a user and an "
+    "assistant. Merge the existing summary with the new messages into a single "
+    "concise summary. Preserve facts, decisions, user preferences and open "
+    "questions. Reply with the summary only, in at most {max_tokens} tokens."
+)
+
+
+class ConversationCompactor:
+    """
+    Fold turns that no longer fit the history budget into a rolling summary.
+
+    Compaction runs off the request path (after the SSE stream ends). Once
+    the unsummarized tail outgrows the history budget, the oldest turns are
+    summarized with ``BaseLLMClient.generate`` down to a lower watermark so
+    the LLM is not called on every turn. ``get_history`` then returns the
+    summary as a system message followed by the recent tail.
+    """
+
+    def __init__(
+        self,
+        memory: BaseConversationMemory,
+        llm_client: BaseLLMClient,
+        max_summary_tokens: Optional[int] = None,
+        target_ratio: Optional[float] = None
+    ):
+        """
+        Initialize the compactor.
+
+        Args:
+            memory: Conversation memory holding history and summaries
+            llm_client: LLM client used to write summaries (any BaseLLMClient)
+            max_summary_tokens: Token budget reserved for the summary
+            target_ratio: Fraction of the tail budget to compact down to
+        """
+        self.memory = memory
+        self.llm_client = llm_client
+        self.max_summary_tokens = max_summary_tokens or settings.summary_max_tokens
+        self.target_ratio = target_ratio or settings.summary_target_ratio
+        self._in_flight: Set[str] = set()
+
+    def _format_transcript(self, messages: List[Dict[str, Any]]) -> str:
+        """Render messages as a plain-text transcript for the summarizer."""
+        return "\n".join(
+            f"{msg.get('role', 'user').capitalize()}: {msg.get('content', '')}"
+            for msg in messages
+        )
+
+    async def maybe_compact(self, session_id: str) -> bool:
+        """
+        Compact a session's history if it has outgrown the budget.
+
+        Errors are logged rather than raised, since this runs after the
+        response has been sent.
+
+        Args:
+            session_id: Unique session identifier
+
+        Returns:
+            bool: True if a new summary was stored
+        """
+        # One compaction per session at a time in this process
+        if session_id in self._in_flight:
+            return False
+
+        self._in_flight.add(session_id)
+        try:
+            return await self._compact(session_id)
+        except Exception as e:
+            logger.error("Compaction failed for session %s: %s", session_id, e, exc_info=True)
+            return False
+        finally:
+            self._in_flight.discard(session_id)
+
+    async def _compact(self, session_id: str) -> bool:
+        """Run one compaction pass for a session."""
+        summary, pending, offset = await self.memory.get_compaction_state(session_id)
+        covered = summary["covered"] if summary else 0
+
+        # System messages are always kept verbatim, so never fold them
+        positions = [i for i, msg in enumerate(pending) if msg.get("role") != "system"]
+        conversation = [pending[i] for i in positions]
+        if not conversation:
+            return False
+
+        count_tokens = self.memory._message_tokens
+        # The summary never takes more than half of the history budget
+        summary_reserve = min(self.max_summary_tokens, settings.max_history_tokens // 2)
+        tail_budget = settings.max_history_tokens - summary_reserve
+        max_count = settings.max_history_turns * 2
+
+        # Only compact once the tail no longer fits
+        if find_tail_start(conversation, count_tokens, tail_budget, max_count) == 0:
+            return False
+
+        # Fold down to the lower watermark, keeping whole turns in the tail
+        start = find_tail_start(
+            conversation,
+            count_tokens,
+            int(tail_budget * self.target_ratio),
+            max(int(max_count * self.target_ratio), 2)
+        )
+        while start < len(conversation) and conversation[start].get("role") != "user":
+            start += 1
+        if start == 0:
+            return False
+
+        folded = conversation[:start]
+        new_covered = offset + (positions[start] if start < len(positions) else len(pending))
+
+        prompt = [
+            {
+                "role": "system",
+                "content": SUMMARY_INSTRUCTIONS.format(max_tokens=summary_reserve)
+            },
+            {
+                "role": "user",
+                "content": (
+                    f"Existing summary:\n{summary['content'] if summary else '(none)'}\n\n"
+                    f"New messages:\n{self._format_transcript(folded)}"
+                )
+            }
+        ]
+        content = (await self.llm_client.generate(prompt)).strip()
+        if not content:
+            return False
+
+        stored = await self.memory.save_summary(session_id, content, new_covered, covered)
+        if stored:
+            logger.info(
+                "Compacted %s messages into summary for session %s", len(folded), session_id
+            )
+        return stored
@@ -0,0 +1,35 @@
+"""Conversation memory backend selection."""
+
+from src.core.config import settings
+from src.memory.base import BaseConversationMemory
+
+
+def create_memory(backend: str) -> BaseConversationMemory:
+    """
+    Create a conversation memory backend.
+    
+    Args:
+        backend: Backend name ('redis', 'inprocess' or 'sqlite')
+        
+    Returns:
+        BaseConversationMemory: The backend instance
+        
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    if backend == "redis":
+        from src.memory.redis_memory import RedisConversationMemory
+        return RedisConversationMemory()
+    if backend == "inprocess":
+        from src.memory.inprocess_memory import InProcessConversationMemory
+        return InProcessConversationMemory()
+    if backend == "sqlite":
+        from src.memory.sqlite_memory import SQLiteConversationMemory
+        return SQLiteConversationMemory()
+    raise ValueError(
+        f"Unknown memory backend '{backend}'. Use 'redis', 'inprocess' or 'sqlite'."
+    )
+
+
+# Global memory instance
+memory = create_memory(settings.memory_backend)
@@ -0,0 +1,172 @@
+"""In-process conversation memory for single-node deployments and load tests."""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, List, Dict, Optional, Tuple
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.memory.base import BaseConversationMemory
+from src.memory.pruning import PruningStrategy
+from src.memory.archive import BaseHistoryArchive
+
+logger = get_logger("memory.inprocess")
+
+
+@dataclass
+class _SessionState:
+    """Stored state of one session."""
+
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    system_messages: List[Dict[str, Any]] = field(default_factory=list)
+    summary: Optional[Dict[str, Any]] = None
+    trimmed: int = 0
+    expires_at: float = 0.0
+
+
+class InProcessConversationMemory(BaseConversationMemory):
+    """
+    Conversation memory held in a dict inside the worker process.
+
+    No locks are needed: every operation runs to completion on the event
+    loop without awaiting, so coroutines never observe a partial write.
+    History is lost on restart and not shared between workers.
+    """
+
+    def __init__(self, archive: Optional[BaseHistoryArchive] = None):
+        """
+        Initialize the session store.
+
+        Args:
+            archive: Sink for messages trimmed by retention (uses config if None)
+        """
+        super().__init__(archive)
+        self._sessions: Dict[str, _SessionState] = {}
+        self._last_sweep = time.monotonic()
+
+    def _get_state(self, session_id: str) -> Optional[_SessionState]:
+        """Return a session's state, dropping it if its TTL has passed."""
+        self._sweep_expired()
+        state = self._sessions.get(session_id)
+        if state is not None and state.expires_at <= time.monotonic():
+            del self._sessions[session_id]
+            return None
+        return state
+
+    def _sweep_expired(self) -> None:
+        """Drop expired sessions, at most once per minute."""
+        now = time.monotonic()
+        if now - self._last_sweep < 60:
+            return
+        self._last_sweep = now
+        expired = [sid for sid, state in self._sessions.items() if state.expires_at <= now]
+        for session_id in expired:
+            del self._sessions[session_id]
+
+    def _append(self, session_id: str, records: List[Dict[str, Any]]) -> None:
+        """Append records, refresh the TTL and trim to retention."""
+        state = self._get_state(session_id)
+        if state is None:
+            state = self._sessions[session_id] = _SessionState()
+
+        state.messages.extend(records)
+        state.system_messages.extend(msg for msg in records if msg["role"] == "system")
+        state.expires_at = time.monotonic() + settings.redis_ttl_seconds
+
+        retention = settings.history_retention_messages
+        if retention and len(state.messages) > retention:
+            overflow = len(state.messages) - retention
+            self._archive_messages(session_id, state.messages[:overflow])
+            del state.messages[:overflow]
+            state.trimmed += overflow
+
+    async def add_messages(
+        self,
+        session_id: str,
+        messages: List[Tuple[str, str]],
+        fence: Optional[int] = None
+    ) -> None:
+        """
+        Add several messages to conversation history.
+
+        Args:
+            session_id: Unique session identifier
+            messages: List of (role, content) tuples, oldest first
+            fence: Ignored; this history is not shared between replicas
+        """
+        if not messages:
+            return
+
+        self._append(session_id, [self._build_message(role, content) for role, content in messages])
+        logger.debug("Added %s message(s) to session %s", len(messages), session_id)
+
+    async def _read_history(
+        self,
+        session_id: str,
+        max_tokens: Optional[int],
+        max_turns: Optional[int],
+        strategy: PruningStrategy,
+        append: Optional[List[Dict[str, Any]]] = None,
+        fence: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Prune the stored session, then append messages if given."""
+        state = self._get_state(session_id)
+        pruned_messages: List[Dict[str, Any]] = []
+        if state is not None:
+            pruned_messages = self._assemble_history(
+                state.messages,
+                state.system_messages,
+                state.summary,
+                state.trimmed,
+                max_tokens,
+                max_turns,
+                strategy
+            )
+
+        if append:
+            self._append(session_id, append)
+
+        return pruned_messages, 0
+
+    async def get_compaction_state(
+        self,
+        session_id: str
+    ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]], int]:
+        """Return the summary and the messages it does not cover yet."""
+        state = self._get_state(session_id)
+        if state is None:
+            return None, [], 0
+
+        start = self._covered_index(state.summary, state.trimmed)
+        return state.summary, list(state.messages[start:]), start + state.trimmed
+
+    async def save_summary(
+        self,
+        session_id: str,
+        content: str,
+        covered: int,
+        expected_covered: int
+    ) -> bool:
+        """Store a new rolling summary if its coverage has not moved."""
+        state = self._get_state(session_id)
+        if state is None:
+            return False
+
+        current = state.summary["covered"] if state.summary else 0
+        if current != expected_covered:
+            return False
+
+        state.summary = self._new_summary(content, covered)
+        state.expires_at = time.monotonic() + settings.redis_ttl_seconds
+        logger.debug("Saved summary for session %s (covers %s messages)", session_id, covered)
+        return True
+
+    async def clear_history(self, session_id: str) -> None:
+        """
+        Clear conversation history for a session.
+
+        Args:
+            session_id: Unique session identifier
+        """
+        self._sessions.pop(session_id, None)
+        logger.info("Cleared history for session %s", session_id)
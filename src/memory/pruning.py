@@ -0,0 +1,297 @@
+"""Pluggable history pruning strategies with linear-time cut-point search."""
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Message = Dict[str, Any]
+TokenCounter = Callable[[Message], int]
+
+
+def find_tail_start(
+    messages: List[Message],
+    count_tokens: TokenCounter,
+    token_budget: Optional[int] = None,
+    max_count: Optional[int] = None
+) -> int:
+    """
+    Find where the longest suffix fitting both budgets begins.
+
+    Walks backwards once, accumulating a running token sum, so each
+    message is counted at most once.
+
+    Args:
+        messages: Conversation messages, oldest first
+        count_tokens: Returns the token count of a message
+        token_budget: Maximum total tokens of the suffix (None = no limit)
+        max_count: Maximum number of messages in the suffix (None = no limit)
+
+    Returns:
+        int: Index of the first message to keep (len(messages) keeps none)
+    """
+    start = len(messages)
+    if max_count is not None:
+        lowest = max(len(messages) - max_count, 0)
+    else:
+        lowest = 0
+
+    used_tokens = 0
+    while start > lowest:
+        if token_budget is not None:
+            tokens = count_tokens(messages[start - 1])
+            if used_tokens + tokens > token_budget:
+                break
+            used_tokens += tokens
+        start -= 1
+
+    return start
+
+
+def _split_system(messages: List[Message]) -> Tuple[List[Message], List[Message]]:
+    """Split messages into (system messages, conversation messages)."""
+    system_messages = []
+    conversation_messages = []
+    for msg in messages:
+        if msg.get("role") == "system":
+            system_messages.append(msg)
+        else:
+            conversation_messages.append(msg)
+    return system_messages, conversation_messages
+
+
+class PruningStrategy(ABC):
+    """
+    Abstract base class for history pruning strategies.
+
+    Strategies receive messages oldest first and return the messages to
+    send to the LLM, with system messages first.
+    """
+
+    @abstractmethod
+    def prune(
+        self,
+        messages: List[Message],
+        count_tokens: TokenCounter,
+        max_tokens: Optional[int] = None,
+        max_turns: Optional[int] = None
+    ) -> List[Message]:
+        """
+        Prune messages to fit within token and turn limits.
+
+        Args:
+            messages: List of messages, oldest first
+            count_tokens: Returns the token count of a message
+            max_tokens: Maximum total tokens (None = no limit)
+            max_turns: Maximum number of turns (None = no limit)
+
+        Returns:
+            List[Message]: Pruned messages
+        """
+        pass
+
+    def window_limits(
+        self,
+        max_tokens: Optional[int],
+        max_turns: Optional[int]
+    ) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        """
+        Limits for a tail-only windowed read, if the strategy allows one.
+
+        Args:
+            max_tokens: Maximum total tokens (None = no limit)
+            max_turns: Maximum number of turns (None = no limit)
+
+        Returns:
+            (max_tokens, max_turns) to read with, or None if the strategy
+            needs the full history
+        """
+        return None
+
+
+class TokenWindowStrategy(PruningStrategy):
+    """
+    Keep the newest messages that fit both the turn and token limits.
+
+    System messages are always preserved. This is the default strategy.
+    """
+
+    def prune(
+        self,
+        messages: List[Message],
+        count_tokens: TokenCounter,
+        max_tokens: Optional[int] = None,
+        max_turns: Optional[int] = None
+    ) -> List[Message]:
+        """Keep the newest messages within the turn and token limits."""
+        if not messages:
+            return messages
+
+        system_messages, conversation_messages = _split_system(messages)
+
+        token_budget = None
+        if max_tokens:
+            token_budget = max_tokens - sum(count_tokens(msg) for msg in system_messages)
+        max_count = max_turns * 2 if max_turns else None
+
+        start = find_tail_start(conversation_messages, count_tokens, token_budget, max_count)
+        return system_messages + conversation_messages[start:]
+
+    def window_limits(
+        self,
+        max_tokens: Optional[int],
+        max_turns: Optional[int]
+    ) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        """Token window only needs the tail of the history."""
+        return max_tokens, max_turns
+
+
+class NewestNStrategy(PruningStrategy):
+    """Keep the newest ``max_turns`` turns, ignoring the token limit."""
+
+    def prune(
+        self,
+        messages: List[Message],
+        count_tokens: TokenCounter,
+        max_tokens: Optional[int] = None,
+        max_turns: Optional[int] = None
+    ) -> List[Message]:
+        """Keep the newest turns without counting tokens."""
+        return TokenWindowStrategy().prune(messages, count_tokens, None, max_turns)
+
+    def window_limits(
+        self,
+        max_tokens: Optional[int],
+        max_turns: Optional[int]
+    ) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        """Newest-N only needs the tail of the history."""
+        return None, max_turns
+
+
+class FirstTurnPlusTailStrategy(PruningStrategy):
+    """
+    Keep the first user turn plus as much of the recent tail as fits.
+
+    The opening user message (and the assistant reply to it) often states
+    the goal of the whole conversation, so it is pinned ahead of the tail.
+    If the first turn alone does not fit, this falls back to the token window.
+    """
+
+    def prune(
+        self,
+        messages: List[Message],
+        count_tokens: TokenCounter,
+        max_tokens: Optional[int] = None,
+        max_turns: Optional[int] = None
+    ) -> List[Message]:
+        """Keep the first user turn plus the newest messages that fit."""
+        if not messages:
+            return messages
+
+        system_messages, conversation_messages = _split_system(messages)
+
+        first_user = next(
+            (i for i, msg in enumerate(conversation_messages) if msg.get("role") == "user"),
+            None
+        )
+        if first_user is None:
+            return TokenWindowStrategy().prune(messages, count_tokens, max_tokens, max_turns)
+
+        head_end = first_user + 1
+        if (
+            head_end < len(conversation_messages)
+            and conversation_messages[head_end].get("role") == "assistant"
+        ):
+            head_end += 1
+        head = conversation_messages[first_user:head_end]
+        rest = conversation_messages[head_end:]
+
+        token_budget = None
+        if max_tokens:
+            token_budget = max_tokens - sum(
+                count_tokens(msg) for msg in system_messages + head
+            )
+        max_count = max_turns * 2 - len(head) if max_turns else None
+
+        if (token_budget is not None and token_budget < 0) or (
+            max_count is not None and max_count < 0
+        ):
+            return TokenWindowStrategy().prune(messages, count_tokens, max_tokens, max_turns)
+
+        start = find_tail_start(rest, count_tokens, token_budget, max_count)
+        return system_messages + head + rest[start:]
+
+
+class CallableStrategy(PruningStrategy):
+    """
+    Adapt a plain function into a pruning strategy.
+
+    The function is called with the same arguments as ``prune``.
+    """
+
+    def __init__(
+        self,
+        func: Callable[
+            [List[Message], TokenCounter, Optional[int], Optional[int]],
+            List[Message]
+        ]
+    ):
+        """
+        Initialize the strategy.
+
+        Args:
+            func: Function implementing the pruning
+        """
+        self.func = func
+
+    def prune(
+        self,
+        messages: List[Message],
+        count_tokens: TokenCounter,
+        max_tokens: Optional[int] = None,
+        max_turns: Optional[int] = None
+    ) -> List[Message]:
+        """Delegate pruning to the wrapped function."""
+        return self.func(messages, count_tokens, max_tokens, max_turns)
+
+
+_strategies: Dict[str, PruningStrategy] = {
+    "token_window": TokenWindowStrategy(),
+    "newest_n": NewestNStrategy(),
+    "first_turn_plus_tail": FirstTurnPlusTailStrategy(),
+}
+
+
+def register_pruning_strategy(name: str, strategy: PruningStrategy) -> None:
+    """
+    Register a custom pruning strategy under a name.
+
+    Args:
+        name: Name sessions use to select the strategy
+        strategy: Strategy instance
+    """
+    _strategies[name] = strategy
+
+
+def get_pruning_strategy(name: str) -> PruningStrategy:
+    """
+    Look up a pruning strategy by name.
+
+    Args:
+        name: Registered strategy name
+
+    Returns:
+        PruningStrategy: The strategy instance
+
+    Raises:
+        ValueError: If no strategy is registered under the name
+    """
+    try:
+        return _strategies[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown pruning strategy '{name}'. Available: {', '.join(sorted(_strategies))}"
+        )
+
+
+def available_pruning_strategies() -> List[str]:
+    """Return the names of all registered pruning strategies."""
+    return sorted(_strategies)
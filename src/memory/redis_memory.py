@@ -1,215 +1,782 @@
 """Redis-based conversation memory with manual token management."""
 
 import json
+import time
+import uuid
 import asyncio
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
 import redis.asyncio as redis
-import tiktoken
+from redis.exceptions import WatchError
 
 from src.core.config import settings
 from src.core.logging import get_logger
+from src.core.metrics import metrics, payload_size
+from src.memory.base import BaseConversationMemory
+from src.memory.pruning import PruningStrategy, TokenWindowStrategy
+from src.memory.archive import BaseHistoryArchive
+from src.memory.codec import MessageCodec
+from src.memory.cache import CachedSession, SessionHistoryCache
+from src.memory.session_lock import SessionLeaseLost
+from src.memory.sharding import RedisShardRouter
 
 logger = get_logger("memory.redis")
 
 
-class RedisConversationMemory:
+# Append messages, index system messages, refresh the TTLs of every key of
+# the session (so it expires as a whole) and trim to the retention bound
+# atomically. The index marker is only set on sessions whose index is
+# complete: new ones, or ones that already carry the marker.
+# With a fencing token, nothing is written (and nil is returned) unless the
+# session lease still carries it.
+# KEYS[1] = history list, KEYS[2] = count of entries ever trimmed,
+# KEYS[3] = system message index, KEYS[4] = index marker,
+# KEYS[5] = session lease (see SessionLockManager), KEYS[6] = summary
+# ARGV[1] = TTL seconds, ARGV[2] = retention (0 = unlimited),
+# ARGV[3] = '1' to return trimmed entries for archiving,
+# ARGV[4] = one character per message, '1' for system messages,
+# ARGV[5] = fencing token ('' = write unconditionally), ARGV[6..] = messages
+APPEND_AND_TRIM_SCRIPT = """
+if ARGV[5] ~= '' and redis.call('GET', KEYS[5]) ~= ARGV[5] then
+    return false
+end
+local indexed = redis.call('EXISTS', KEYS[4]) == 1 or redis.call('EXISTS', KEYS[1]) == 0
+local length = redis.call('RPUSH', KEYS[1], unpack(ARGV, 6))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+for i = 6, #ARGV do
+    if string.sub(ARGV[4], i - 5, i - 5) == '1' then
+        redis.call('RPUSH', KEYS[3], ARGV[i])
+    end
+end
+redis.call('EXPIRE', KEYS[3], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+redis.call('EXPIRE', KEYS[6], ARGV[1])
+if indexed then
+    redis.call('SET', KEYS[4], '1', 'EX', ARGV[1])
+end
+local retention = tonumber(ARGV[2])
+if retention > 0 and length > retention then
+    local overflow = length - retention
+    local trimmed = {}
+    if ARGV[3] == '1' then
+        trimmed = redis.call('LRANGE', KEYS[1], 0, overflow - 1)
+    end
+    redis.call('LTRIM', KEYS[1], overflow, -1)
+    redis.call('INCRBY', KEYS[2], overflow)
+    redis.call('EXPIRE', KEYS[2], ARGV[1])
+    return trimmed
+end
+return {}
+"""
+
+# Pub/sub channel on which writers announce changed sessions, so other
+# replicas can drop them from their in-process cache
+INVALIDATION_CHANNEL = "chat:history:invalidate"
+
+
+class RedisConversationMemory(BaseConversationMemory):
     """
     Manual conversation memory using Redis.
     
     This implementation does NOT use LangChain's memory abstractions.
     Instead, it directly manages conversation history with token-based
-    pruning to prevent context overflow.
+    pruning to prevent context overflow. Sessions can be spread over
+    several Redis nodes or a Redis Cluster (see ``RedisShardRouter``).
     """
     
-    def __init__(self):
-        """Initialize Redis connection and token encoder."""
-        self.redis_client: Optional[redis.Redis] = None
+    def __init__(self, archive: Optional[BaseHistoryArchive] = None):
+        """
+        Initialize Redis connection and token encoder.
         
-        # Use tiktoken for approximate token counting
-        # Gemini uses similar tokenization to GPT models
-        try:
-            self.encoder = tiktoken.get_encoding("cl100k_base")
-        except Exception:
-            # Fallback to approximate counting if tiktoken fails
-            self.encoder = None
-            logger.warning("Failed to load tiktoken encoder, using approximate token counting")
+        Args:
+            archive: Sink for messages trimmed by retention (uses config if None)
+        """
+        super().__init__(archive)
+        self.shards: Optional[RedisShardRouter] = None
+        self._append_script = None
+        
+        # Storage format for messages; reads detect the format per record
+        self.codec = MessageCodec(
+            settings.history_codec,
+            settings.history_compression_threshold
+        )
+        
+        # Optional in-process L1 cache of parsed history
+        self.cache: Optional[SessionHistoryCache] = None
+        if settings.history_cache_enabled:
+            self.cache = SessionHistoryCache(
+                settings.history_cache_max_sessions,
+                settings.history_cache_ttl_seconds
+            )
+        self._instance_id = uuid.uuid4().hex
+        self._invalidation_tasks: List[asyncio.Task] = []
     
     async def connect(self):
-        """Establish Redis connection."""
-        if not self.redis_client:
-            self.redis_client = await redis.from_url(
-                settings.redis_url,
-                encoding="utf-8",
-                decode_responses=True
-            )
-            logger.info(f"Connected to Redis at {settings.redis_url}")
+        """Connect to the configured Redis shards."""
+        if self.shards is None:
+            self.shards = await RedisShardRouter.from_settings()
+        
+        if self.cache is not None and not self._invalidation_tasks:
+            self._invalidation_tasks = [
+                asyncio.create_task(self._listen_invalidations(client))
+                for client in self.shards.broadcast_clients()
+            ]
     
     async def disconnect(self):
-        """Close Redis connection."""
-        if self.redis_client:
-            await self.redis_client.close()
+        """Close Redis connections and flush pending archive writes."""
+        for task in self._invalidation_tasks:
+            task.cancel()
+        self._invalidation_tasks = []
+        await super().disconnect()
+        if self.shards is not None:
+            await self.shards.close()
+            self.shards = None
             logger.info("Disconnected from Redis")
     
-    def _count_tokens(self, text: str) -> int:
+    async def _client(self, session_id: str) -> redis.Redis:
+        """Return the client of the shard owning a session, connecting if needed."""
+        if self.shards is None:
+            await self.connect()
+        return self.shards.client_for(session_id)
+    
+    async def _execute(self, operation: str, pipe: Any) -> List[Any]:
         """
-        Count tokens in text using tiktoken or approximation.
+        Execute a pipeline, recording the round trip in the metrics.
         
         Args:
-            text: Text to count tokens for
+            operation: Memory operation, used as the metric label
+            pipe: Pipeline with queued commands
             
         Returns:
-            int: Approximate token count
+            List of command results
         """
-        if self.encoder:
-            return len(self.encoder.encode(text))
-        else:
-            # Rough approximation: 1 token ≈ 4 characters
-            return len(text) // 4
+        if not metrics.enabled:
+            return await pipe.execute()
+        # Cluster pipelines keep their queue elsewhere; sizes are then not counted
+        sent = payload_size([args for args, _ in getattr(pipe, "command_stack", [])])
+        start = time.perf_counter()
+        results = await pipe.execute()
+        metrics.observe_redis(operation, time.perf_counter() - start, sent, payload_size(results))
+        return results
     
-    def _get_messages_token_count(self, messages: List[Dict[str, str]]) -> int:
+    async def _round_trip(self, operation: str, command: Any) -> Any:
         """
-        Calculate total token count for a list of messages.
+        Await a single command, recording the round trip in the metrics.
         
         Args:
-            messages: List of message dictionaries
+            operation: Memory operation, used as the metric label
+            command: Awaitable issuing the command
             
         Returns:
-            int: Total token count
+            The command's result
         """
-        total_tokens = 0
-        for msg in messages:
-            # Count tokens for role and content
-            total_tokens += self._count_tokens(msg.get("role", ""))
-            total_tokens += self._count_tokens(msg.get("content", ""))
-            # Add overhead for message structure (~4 tokens per message)
-            total_tokens += 4
+        if not metrics.enabled:
+            return await command
+        start = time.perf_counter()
+        result = await command
+        metrics.observe_redis(operation, time.perf_counter() - start, 0, payload_size(result))
+        return result
+    
+    async def _listen_invalidations(self, client: redis.Redis) -> None:
+        """
+        Drop cached sessions that other replicas write to.
+        
+        Reconnects after errors; the whole cache is cleared on reconnect
+        since invalidations may have been missed meanwhile.
         
-        return total_tokens
+        Args:
+            client: Shard client to subscribe on
+        """
+        while True:
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                self.cache.clear()
+                while True:
+                    # Poll with a timeout so a configured socket timeout
+                    # does not break the idle subscription
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is None:
+                        continue
+                    data = message["data"]
+                    if isinstance(data, bytes):
+                        data = data.decode("utf-8")
+                    instance_id, _, session_id = data.partition(":")
+                    if instance_id != self._instance_id:
+                        self.cache.invalidate(session_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Cache invalidation listener failed, retrying: %s", e)
+                await asyncio.sleep(1.0)
+            finally:
+                await pubsub.aclose()
     
-    def _prune_messages(
-        self,
-        messages: List[Dict[str, str]],
-        max_tokens: Optional[int] = None,
-        max_turns: Optional[int] = None
-    ) -> List[Dict[str, str]]:
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Return L1 cache counters, or None if the cache is disabled."""
+        return self.cache.stats() if self.cache is not None else None
+    
+    def redis_shards(self) -> Optional[RedisShardRouter]:
+        """Return the connected Redis shards (None before connect)."""
+        return self.shards
+    
+    def pool_stats(self) -> Optional[Dict[str, Any]]:
+        """Return connection pool utilization per shard, or None if not connected."""
+        return self.shards.stats() if self.shards is not None else None
+    
+    def _get_key(self, session_id: str) -> str:
+        """Get Redis key for a session."""
+        return f"chat:session:{self.shards.key_tag(session_id)}:history"
+    
+    def _get_system_key(self, session_id: str) -> str:
+        """Get Redis key for a session's system message index."""
+        return f"chat:session:{self.shards.key_tag(session_id)}:system"
+    
+    def _get_system_marker_key(self, session_id: str) -> str:
+        """Get Redis key marking a session's system message index as complete."""
+        return f"chat:session:{self.shards.key_tag(session_id)}:system:indexed"
+    
+    def _get_lock_key(self, session_id: str) -> str:
+        """Get Redis key of a session's lease (shared with SessionLockManager)."""
+        return f"chat:session:{self.shards.key_tag(session_id)}:lock"
+    
+    def _get_summary_key(self, session_id: str) -> str:
+        """Get Redis key for a session's rolling summary."""
+        return f"chat:session:{self.shards.key_tag(session_id)}:summary"
+    
+    def _get_trimmed_key(self, session_id: str) -> str:
+        """Get Redis key counting history entries trimmed by retention."""
+        return f"chat:session:{self.shards.key_tag(session_id)}:trimmed"
+    
+    def _parse_summary(self, raw: Optional[bytes]) -> Optional[Dict[str, Any]]:
+        """
+        Parse a stored rolling summary.
+        
+        Args:
+            raw: Raw JSON from Redis (None if no summary exists)
+            
+        Returns:
+            Summary dict with 'content', 'tokens' and 'covered' keys, or None.
+            'covered' counts all entries ever appended, including trimmed ones.
         """
-        Prune messages to fit within token and turn limits.
+        if not raw:
+            return None
+        return json.loads(raw)
+    
+    def _system_index(self, raw_system: List[bytes], indexed: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Decode a session's system message index.
         
-        Strategy: Keep the most recent messages, preserving system messages.
+        Sessions written before the index existed (or whose index expired
+        before the history did) have system messages only in the history
+        list, so the index is only trusted when its marker is set.
         
         Args:
-            messages: List of messages
-            max_tokens: Maximum total tokens (None = no limit)
-            max_turns: Maximum number of turns (None = no limit)
+            raw_system: Raw index entries
+            indexed: Whether the index marker exists
             
         Returns:
-            List[Dict[str, str]]: Pruned messages
+            Decoded system messages, or None if the index is not complete
         """
-        if not messages:
-            return messages
+        if not indexed:
+            return None
+        return [self.codec.decode(msg) for msg in raw_system]
+    
+    async def _queue_append(
+        self,
+        pipe: Any,
+        session_id: str,
+        messages: List[Dict[str, Any]],
+        fence: Optional[int] = None
+    ) -> None:
+        """
+        Queue appends, TTL refreshes and retention trimming on a pipeline.
         
-        # Separate system messages from conversation
-        system_messages = [msg for msg in messages if msg.get("role") == "system"]
-        conversation_messages = [msg for msg in messages if msg.get("role") != "system"]
+        System messages are also added to the per-session system index, so
+        windowed reads can keep them without scanning the whole history
+        list. The index is only trusted once marked complete (see
+        ``_system_index``); it and its marker expire with the history.
         
-        # Apply turn limit if specified
-        if max_turns and len(conversation_messages) > max_turns * 2:
-            # Each turn = 1 user + 1 assistant message
-            conversation_messages = conversation_messages[-(max_turns * 2):]
+        The first queued command returns the entries trimmed from the
+        history list (only when an archive is configured), or None if the
+        fencing token did not match and nothing was written; pass it to
+        ``_finish_append``.
         
-        # Apply token limit if specified
-        if max_tokens:
-            current_tokens = self._get_messages_token_count(system_messages + conversation_messages)
-            
-            while current_tokens > max_tokens and conversation_messages:
-                # Remove oldest conversation message
-                removed = conversation_messages.pop(0)
-                current_tokens -= self._count_tokens(removed.get("content", ""))
-                current_tokens -= self._count_tokens(removed.get("role", ""))
-                current_tokens -= 4  # Message overhead
+        Args:
+            pipe: Redis pipeline to queue commands on
+            session_id: Unique session identifier
+            messages: Message records built with ``_build_message``
+            fence: Fencing token the session lease must carry (None = unconditional)
+        """
+        if self._append_script is None:
+            # The script is run on each shard's pipeline; any client can create it
+            self._append_script = self.shards.client_for(session_id).register_script(
+                APPEND_AND_TRIM_SCRIPT
+            )
         
-        # Reconstruct with system messages first
-        return system_messages + conversation_messages
+        # Append messages to list, refresh the TTLs and trim to retention
+        await self._append_script(
+            keys=[
+                self._get_key(session_id),
+                self._get_trimmed_key(session_id),
+                self._get_system_key(session_id),
+                self._get_system_marker_key(session_id),
+                self._get_lock_key(session_id),
+                self._get_summary_key(session_id)
+            ],
+            args=[
+                settings.redis_ttl_seconds,
+                settings.history_retention_messages,
+                "1" if self.archive else "0",
+                "".join("1" if msg["role"] == "system" else "0" for msg in messages),
+                "" if fence is None else fence,
+                *[self.codec.encode(msg) for msg in messages]
+            ],
+            client=pipe
+        )
+        
+        self._queue_invalidation(pipe, session_id)
     
-    def _get_key(self, session_id: str) -> str:
-        """Get Redis key for a session."""
-        return f"chat:session:{session_id}:history"
+    def _queue_invalidation(self, pipe: Any, session_id: str) -> None:
+        """Queue a cache invalidation notice for other replicas."""
+        if self.cache is not None:
+            pipe.publish(INVALIDATION_CHANNEL, f"{self._instance_id}:{session_id}")
     
-    async def add_message(
+    def _apply_to_cache(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """
+        Apply a successful write to the cached session (write-through).
+        
+        Mirrors the append script: appends, then trims to retention.
+        
+        Args:
+            session_id: Unique session identifier
+            messages: Message records that were appended
+        """
+        if self.cache is None:
+            return
+        entry = self.cache.peek(session_id)
+        if entry is None:
+            return
+        
+        entry.messages.extend(messages)
+        if entry.system_messages is not None:
+            entry.system_messages.extend(msg for msg in messages if msg["role"] == "system")
+        
+        retention = settings.history_retention_messages
+        if retention and len(entry.messages) > retention:
+            overflow = len(entry.messages) - retention
+            del entry.messages[:overflow]
+            entry.trimmed += overflow
+    
+    async def add_messages(
         self,
         session_id: str,
-        role: str,
-        content: str
+        messages: List[Tuple[str, str]],
+        fence: Optional[int] = None
     ) -> None:
         """
-        Add a message to conversation history.
+        Add several messages to conversation history in one round trip.
+        
+        The appends, TTL refresh and retention trim run in a single
+        MULTI/EXEC transaction, so the messages land together and in order.
         
         Args:
             session_id: Unique session identifier
-            role: Message role ('user', 'assistant', 'system')
-            content: Message content
+            messages: List of (role, content) tuples, oldest first
+            fence: Fencing token the session lease must carry (None = unconditional)
+            
+        Raises:
+            SessionLeaseLost: If the lease no longer carries ``fence``
         """
-        if not self.redis_client:
-            await self.connect()
+        if not messages:
+            return
         
-        message = {
-            "role": role,
-            "content": content
-        }
+        client = await self._client(session_id)
+        records = [self._build_message(role, content) for role, content in messages]
         
-        key = self._get_key(session_id)
+        pipe = client.pipeline(transaction=True)
+        await self._queue_append(pipe, session_id, records, fence)
+        results = await self._execute("append", pipe)
+        self._finish_append(session_id, results[0], fence)
+        self._apply_to_cache(session_id, records)
+        
+        logger.debug("Added %s message(s) to session %s", len(records), session_id)
+    
+    def _finish_append(self, session_id: str, raw_trimmed: Optional[List[bytes]], fence: Optional[int]) -> None:
+        """
+        Check the append script's reply and archive what it trimmed.
+        
+        Trimmed entries are sent to the archive in the background.
+        
+        Args:
+            session_id: Unique session identifier
+            raw_trimmed: Reply of the append script
+            fence: Fencing token the append was conditional on
+            
+        Raises:
+            SessionLeaseLost: If the script wrote nothing because the lease
+                no longer carried ``fence``
+        """
+        if raw_trimmed is None:
+            raise SessionLeaseLost(
+                f"Lost the lock on session {session_id} (fencing token {fence})"
+            )
+        if raw_trimmed:
+            self._archive_messages(session_id, [self.codec.decode(msg) for msg in raw_trimmed])
+    
+    async def _read_history(
+        self,
+        session_id: str,
+        max_tokens: Optional[int],
+        max_turns: Optional[int],
+        strategy: PruningStrategy,
+        append: Optional[List[Dict[str, Any]]] = None,
+        fence: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Read pruned history, appending messages in the same transaction.
         
-        # Append message to list
-        await self.redis_client.rpush(key, json.dumps(message))
+        Uses the in-process cache if enabled, otherwise a windowed tail
+        read when the strategy allows one, otherwise a full read.
         
-        # Set TTL on the key
-        await self.redis_client.expire(key, settings.redis_ttl_seconds)
+        Args:
+            session_id: Unique session identifier
+            max_tokens: Maximum total tokens (None = no limit)
+            max_turns: Maximum number of turns (None = no limit)
+            strategy: Pruning strategy
+            append: Message records to append after the read (None = read only)
+            fence: Fencing token the append is conditional on (None = unconditional)
+            
+        Returns:
+            Tuple of (pruned messages with summary, number of list entries read)
+        """
+        client = await self._client(session_id)
         
-        logger.debug(f"Added {role} message to session {session_id}")
+        window_limits = None
+        if settings.history_read_mode == "windowed":
+            window_limits = strategy.window_limits(max_tokens, max_turns)
+        
+        if self.cache is not None:
+            pruned_messages, read_count = await self._load_cached_history(
+                client,
+                session_id,
+                max_tokens,
+                max_turns,
+                strategy,
+                append=append,
+                fence=fence
+            )
+        elif window_limits is not None:
+            pruned_messages, read_count = await self._read_history_window(
+                client, session_id, *window_limits, append=append, fence=fence
+            )
+        else:
+            key = self._get_key(session_id)
+            
+            # Get all messages (and the rolling summary) from Redis
+            pipe = client.pipeline(transaction=True)
+            pipe.lrange(key, 0, -1)
+            pipe.lrange(self._get_system_key(session_id), 0, -1)
+            pipe.exists(self._get_system_marker_key(session_id))
+            pipe.get(self._get_summary_key(session_id))
+            pipe.get(self._get_trimmed_key(session_id))
+            if append:
+                await self._queue_append(pipe, session_id, append, fence)
+            results = await self._execute("read_history", pipe)
+            raw_messages, raw_system, indexed, raw_summary, raw_trimmed = results[:5]
+            if append:
+                self._finish_append(session_id, results[5], fence)
+            
+            # Decode stored messages
+            messages = [self.codec.decode(msg) for msg in raw_messages]
+            read_count = len(messages)
+            
+            pruned_messages = self._assemble_history(
+                messages,
+                self._system_index(raw_system, indexed),
+                self._parse_summary(raw_summary),
+                int(raw_trimmed or 0),
+                max_tokens,
+                max_turns,
+                strategy
+            )
+        
+        return pruned_messages, read_count
     
-    async def get_history(
+    async def _load_cached_history(
         self,
+        client: redis.Redis,
         session_id: str,
-        max_tokens: Optional[int] = None,
-        max_turns: Optional[int] = None
-    ) -> List[Dict[str, str]]:
+        max_tokens: Optional[int],
+        max_turns: Optional[int],
+        strategy: PruningStrategy,
+        append: Optional[List[Dict[str, Any]]] = None,
+        fence: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
         """
-        Retrieve conversation history for a session.
+        Load history through the in-process cache.
+        
+        A miss reads the session's full state in one round trip and caches
+        it; a hit reads nothing from Redis. Appends are always written to
+        Redis and then applied to the cached entry.
         
         Args:
+            client: Client of the session's shard
             session_id: Unique session identifier
-            max_tokens: Maximum tokens to return (uses config default if None)
-            max_turns: Maximum turns to return (uses config default if None)
+            max_tokens: Maximum total tokens (None = no limit)
+            max_turns: Maximum number of turns (None = no limit)
+            strategy: Pruning strategy
+            append: Message records to append after the read
+            fence: Fencing token the append is conditional on (None = unconditional)
             
         Returns:
-            List[Dict[str, str]]: Conversation history
+            Tuple of (pruned messages, number of list entries read)
         """
-        if not self.redis_client:
-            await self.connect()
+        entry = self.cache.get(session_id)
+        read_count = 0
+        
+        if entry is None:
+            pipe = client.pipeline(transaction=True)
+            pipe.lrange(self._get_key(session_id), 0, -1)
+            pipe.lrange(self._get_system_key(session_id), 0, -1)
+            pipe.exists(self._get_system_marker_key(session_id))
+            pipe.get(self._get_summary_key(session_id))
+            pipe.get(self._get_trimmed_key(session_id))
+            if append:
+                await self._queue_append(pipe, session_id, append, fence)
+            results = await self._execute("read_history", pipe)
+            raw_messages, raw_system, indexed, raw_summary, raw_trimmed = results[:5]
+            if append:
+                self._finish_append(session_id, results[5], fence)
+            
+            entry = CachedSession(
+                messages=[self.codec.decode(msg) for msg in raw_messages],
+                system_messages=self._system_index(raw_system, indexed),
+                summary=self._parse_summary(raw_summary),
+                trimmed=int(raw_trimmed or 0)
+            )
+            read_count = len(entry.messages)
+            self.cache.put(session_id, entry)
+        elif append:
+            pipe = client.pipeline(transaction=True)
+            await self._queue_append(pipe, session_id, append, fence)
+            results = await self._execute("append", pipe)
+            self._finish_append(session_id, results[0], fence)
+        
+        pruned_messages = self._assemble_history(
+            entry.messages,
+            entry.system_messages,
+            entry.summary,
+            entry.trimmed,
+            max_tokens,
+            max_turns,
+            strategy
+        )
+        
+        if append:
+            self._apply_to_cache(session_id, append)
+        
+        return pruned_messages, read_count
+    
+    async def _read_history_window(
+        self,
+        client: redis.Redis,
+        session_id: str,
+        max_tokens: Optional[int],
+        max_turns: Optional[int],
+        append: Optional[List[Dict[str, Any]]] = None,
+        fence: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Read only the newest messages needed to fill the history budget.
+        
+        Walks the history list backwards in chunks of
+        ``history_read_chunk_size`` and stops as soon as the turn or token
+        budget is exhausted. System messages come from the per-session
+        system index and are always kept, so the result is identical to
+        running ``_prune_messages`` over the full list with the
+        token-window strategy. If a rolling summary exists, its tokens
+        count against the budget and messages it covers are not read.
         
+        Sessions without a complete system index (see ``_system_index``)
+        fall back to reading the whole list once.
+        
+        Args:
+            client: Client of the session's shard
+            session_id: Unique session identifier
+            max_tokens: Maximum total tokens (None = no limit)
+            max_turns: Maximum number of turns (None = no limit)
+            append: Message records to append in the first round trip
+            fence: Fencing token the append is conditional on (None = unconditional)
+            
+        Returns:
+            Tuple of (pruned messages, number of list entries read)
+        """
         key = self._get_key(session_id)
+        chunk_size = settings.history_read_chunk_size
         
-        # Get all messages from Redis
-        raw_messages = await self.redis_client.lrange(key, 0, -1)
+        # First round trip: system index, list length and the newest chunk.
+        # MULTI keeps the length consistent with the chunk we read.
+        pipe = client.pipeline(transaction=True)
+        pipe.lrange(self._get_system_key(session_id), 0, -1)
+        pipe.exists(self._get_system_marker_key(session_id))
+        pipe.llen(key)
+        pipe.lrange(key, -chunk_size, -1)
+        pipe.get(self._get_summary_key(session_id))
+        pipe.get(self._get_trimmed_key(session_id))
+        if append:
+            await self._queue_append(pipe, session_id, append, fence)
+        results = await self._execute("read_history", pipe)
+        raw_system, indexed, length, raw_chunk, raw_summary, raw_trimmed = results[:6]
+        if append:
+            self._finish_append(session_id, results[6], fence)
         
-        if not raw_messages:
-            return []
+        summary = self._parse_summary(raw_summary)
+        system_messages = self._system_index(raw_system, indexed)
+        if system_messages is None and length:
+            # Entries before our append; positive indices are not shifted by it
+            raw_messages = await self._round_trip(
+                "read_history_chunk", client.lrange(key, 0, length - 1)
+            )
+            messages = [self.codec.decode(msg) for msg in raw_messages]
+            pruned_messages = self._assemble_history(
+                messages, None, summary, int(raw_trimmed or 0),
+                max_tokens, max_turns, TokenWindowStrategy()
+            )
+            return pruned_messages, len(raw_chunk) + len(messages)
+        system_messages = system_messages or []
         
-        # Parse JSON messages
-        messages = [json.loads(msg) for msg in raw_messages]
+        min_index = self._covered_index(summary, int(raw_trimmed or 0))
         
-        # Apply pruning
-        max_tokens = max_tokens or settings.max_history_tokens
-        max_turns = max_turns or settings.max_history_turns
+        token_budget = None
+        if max_tokens:
+            token_budget = max_tokens - self._get_messages_token_count(system_messages)
+            if summary:
+                token_budget -= summary["tokens"]
+        max_conversation = max_turns * 2 if max_turns else None
         
-        pruned_messages = self._prune_messages(messages, max_tokens, max_turns)
+        # Collected newest-first, reversed at the end
+        kept: List[Dict[str, Any]] = []
+        used_tokens = 0
+        read_count = 0
+        # Positive index of the oldest entry in the current chunk, so
+        # concurrent appends do not shift the window between reads
+        chunk_start = max(length - chunk_size, 0)
+        
+        while raw_chunk:
+            read_count += len(raw_chunk)
+            exhausted = False
+            
+            for offset in range(len(raw_chunk) - 1, -1, -1):
+                if chunk_start + offset < min_index:
+                    exhausted = True
+                    break
+                msg = self.codec.decode(raw_chunk[offset])
+                if msg.get("role") == "system":
+                    continue
+                if max_conversation is not None and len(kept) >= max_conversation:
+                    exhausted = True
+                    break
+                tokens = self._message_tokens(msg)
+                if token_budget is not None and used_tokens + tokens > token_budget:
+                    exhausted = True
+                    break
+                kept.append(msg)
+                used_tokens += tokens
+            
+            if exhausted or chunk_start <= min_index:
+                break
+            
+            chunk_end = chunk_start - 1
+            chunk_start = max(chunk_start - chunk_size, 0)
+            raw_chunk = await self._round_trip(
+                "read_history_chunk", client.lrange(key, chunk_start, chunk_end)
+            )
+        
+        kept.reverse()
+        return self._insert_summary(system_messages + kept, summary), read_count
+    
+    async def get_compaction_state(
+        self,
+        session_id: str
+    ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]], int]:
+        """
+        Load the rolling summary and the messages it does not cover yet.
+        
+        Args:
+            session_id: Unique session identifier
+            
+        Returns:
+            Tuple of (summary or None, messages after the summarized prefix,
+            absolute position of the first returned message)
+        """
+        client = await self._client(session_id)
         
-        logger.debug(
-            f"Retrieved {len(pruned_messages)} messages for session {session_id} "
-            f"(original: {len(messages)}, tokens: {self._get_messages_token_count(pruned_messages)})"
+        pipe = client.pipeline(transaction=True)
+        pipe.get(self._get_summary_key(session_id))
+        pipe.get(self._get_trimmed_key(session_id))
+        raw_summary, raw_trimmed = await self._execute("compaction_state", pipe)
+        
+        summary = self._parse_summary(raw_summary)
+        trimmed = int(raw_trimmed or 0)
+        start = self._covered_index(summary, trimmed)
+        raw_messages = await self._round_trip(
+            "compaction_state", client.lrange(self._get_key(session_id), start, -1)
         )
         
-        return pruned_messages
+        return summary, [self.codec.decode(msg) for msg in raw_messages], start + trimmed
+    
+    async def save_summary(
+        self,
+        session_id: str,
+        content: str,
+        covered: int,
+        expected_covered: int
+    ) -> bool:
+        """
+        Store a new rolling summary if no other compaction won the race.
+        
+        Args:
+            session_id: Unique session identifier
+            content: Summary text
+            covered: Number of history entries ever appended that the summary covers
+            expected_covered: Coverage of the summary this one replaces
+            
+        Returns:
+            bool: True if stored, False if the summary changed concurrently
+        """
+        client = await self._client(session_id)
+        
+        summary_key = self._get_summary_key(session_id)
+        summary = self._new_summary(content, covered)
+        
+        try:
+            async with client.pipeline(transaction=True) as pipe:
+                await self._round_trip("save_summary", pipe.watch(summary_key))
+                current = self._parse_summary(await self._round_trip("save_summary", pipe.get(summary_key)))
+                if (current["covered"] if current else 0) != expected_covered:
+                    return False
+                pipe.multi()
+                pipe.set(summary_key, json.dumps(summary), ex=settings.redis_ttl_seconds)
+                # The session expires as a whole, as in the other backends
+                for key in (
+                    self._get_key(session_id),
+                    self._get_system_key(session_id),
+                    self._get_system_marker_key(session_id),
+                    self._get_trimmed_key(session_id)
+                ):
+                    pipe.expire(key, settings.redis_ttl_seconds)
+                self._queue_invalidation(pipe, session_id)
+                await self._execute("save_summary", pipe)
+        except WatchError:
+            return False
+        
+        if self.cache is not None:
+            entry = self.cache.peek(session_id)
+            if entry is not None:
+                entry.summary = summary
+        
+        logger.debug("Saved summary for session %s (covers %s messages)", session_id, covered)
+        return True
     
     async def clear_history(self, session_id: str) -> None:
         """
@@ -218,14 +785,22 @@ class RedisConversationMemory:
         Args:
             session_id: Unique session identifier
         """
-        if not self.redis_client:
-            await self.connect()
+        client = await self._client(session_id)
         
         key = self._get_key(session_id)
-        await self.redis_client.delete(key)
+        pipe = client.pipeline(transaction=True)
+        pipe.delete(
+            key,
+            self._get_system_key(session_id),
+            self._get_system_marker_key(session_id),
+            self._get_summary_key(session_id),
+            self._get_trimmed_key(session_id)
+        )
+        self._queue_invalidation(pipe, session_id)
+        await self._execute("clear", pipe)
         
-        logger.info(f"Cleared history for session {session_id}")
-
+        if self.cache is not None:
+            self.cache.invalidate(session_id)
+        
+        logger.info("Cleared history for session %s", session_id)
 
-# Global memory instance
-memory = RedisConversationMemory()
@@ -0,0 +1,289 @@
+"""Per-session locks serializing chat turns, within and across replicas."""
+
+import asyncio
+from typing import Dict, Optional
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.memory.sharding import RedisShardRouter
+
+logger = get_logger("memory.session_lock")
+
+# Takes the lease if it is free and returns a new fencing token (0 if held).
+# KEYS[1] = lease key, KEYS[2] = fencing counter key
+# ARGV[1] = lease in milliseconds, ARGV[2] = counter TTL in seconds
+ACQUIRE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+local fence = redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+redis.call('SET', KEYS[1], fence, 'PX', ARGV[1])
+return fence
+"""
+
+# Extends the lease if it still carries our token (1), else 0.
+# KEYS[1] = lease key; ARGV[1] = fencing token, ARGV[2] = lease in milliseconds
+RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Deletes the lease if it still carries our token.
+# KEYS[1] = lease key; ARGV[1] = fencing token
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Polling interval bounds while waiting for another replica's lease
+_POLL_MIN_SECONDS = 0.05
+_POLL_MAX_SECONDS = 0.5
+
+
+class SessionBusy(Exception):
+    """Raised when a session's lock could not be acquired in time."""
+
+
+class SessionLeaseLost(Exception):
+    """Raised when a session's Redis lease expired or was taken over."""
+
+
+class SessionLease:
+    """
+    A held session lock.
+
+    With distributed locking, the lease also holds a Redis lease identified
+    by a fencing token: a number that increases with every acquisition of
+    the session. History writes pass the token to the memory backend, which
+    checks it against the lease in the same atomic step as the write, so a
+    holder whose lease expired (a long pause, a network partition) cannot
+    write after it was superseded.
+    """
+
+    def __init__(
+        self,
+        manager: "SessionLockManager",
+        session_id: str,
+        fence: Optional[int] = None
+    ):
+        """
+        Initialize the lease.
+
+        Args:
+            manager: Manager that granted the lease
+            session_id: Locked session
+            fence: Fencing token of the Redis lease (None = in-process only)
+        """
+        self.manager = manager
+        self.session_id = session_id
+        self.fence = fence
+        self.lost = False
+        self.released = False
+        self._renew_task: Optional[asyncio.Task] = None
+        if fence is not None:
+            self._renew_task = asyncio.create_task(manager._renew(self))
+
+    async def release(self) -> None:
+        """Release the lock. Safe to call more than once."""
+        if self.released:
+            return
+        self.released = True
+        if self._renew_task is not None:
+            self._renew_task.cancel()
+        try:
+            if self.fence is not None and not self.lost:
+                await self.manager._release_lease(self)
+        except Exception as e:
+            # The lease expires on its own
+            logger.warning("Failed to release Redis lease for session %s: %s", self.session_id, e)
+        finally:
+            self.manager._release_local(self.session_id)
+
+
+class SessionLockManager:
+    """
+    Grants exclusive access to a session for the duration of a turn.
+
+    Requests in this process are serialized by an ``asyncio.Lock`` per
+    session. With ``session_lock_distributed`` enabled, the holder also takes
+    a Redis lease (renewed while held), so replicas behind a load balancer
+    exclude each other too.
+    """
+
+    def __init__(
+        self,
+        shards: Optional[RedisShardRouter] = None,
+        distributed: Optional[bool] = None
+    ):
+        """
+        Initialize the manager.
+
+        Args:
+            shards: Redis shards holding leases (connects from settings if None)
+            distributed: Take Redis leases (uses config if None)
+        """
+        self.shards = shards
+        self.distributed = settings.session_lock_distributed if distributed is None else distributed
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Holders plus waiters per session; the lock is dropped at zero
+        self._users: Dict[str, int] = {}
+        self._scripts: Dict[str, object] = {}
+
+    async def connect(self):
+        """Connect to the configured Redis shards."""
+        if self.shards is None:
+            self.shards = await RedisShardRouter.from_settings()
+
+    async def disconnect(self):
+        """Close Redis connections."""
+        if self.shards is not None:
+            await self.shards.close()
+            self.shards = None
+
+    async def _client(self, session_id: str):
+        """Return the client of the shard owning a session, connecting if needed."""
+        if self.shards is None:
+            await self.connect()
+        return self.shards.client_for(session_id)
+
+    def _get_key(self, session_id: str) -> str:
+        """Get Redis key of a session's lease."""
+        return f"chat:session:{self.shards.key_tag(session_id)}:lock"
+
+    def _get_fence_key(self, session_id: str) -> str:
+        """Get Redis key of a session's fencing counter."""
+        return f"chat:session:{self.shards.key_tag(session_id)}:fence"
+
+    async def _run_script(self, name: str, source: str, session_id: str, keys, args):
+        """Run a Lua script on the shard owning a session."""
+        client = await self._client(session_id)
+        script = self._scripts.get(name)
+        if script is None:
+            script = self._scripts[name] = client.register_script(source)
+        return await script(keys=keys, args=args, client=client)
+
+    async def is_locked(self, session_id: str) -> bool:
+        """
+        Return True if a turn currently holds (or waits for) the session.
+
+        Args:
+            session_id: Unique session identifier
+        """
+        if session_id in self._users:
+            return True
+        if not self.distributed:
+            return False
+        client = await self._client(session_id)
+        return bool(await client.exists(self._get_key(session_id)))
+
+    async def acquire(self, session_id: str, timeout: Optional[float] = None) -> SessionLease:
+        """
+        Acquire a session, waiting for the current holder if needed.
+
+        Args:
+            session_id: Unique session identifier
+            timeout: Seconds to wait (None = no limit, 0 = fail if held)
+
+        Returns:
+            SessionLease: The held lock; release it when the turn ends
+
+        Raises:
+            SessionBusy: If the session is still held after ``timeout``
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        self._users[session_id] = self._users.get(session_id, 0) + 1
+        try:
+            if timeout is not None and timeout <= 0:
+                if lock.locked():
+                    raise SessionBusy(f"Session {session_id} is busy")
+                await lock.acquire()
+            else:
+                try:
+                    await asyncio.wait_for(lock.acquire(), timeout)
+                except asyncio.TimeoutError:
+                    raise SessionBusy(f"Timed out waiting for session {session_id}")
+        except BaseException:
+            self._drop_user(session_id)
+            raise
+
+        if not self.distributed:
+            return SessionLease(self, session_id)
+
+        try:
+            fence = await self._acquire_lease(session_id, deadline)
+        except BaseException:
+            self._release_local(session_id)
+            raise
+        return SessionLease(self, session_id, fence)
+
+    async def _acquire_lease(self, session_id: str, deadline: Optional[float]) -> int:
+        """Poll for the Redis lease until it is free or the deadline passes."""
+        loop = asyncio.get_running_loop()
+        lease_ms = int(settings.session_lock_lease_seconds * 1000)
+        delay = _POLL_MIN_SECONDS
+        # Key names depend on the shard layout, so connect before building them
+        await self._client(session_id)
+        while True:
+            fence = await self._run_script(
+                "acquire", ACQUIRE_SCRIPT, session_id,
+                keys=[self._get_key(session_id), self._get_fence_key(session_id)],
+                args=[lease_ms, settings.redis_ttl_seconds]
+            )
+            if fence:
+                return int(fence)
+
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise SessionBusy(f"Session {session_id} is busy on another replica")
+                delay = min(delay, remaining)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _POLL_MAX_SECONDS)
+
+    async def _renew(self, lease: SessionLease) -> None:
+        """Extend a Redis lease until it is released or lost."""
+        lease_ms = int(settings.session_lock_lease_seconds * 1000)
+        while True:
+            await asyncio.sleep(settings.session_lock_lease_seconds / 3)
+            try:
+                renewed = await self._run_script(
+                    "renew", RENEW_SCRIPT, lease.session_id,
+                    keys=[self._get_key(lease.session_id)],
+                    args=[lease.fence, lease_ms]
+                )
+            except Exception as e:
+                # Retried on the next tick; the lease is still valid until it expires
+                logger.warning("Failed to renew Redis lease for session %s: %s", lease.session_id, e)
+                continue
+            if not renewed:
+                lease.lost = True
+                logger.warning("Redis lease for session %s was lost (fencing token %s)", lease.session_id, lease.fence)
+                return
+
+    async def _release_lease(self, lease: SessionLease) -> None:
+        """Delete a Redis lease if it still carries the holder's token."""
+        await self._run_script(
+            "release", RELEASE_SCRIPT, lease.session_id,
+            keys=[self._get_key(lease.session_id)],
+            args=[lease.fence]
+        )
+
+    def _release_local(self, session_id: str) -> None:
+        """Release the in-process lock of a session."""
+        self._locks[session_id].release()
+        self._drop_user(session_id)
+
+    def _drop_user(self, session_id: str) -> None:
+        """Forget a session's lock once nobody holds or waits for it."""
+        self._users[session_id] -= 1
+        if self._users[session_id] == 0:
+            del self._users[session_id]
+            del self._locks[session_id]
@@ -0,0 +1,252 @@
+"""Redis connection pools and session routing across shards."""
+
+import asyncio
+import bisect
+import hashlib
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import redis.asyncio as redis
+from redis.asyncio.cluster import RedisCluster
+from redis.asyncio.connection import BlockingConnectionPool, parse_url
+from redis.exceptions import ConnectionError
+
+from src.core.config import settings
+from src.core.logging import get_logger
+
+logger = get_logger("memory.sharding")
+
+# Seconds between slot map refreshes in cluster mode
+CLUSTER_REFRESH_SECONDS = 30.0
+
+
+class MeteredConnectionPool(BlockingConnectionPool):
+    """
+    Blocking connection pool that counts waits for a free connection.
+
+    When all ``max_connections`` are in use, callers wait up to ``timeout``
+    seconds for one to be released instead of failing immediately.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.acquisitions = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+
+    async def get_connection(self, command_name, *keys, **options):
+        """Get a connection, recording how long the caller had to wait."""
+        self.acquisitions += 1
+        if self.can_get_connection():
+            return await super().get_connection(command_name, *keys, **options)
+
+        self.waits += 1
+        start = time.perf_counter()
+        try:
+            return await super().get_connection(command_name, *keys, **options)
+        except ConnectionError as e:
+            if isinstance(e.__cause__, asyncio.TimeoutError):
+                self.timeouts += 1
+            raise
+        finally:
+            self.wait_seconds += time.perf_counter() - start
+
+
+def pool_stats(pool: Any) -> Dict[str, Any]:
+    """
+    Return utilization counters for a connection pool.
+
+    Args:
+        pool: redis-py connection pool (metered or not)
+
+    Returns:
+        dict: Connections in use, idle and allowed, plus wait counters
+    """
+    in_use = len(pool._in_use_connections)
+    stats = {
+        "in_use": in_use,
+        "idle": len(pool._available_connections),
+        "max_connections": pool.max_connections,
+        "utilization": in_use / pool.max_connections if pool.max_connections else 0.0,
+    }
+    if isinstance(pool, MeteredConnectionPool):
+        stats.update({
+            "acquisitions": pool.acquisitions,
+            "waits": pool.waits,
+            "wait_seconds_total": round(pool.wait_seconds, 6),
+            "timeouts": pool.timeouts,
+        })
+    return stats
+
+
+def _hash(value: str) -> int:
+    """Stable 64-bit hash (Python's hash() differs between processes)."""
+    return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping keys to nodes.
+
+    Each node is placed at ``replicas`` points on the ring, so adding or
+    removing a node only moves about 1/N of the keys.
+    """
+
+    def __init__(self, nodes: List[str], replicas: int = 160):
+        """
+        Build the ring.
+
+        Args:
+            nodes: Node names
+            replicas: Virtual points per node
+        """
+        if not nodes:
+            raise ValueError("HashRing needs at least one node")
+
+        points: List[Tuple[int, str]] = sorted(
+            (_hash(f"{node}#{i}"), node) for node in nodes for i in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def get_node(self, key: str) -> str:
+        """Return the node owning a key."""
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._nodes[index]
+
+
+def _connection_kwargs() -> Dict[str, Any]:
+    """Connection pool options shared by every shard."""
+    return {
+        "max_connections": settings.redis_max_connections,
+        "timeout": settings.redis_pool_timeout,
+        "socket_timeout": settings.redis_socket_timeout,
+        "socket_connect_timeout": settings.redis_socket_connect_timeout,
+        "health_check_interval": settings.redis_health_check_interval,
+        # Messages are stored in a binary codec, so responses stay bytes
+        "decode_responses": False,
+    }
+
+
+def _create_client(url: str, **overrides: Any) -> redis.Redis:
+    """Create a client with its own metered connection pool."""
+    options = {**parse_url(url), **_connection_kwargs(), **overrides}
+    return redis.Redis(connection_pool=MeteredConnectionPool(**options))
+
+
+def _redact(url: str) -> str:
+    """Drop credentials from a Redis URL for logging."""
+    scheme, sep, rest = url.partition("://")
+    return f"{scheme}{sep}{rest.rpartition('@')[2]}" if sep else url
+
+
+class RedisShardRouter:
+    """
+    Routes sessions to Redis shards.
+
+    Every key of a session lives on the same shard, so per-session
+    transactions and scripts keep working unchanged. Shards are either a
+    fixed list of nodes behind a consistent hash ring, or the primaries of
+    a Redis Cluster, in which case keys carry a ``{session_id}`` hash tag
+    and sessions follow the cluster's slot map.
+    """
+
+    def __init__(
+        self,
+        clients: Dict[str, redis.Redis],
+        cluster: Optional[RedisCluster] = None
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            clients: Client per shard name
+            cluster: Cluster client used for slot lookups (None = hash ring)
+        """
+        self.clients = clients
+        self.cluster = cluster
+        self.ring = HashRing(list(clients)) if cluster is None else None
+        self._refresh_task: Optional[asyncio.Task] = None
+        if cluster is not None:
+            self._refresh_task = asyncio.create_task(self._refresh_slots())
+
+    @classmethod
+    async def from_settings(cls) -> "RedisShardRouter":
+        """
+        Connect to the shards configured in settings.
+
+        Uses the Redis Cluster at ``redis_url`` if ``redis_cluster`` is set,
+        otherwise the nodes in ``redis_urls`` (falling back to ``redis_url``).
+        """
+        if settings.redis_cluster:
+            cluster = RedisCluster.from_url(settings.redis_url)
+            await cluster.initialize()
+            clients = {
+                node.name: _create_client(settings.redis_url, host=node.host, port=node.port)
+                for node in cluster.get_primaries()
+            }
+            logger.info("Connected to Redis Cluster at %s (%s primaries)", _redact(settings.redis_url), len(clients))
+            return cls(clients, cluster)
+
+        urls = settings.redis_urls or [settings.redis_url]
+        clients = {_redact(url): _create_client(url) for url in urls}
+        logger.info("Connected to Redis shards: %s", ', '.join(clients))
+        return cls(clients)
+
+    def key_tag(self, session_id: str) -> str:
+        """Return the session part of key names (hash-tagged in cluster mode)."""
+        return f"{{{session_id}}}" if self.cluster is not None else session_id
+
+    def client_for(self, session_id: str) -> redis.Redis:
+        """
+        Return the client for the shard owning a session.
+
+        Args:
+            session_id: Unique session identifier
+
+        Returns:
+            redis.Redis: Client of the owning shard
+        """
+        if self.cluster is None:
+            return self.clients[self.ring.get_node(session_id)]
+
+        node = self.cluster.get_node_from_key(self.key_tag(session_id))
+        client = self.clients.get(node.name)
+        if client is None:
+            # A primary that appeared after a topology change
+            client = _create_client(settings.redis_url, host=node.host, port=node.port)
+            self.clients[node.name] = client
+        return client
+
+    def broadcast_clients(self) -> List[redis.Redis]:
+        """
+        Return the clients to subscribe on to receive every published message.
+
+        Cluster nodes forward PUBLISH to each other, so one node suffices.
+        """
+        clients = list(self.clients.values())
+        return clients[:1] if self.cluster is not None else clients
+
+    async def _refresh_slots(self) -> None:
+        """Periodically reload the cluster slot map so resharding is picked up."""
+        while True:
+            await asyncio.sleep(CLUSTER_REFRESH_SECONDS)
+            try:
+                await self.cluster.nodes_manager.initialize()
+            except Exception as e:
+                logger.warning("Failed to refresh Redis Cluster slots: %s", e)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return connection pool utilization per shard."""
+        return {name: pool_stats(client.connection_pool) for name, client in self.clients.items()}
+
+    async def close(self) -> None:
+        """Close every shard's connections."""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        for client in self.clients.values():
+            await client.aclose()
+            await client.connection_pool.disconnect()
+        if self.cluster is not None:
+            await self.cluster.aclose()
@@ -0,0 +1,378 @@
+"""SQLite-based conversation memory for single-node deployments."""
+
+import asyncio
+import json
+import sqlite3
+import time
+from typing import Any, List, Dict, Optional, Tuple
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.memory.base import BaseConversationMemory
+from src.memory.pruning import PruningStrategy
+from src.memory.archive import BaseHistoryArchive
+
+logger = get_logger("memory.sqlite")
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    next_seq INTEGER NOT NULL DEFAULT 0,
+    trimmed INTEGER NOT NULL DEFAULT 0,
+    summary TEXT,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS system_messages (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteConversationMemory(BaseConversationMemory):
+    """
+    Conversation memory stored in a local SQLite database in WAL mode.
+
+    Every operation runs as one transaction in a worker thread, so the
+    event loop never blocks on disk I/O. WAL mode lets several worker
+    processes on the same node share the database file.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        archive: Optional[BaseHistoryArchive] = None
+    ):
+        """
+        Initialize the backend.
+
+        Args:
+            path: Database file path (uses config default if None)
+            archive: Sink for messages trimmed by retention (uses config if None)
+        """
+        super().__init__(archive)
+        self.path = path or settings.sqlite_memory_path
+        self._connection: Optional[sqlite3.Connection] = None
+        # One connection is shared, so calls into it are serialized
+        self._lock = asyncio.Lock()
+        self._last_sweep = time.monotonic()
+
+    async def connect(self):
+        """Open the database and create the schema."""
+        if self._connection is None:
+            self._connection = await asyncio.to_thread(self._open)
+            logger.info("Opened SQLite memory at %s", self.path)
+
+    def _open(self) -> sqlite3.Connection:
+        """Open the connection (runs in a worker thread)."""
+        # Autocommit mode; transactions are started explicitly
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA busy_timeout=5000")
+        connection.executescript(SCHEMA)
+        return connection
+
+    async def disconnect(self):
+        """Close the database connection."""
+        await super().disconnect()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+            logger.info("Closed SQLite memory")
+
+    async def _run(self, func, *args):
+        """
+        Run a transaction function in a worker thread.
+
+        Cancelling the caller does not stop the thread, which may still be
+        inside its transaction, so the lock is held until the thread is done;
+        otherwise the next call would BEGIN on the same open connection.
+        """
+        if self._connection is None:
+            await self.connect()
+        async with self._lock:
+            task = asyncio.ensure_future(asyncio.to_thread(self._transaction, func, *args))
+            try:
+                return await asyncio.shield(task)
+            finally:
+                while not task.done():
+                    try:
+                        await asyncio.wait({task})
+                    except asyncio.CancelledError:
+                        pass
+
+    def _transaction(self, func, *args):
+        """Run func inside BEGIN IMMEDIATE/COMMIT, rolling back on error."""
+        connection = self._connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._sweep_expired(connection)
+            result = func(connection, *args)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return result
+
+    def _sweep_expired(self, connection: sqlite3.Connection) -> None:
+        """Delete expired sessions, at most once per minute."""
+        now = time.monotonic()
+        if now - self._last_sweep < 60:
+            return
+        self._last_sweep = now
+        expired = "SELECT session_id FROM sessions WHERE expires_at <= ?"
+        for table in ("messages", "system_messages", "sessions"):
+            connection.execute(
+                f"DELETE FROM {table} WHERE session_id IN ({expired})", (time.time(),)
+            )
+
+    @staticmethod
+    def _load_session(
+        connection: sqlite3.Connection,
+        session_id: str
+    ) -> Optional[Tuple[int, int, Optional[str]]]:
+        """Return (next_seq, trimmed, summary JSON), dropping expired sessions."""
+        row = connection.execute(
+            "SELECT next_seq, trimmed, summary, expires_at FROM sessions WHERE session_id = ?",
+            (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[3] <= time.time():
+            SQLiteConversationMemory._delete_session(connection, session_id)
+            return None
+        return row[0], row[1], row[2]
+
+    @staticmethod
+    def _delete_session(connection: sqlite3.Connection, session_id: str) -> None:
+        """Delete every row belonging to a session."""
+        for table in ("messages", "system_messages", "sessions"):
+            connection.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
+
+    @staticmethod
+    def _rows_to_messages(rows: List[Tuple[str, str, int]]) -> List[Dict[str, Any]]:
+        """Convert (role, content, tokens) rows to message records."""
+        return [{"role": role, "content": content, "tokens": tokens} for role, content, tokens in rows]
+
+    @staticmethod
+    def _append(
+        connection: sqlite3.Connection,
+        session_id: str,
+        records: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Append records, refresh the TTL and trim to retention.
+
+        Returns:
+            The trimmed records, oldest first
+        """
+        session = SQLiteConversationMemory._load_session(connection, session_id)
+        next_seq, trimmed = (session[0], session[1]) if session else (0, 0)
+        expires_at = time.time() + settings.redis_ttl_seconds
+
+        rows = [
+            (session_id, next_seq + i, msg["role"], msg["content"], msg["tokens"])
+            for i, msg in enumerate(records)
+        ]
+        connection.executemany(
+            "INSERT INTO messages (session_id, seq, role, content, tokens) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+        system_rows = [row for row in rows if row[2] == "system"]
+        if system_rows:
+            connection.executemany(
+                "INSERT INTO system_messages (session_id, seq, role, content, tokens) "
+                "VALUES (?, ?, ?, ?, ?)",
+                system_rows
+            )
+        next_seq += len(records)
+
+        overflow_records: List[Dict[str, Any]] = []
+        retention = settings.history_retention_messages
+        if retention and next_seq - trimmed > retention:
+            boundary = next_seq - retention
+            overflow_records = SQLiteConversationMemory._rows_to_messages(
+                connection.execute(
+                    "SELECT role, content, tokens FROM messages "
+                    "WHERE session_id = ? AND seq < ? ORDER BY seq",
+                    (session_id, boundary)
+                ).fetchall()
+            )
+            connection.execute(
+                "DELETE FROM messages WHERE session_id = ? AND seq < ?",
+                (session_id, boundary)
+            )
+            trimmed = boundary
+
+        connection.execute(
+            "INSERT INTO sessions (session_id, next_seq, trimmed, expires_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET "
+            "next_seq = excluded.next_seq, trimmed = excluded.trimmed, expires_at = excluded.expires_at",
+            (session_id, next_seq, trimmed, expires_at)
+        )
+        return overflow_records
+
+    async def add_messages(
+        self,
+        session_id: str,
+        messages: List[Tuple[str, str]],
+        fence: Optional[int] = None
+    ) -> None:
+        """
+        Add several messages to conversation history in one transaction.
+
+        Args:
+            session_id: Unique session identifier
+            messages: List of (role, content) tuples, oldest first
+            fence: Ignored; leases are only checked by the Redis backend
+        """
+        if not messages:
+            return
+
+        records = [self._build_message(role, content) for role, content in messages]
+        overflow = await self._run(self._append, session_id, records)
+        self._archive_messages(session_id, overflow)
+
+        logger.debug("Added %s message(s) to session %s", len(records), session_id)
+
+    @staticmethod
+    def _read(
+        connection: sqlite3.Connection,
+        session_id: str,
+        append: Optional[List[Dict[str, Any]]]
+    ) -> Tuple[Optional[Tuple[List, List, Optional[str], int]], List[Dict[str, Any]]]:
+        """Read a session's full state, then append (one transaction)."""
+        state = None
+        session = SQLiteConversationMemory._load_session(connection, session_id)
+        if session is not None:
+            messages = connection.execute(
+                "SELECT role, content, tokens FROM messages WHERE session_id = ? ORDER BY seq",
+                (session_id,)
+            ).fetchall()
+            system_messages = connection.execute(
+                "SELECT role, content, tokens FROM system_messages WHERE session_id = ? ORDER BY seq",
+                (session_id,)
+            ).fetchall()
+            state = (messages, system_messages, session[2], session[1])
+
+        overflow: List[Dict[str, Any]] = []
+        if append:
+            overflow = SQLiteConversationMemory._append(connection, session_id, append)
+        return state, overflow
+
+    async def _read_history(
+        self,
+        session_id: str,
+        max_tokens: Optional[int],
+        max_turns: Optional[int],
+        strategy: PruningStrategy,
+        append: Optional[List[Dict[str, Any]]] = None,
+        fence: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Read and prune the stored session, appending in the same transaction."""
+        state, overflow = await self._run(self._read, session_id, append)
+        self._archive_messages(session_id, overflow)
+
+        if state is None:
+            return [], 0
+
+        rows, system_rows, raw_summary, trimmed = state
+        pruned_messages = self._assemble_history(
+            self._rows_to_messages(rows),
+            self._rows_to_messages(system_rows),
+            json.loads(raw_summary) if raw_summary else None,
+            trimmed,
+            max_tokens,
+            max_turns,
+            strategy
+        )
+        return pruned_messages, len(rows)
+
+    @staticmethod
+    def _compaction_state(connection: sqlite3.Connection, session_id: str):
+        """Read the summary and uncovered messages (one transaction)."""
+        session = SQLiteConversationMemory._load_session(connection, session_id)
+        if session is None:
+            return None, [], 0
+
+        _, trimmed, raw_summary = session
+        summary = json.loads(raw_summary) if raw_summary else None
+        start = trimmed + SQLiteConversationMemory._covered_index(summary, trimmed)
+        rows = connection.execute(
+            "SELECT role, content, tokens FROM messages "
+            "WHERE session_id = ? AND seq >= ? ORDER BY seq",
+            (session_id, start)
+        ).fetchall()
+        return summary, SQLiteConversationMemory._rows_to_messages(rows), start
+
+    async def get_compaction_state(
+        self,
+        session_id: str
+    ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]], int]:
+        """Return the summary and the messages it does not cover yet."""
+        return await self._run(self._compaction_state, session_id)
+
+    @staticmethod
+    def _store_summary(
+        connection: sqlite3.Connection,
+        session_id: str,
+        summary: Dict[str, Any],
+        expected_covered: int
+    ) -> bool:
+        """Store the summary if its coverage has not moved (one transaction)."""
+        session = SQLiteConversationMemory._load_session(connection, session_id)
+        if session is None:
+            return False
+
+        current = json.loads(session[2])["covered"] if session[2] else 0
+        if current != expected_covered:
+            return False
+
+        connection.execute(
+            "UPDATE sessions SET summary = ?, expires_at = ? WHERE session_id = ?",
+            (json.dumps(summary), time.time() + settings.redis_ttl_seconds, session_id)
+        )
+        return True
+
+    async def save_summary(
+        self,
+        session_id: str,
+        content: str,
+        covered: int,
+        expected_covered: int
+    ) -> bool:
+        """Store a new rolling summary if no other compaction won the race."""
+        stored = await self._run(
+            self._store_summary,
+            session_id,
+            self._new_summary(content, covered),
+            expected_covered
+        )
+        if stored:
+            logger.debug("Saved summary for session %s (covers %s messages)", session_id, covered)
+        return stored
+
+    async def clear_history(self, session_id: str) -> None:
+        """
+        Clear conversation history for a session.
+
+        Args:
+            session_id: Unique session identifier
+        """
+        await self._run(self._delete_session, session_id)
+        logger.info("Cleared history for session %s", session_id)
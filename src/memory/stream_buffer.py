@@ -0,0 +1,229 @@
+"""Redis Stream buffer of generated replies, for resuming dropped SSE streams."""
+
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.memory.sharding import RedisShardRouter
+
+logger = get_logger("memory.stream_buffer")
+
+# Event kinds that end a stream
+TERMINAL_EVENTS = ("done", "error")
+
+
+def parse_event_id(event_id: str) -> Optional[Tuple[str, int]]:
+    """
+    Split an SSE event ID ("<stream ID>:<sequence number>") into its parts.
+
+    Args:
+        event_id: Event ID, e.g. from a Last-Event-ID header
+
+    Returns:
+        Tuple of (stream ID, sequence number), or None if malformed
+    """
+    stream_id, _, seq = event_id.rpartition(":")
+    if not stream_id or not seq.isdigit():
+        return None
+    return stream_id, int(seq)
+
+
+class StreamWriter:
+    """
+    Appends the events of one reply to its Redis Stream.
+
+    Events are numbered locally, so callers get an event ID without waiting
+    for Redis. A background task writes them in order, batching whatever
+    accumulated during the previous write into one pipeline.
+    """
+
+    def __init__(self, client, key: str, ttl_seconds: int):
+        """
+        Initialize the writer.
+
+        Args:
+            client: Redis client of the shard owning the stream
+            key: Stream key
+            ttl_seconds: Seconds the stream is kept after its last write
+        """
+        self.client = client
+        self.key = key
+        self.ttl_seconds = ttl_seconds
+        self.seq = 0
+        self._pending: List[Tuple[int, Dict[str, str]]] = []
+        self._wake = asyncio.Event()
+        self._closed = False
+        self._task = asyncio.create_task(self._flush_loop())
+
+    def append(self, kind: str, data: Optional[str] = None) -> int:
+        """
+        Queue an event for writing.
+
+        Args:
+            kind: Event kind ('start', 'chunk', 'done' or 'error')
+            data: Event payload
+
+        Returns:
+            int: Sequence number of the event (its stream entry is ``0-<seq>``)
+        """
+        self.seq += 1
+        self._pending.append((self.seq, {"t": kind, "d": data or ""}))
+        self._wake.set()
+        return self.seq
+
+    async def _flush_loop(self) -> None:
+        """Write queued events in order until closed."""
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            batch, self._pending = self._pending, []
+            if batch:
+                pipe = self.client.pipeline(transaction=False)
+                for seq, fields in batch:
+                    pipe.xadd(self.key, fields, id=f"0-{seq}")
+                pipe.expire(self.key, self.ttl_seconds)
+                try:
+                    await pipe.execute()
+                except Exception as e:
+                    # Buffering is best effort; the live response is unaffected
+                    logger.warning("Failed to buffer %s stream event(s) for %s: %s", len(batch), self.key, e)
+            if self._closed and not self._pending:
+                return
+
+    async def close(self) -> None:
+        """Flush queued events and stop the writer."""
+        self._closed = True
+        self._wake.set()
+        await self._task
+
+
+class RedisStreamBuffer:
+    """
+    Buffers generated replies in short-lived Redis Streams.
+
+    Each reply gets a stream keyed by its stream ID. The first entry records
+    the owning session, followed by 'chunk' events and one terminal 'done'
+    or 'error' event. Any replica can replay a stream and follow its live
+    tail, so a client that lost its connection resumes without a new LLM call.
+    """
+
+    def __init__(self, shards: Optional[RedisShardRouter] = None):
+        """
+        Initialize the buffer.
+
+        Args:
+            shards: Redis shards to store streams on (connects from settings if None)
+        """
+        self.shards = shards
+
+    async def connect(self):
+        """Connect to the configured Redis shards."""
+        if self.shards is None:
+            self.shards = await RedisShardRouter.from_settings()
+
+    async def disconnect(self):
+        """Close Redis connections."""
+        if self.shards is not None:
+            await self.shards.close()
+            self.shards = None
+
+    async def _client(self, stream_id: str):
+        """Return the client of the shard owning a stream, connecting if needed."""
+        if self.shards is None:
+            await self.connect()
+        return self.shards.client_for(stream_id)
+
+    def _get_key(self, stream_id: str) -> str:
+        """Get Redis key for a reply stream."""
+        return f"chat:stream:{self.shards.key_tag(stream_id)}"
+
+    def _get_resumed_key(self, stream_id: str) -> str:
+        """Get Redis key flagging that a client resumed a stream."""
+        return f"chat:stream:{self.shards.key_tag(stream_id)}:resumed"
+
+    async def open(self, stream_id: str, session_id: str) -> StreamWriter:
+        """
+        Start buffering a reply.
+
+        Args:
+            stream_id: Unique stream identifier (the request ID)
+            session_id: Session the reply belongs to
+
+        Returns:
+            StreamWriter: Writer for the reply's events
+        """
+        client = await self._client(stream_id)
+        writer = StreamWriter(client, self._get_key(stream_id), settings.stream_buffer_ttl_seconds)
+        writer.append("start", session_id)
+        return writer
+
+    async def get_session(self, stream_id: str) -> Optional[str]:
+        """
+        Return the session a buffered stream belongs to.
+
+        Args:
+            stream_id: Unique stream identifier
+
+        Returns:
+            Session ID, or None if the stream does not exist or has expired
+        """
+        client = await self._client(stream_id)
+        entries = await client.xrange(self._get_key(stream_id), min="0-1", max="0-1")
+        if not entries:
+            return None
+        return entries[0][1][b"d"].decode("utf-8")
+
+    async def mark_resumed(self, stream_id: str) -> None:
+        """Record that a client resumed a stream, so its generation is kept alive."""
+        client = await self._client(stream_id)
+        await client.set(self._get_resumed_key(stream_id), 1, ex=settings.stream_buffer_ttl_seconds)
+
+    async def is_resumed(self, stream_id: str) -> bool:
+        """Return True if a client resumed the stream."""
+        client = await self._client(stream_id)
+        return bool(await client.exists(self._get_resumed_key(stream_id)))
+
+    async def read(
+        self,
+        stream_id: str,
+        after: int = 0
+    ) -> AsyncIterator[Tuple[int, str, str]]:
+        """
+        Replay a stream after an event, then follow its live tail.
+
+        Stops after the terminal event. If no event arrives for
+        ``stream_resume_idle_timeout_seconds`` (the producing replica died),
+        yields an 'error' event and stops.
+
+        Args:
+            stream_id: Unique stream identifier
+            after: Sequence number of the last event the client received
+
+        Yields:
+            Tuple of (sequence number, event kind, data)
+        """
+        client = await self._client(stream_id)
+        key = self._get_key(stream_id)
+        last_id = f"0-{after}"
+        block_ms = int(settings.stream_resume_idle_timeout_seconds * 1000)
+
+        while True:
+            result = await client.xread({key: last_id}, block=block_ms)
+            if not result:
+                yield 0, "error", "Stream interrupted"
+                return
+
+            for entry_id, fields in result[0][1]:
+                last_id = entry_id
+                kind = fields[b"t"].decode("utf-8")
+                if kind == "start":
+                    continue
+                seq = int(entry_id.split(b"-")[1])
+                yield seq, kind, fields[b"d"].decode("utf-8")
+                if kind in TERMINAL_EVENTS:
+                    return
+
+
+# Buffers replies in Redis so dropped clients can resume (None = disabled)
+stream_buffer = RedisStreamBuffer() if settings.stream_resume_enabled else None
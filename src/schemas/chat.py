@@ -1,7 +1,10 @@
 """Chat API request and response schemas."""
 
+from typing import List, Optional
 from pydantic import BaseModel, Field, field_validator
 
+from src.memory.pruning import available_pruning_strategies
+
 
 class ChatRequest(BaseModel):
     """Request schema for chat endpoint."""
@@ -22,6 +25,12 @@ class ChatRequest(BaseModel):
         examples=["Hello! Can you help me understand FastAPI?"]
     )
     
+    pruning_strategy: Optional[str] = Field(
+        default=None,
+        description="History pruning strategy for this request (uses server default if omitted)",
+        examples=["token_window", "newest_n", "first_turn_plus_tail"]
+    )
+    
     @field_validator("session_id")
     @classmethod
     def validate_session_id(cls, v: str) -> str:
@@ -31,6 +40,16 @@ class ChatRequest(BaseModel):
             raise ValueError("session_id must contain only alphanumeric characters, hyphens, and underscores")
         return v
     
+    @field_validator("pruning_strategy")
+    @classmethod
+    def validate_pruning_strategy(cls, v: Optional[str]) -> Optional[str]:
+        """Validate that the pruning strategy is registered."""
+        if v is not None and v not in available_pruning_strategies():
+            raise ValueError(
+                f"pruning_strategy must be one of: {', '.join(available_pruning_strategies())}"
+            )
+        return v
+    
     model_config = {
         "json_schema_extra": {
             "examples": [
@@ -61,6 +80,39 @@ class ChatResponse(BaseModel):
     }
 
 
+class ChatBatchRequest(BaseModel):
+    """Request schema for the batch chat endpoint."""
+    
+    items: List[ChatRequest] = Field(
+        ...,
+        description="Independent chat turns; turns for the same session run in order",
+        min_length=1,
+        max_length=1000
+    )
+    
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "items": [
+                        {"session_id": "eval-1", "message": "Summarize FastAPI in one line."},
+                        {"session_id": "eval-2", "message": "What is Redis?"}
+                    ]
+                }
+            ]
+        }
+    }
+
+
+class ChatBatchResult(BaseModel):
+    """One NDJSON line of a batch chat response."""
+    
+    index: int = Field(..., description="Position of the item in the request")
+    session_id: str = Field(..., description="Session identifier")
+    response: Optional[str] = Field(default=None, description="Chatbot response (absent on failure)")
+    error: Optional[str] = Field(default=None, description="Error message (absent on success)")
+
+
 class HealthResponse(BaseModel):
     """Health check response schema."""
     
@@ -0,0 +1,23 @@
+"""Shared fixtures: an isolated fakeredis server per test."""
+
+import os
+
+# Settings require an API key at import time; tests never call Gemini
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+import fakeredis
+import pytest
+
+from src.memory.sharding import RedisShardRouter
+
+
+@pytest.fixture
+def redis_client() -> fakeredis.FakeAsyncRedis:
+    """Client of a fresh in-memory Redis server."""
+    return fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+
+
+@pytest.fixture
+def redis_shards(redis_client: fakeredis.FakeAsyncRedis) -> RedisShardRouter:
+    """Shard router with the fake server as its only shard."""
+    return RedisShardRouter({"test": redis_client})
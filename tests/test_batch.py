@@ -0,0 +1,114 @@
+"""Batch chat turns: every item reported once, sessions in order."""
+
+import asyncio
+import json
+from typing import Dict, List
+
+import pytest
+
+from src.api import chat
+from src.core.config import settings
+from src.llm.fake_client import FakeLLMClient
+from src.memory.inprocess_memory import InProcessConversationMemory
+from src.schemas.chat import ChatRequest
+
+pytestmark = pytest.mark.asyncio
+
+
+class FailingOnRequestClient(FakeLLMClient):
+    """Fake client failing turns whose message is 'fail'."""
+
+    async def generate(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        if messages[-1]["content"] == "fail":
+            raise RuntimeError("LLM unavailable")
+        return await super().generate(messages, **kwargs)
+
+
+class RecordingCompactor:
+    """Compactor that takes a while and records the sessions it compacted."""
+
+    def __init__(self):
+        self.compacted: List[str] = []
+
+    async def maybe_compact(self, session_id: str) -> bool:
+        await asyncio.sleep(0.05)
+        self.compacted.append(session_id)
+        return False
+
+
+@pytest.fixture
+def memory(monkeypatch) -> InProcessConversationMemory:
+    """Run batch turns on in-process memory and a fast fake LLM."""
+    memory = InProcessConversationMemory()
+    client = FailingOnRequestClient(reply_tokens=3, first_token_delay=0.001, token_delay=0.0)
+    monkeypatch.setattr(chat, "memory", memory)
+    monkeypatch.setattr(chat, "llm_client", client)
+    return memory
+
+
+@pytest.fixture
+def compactor(monkeypatch) -> RecordingCompactor:
+    """Record compaction instead of summarizing."""
+    compactor = RecordingCompactor()
+    monkeypatch.setattr(chat, "compactor", compactor)
+    return compactor
+
+
+async def run_batch(items: List[ChatRequest]) -> List[dict]:
+    """Run a batch to completion and parse its NDJSON lines."""
+    return [json.loads(line) async for line in chat.generate_batch_results(items)]
+
+
+def items(*pairs) -> List[ChatRequest]:
+    """Build batch items from (session, message) pairs."""
+    return [ChatRequest(session_id=session_id, message=message) for session_id, message in pairs]
+
+
+async def test_reports_every_item_once_in_session_order(memory):
+    batch = items(*[(f"s{index % 3}", f"message {index}") for index in range(12)])
+
+    results = await run_batch(batch)
+
+    assert sorted(result["index"] for result in results) == list(range(12))
+    for session_id in ("s0", "s1", "s2"):
+        indices = [result["index"] for result in results if result["session_id"] == session_id]
+        assert indices == sorted(indices)
+        history = await memory.get_history(session_id)
+        assert [msg["content"] for msg in history if msg["role"] == "user"] == [
+            batch[index].message for index in indices
+        ]
+
+
+async def test_failing_item_does_not_fail_batch(memory):
+    results = await run_batch(items(("s1", "first"), ("s1", "fail"), ("s1", "third"), ("s2", "other")))
+
+    by_index = {result["index"]: result for result in results}
+    assert sorted(by_index) == [0, 1, 2, 3]
+    assert "error" in by_index[1] and "response" not in by_index[1]
+    assert all("response" in by_index[index] for index in (0, 2, 3))
+
+
+async def test_failing_session_reports_its_items(memory, monkeypatch):
+    set_tenant = chat._set_tenant
+
+    def fail_for_broken(session_id, api_key):
+        if session_id == "broken":
+            raise RuntimeError("no tenant")
+        set_tenant(session_id, api_key)
+
+    monkeypatch.setattr(chat, "_set_tenant", fail_for_broken)
+
+    results = await asyncio.wait_for(run_batch(items(("broken", "a"), ("ok", "b"), ("broken", "c"))), 5)
+
+    by_index = {result["index"]: result for result in results}
+    assert sorted(by_index) == [0, 1, 2]
+    assert by_index[0]["error"] == by_index[2]["error"] == "no tenant"
+    assert "response" in by_index[1]
+
+
+async def test_compacts_every_session(memory, compactor, monkeypatch):
+    monkeypatch.setattr(settings, "summarization_enabled", True)
+
+    await run_batch(items(("s1", "a"), ("s2", "b"), ("s1", "c"), ("s3", "d")))
+
+    assert sorted(compactor.compacted) == ["s1", "s2", "s3"]
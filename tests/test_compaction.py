@@ -0,0 +1,105 @@
+"""Rolling summarization of long conversations."""
+
+from typing import AsyncIterator, Dict, List
+
+import pytest
+
+from src.core.config import settings
+from src.llm.base import BaseLLMClient
+from src.memory.compaction import ConversationCompactor
+from src.memory.inprocess_memory import InProcessConversationMemory
+
+pytestmark = pytest.mark.asyncio
+
+SESSION = "session-1"
+SYSTEM_PROMPT = {"role": "system", "content": "You are a terse assistant."}
+SUMMARY = "The user asked about many topics."
+
+
+class FakeSummarizer(BaseLLMClient):
+    """Replies with a fixed summary and records the prompts it was given."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.prompts: List[List[Dict[str, str]]] = []
+
+    async def generate_stream(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        self.prompts.append(messages)
+        if self.fail:
+            raise RuntimeError("LLM unavailable")
+        yield SUMMARY
+
+
+def turns(count: int) -> List[Dict[str, str]]:
+    """Build ``count`` user/assistant turns of a few dozen tokens each."""
+    messages = []
+    for index in range(count):
+        messages.append({"role": "user", "content": f"question {index} " + "about things " * 8})
+        messages.append({"role": "assistant", "content": f"answer {index} " + "with details " * 12})
+    return messages
+
+
+@pytest.fixture
+def memory(monkeypatch) -> InProcessConversationMemory:
+    """In-process memory with a history budget a dozen turns overflow."""
+    monkeypatch.setattr(settings, "max_history_tokens", 600)
+    monkeypatch.setattr(settings, "max_history_turns", 20)
+    return InProcessConversationMemory()
+
+
+async def store(memory: InProcessConversationMemory, messages: List[Dict[str, str]]) -> None:
+    """Append the conversation to the session."""
+    await memory.add_messages(SESSION, [(msg["role"], msg["content"]) for msg in messages])
+
+
+async def test_summary_replaces_compacted_prefix(memory):
+    conversation = [SYSTEM_PROMPT] + turns(12)
+    await store(memory, conversation)
+    client = FakeSummarizer()
+    compactor = ConversationCompactor(memory, client, max_summary_tokens=100)
+
+    assert await compactor.maybe_compact(SESSION)
+
+    summary, pending, covered = await memory.get_compaction_state(SESSION)
+    tail = conversation[covered:]
+    assert summary["content"] == SUMMARY
+    assert summary["covered"] == covered
+    assert [{"role": msg["role"], "content": msg["content"]} for msg in pending] == tail
+    assert tail[0]["role"] == "user"
+    # The folded turns went to the summarizer, the kept ones did not
+    transcript = client.prompts[0][-1]["content"]
+    assert conversation[1]["content"] in transcript
+    assert tail[0]["content"] not in transcript
+
+    history = await memory.get_history(SESSION)
+    assert history == [
+        SYSTEM_PROMPT,
+        {"role": "system", "content": f"Summary of the earlier conversation:\n{SUMMARY}"},
+        *tail,
+    ]
+
+
+async def test_no_compaction_below_threshold(memory):
+    conversation = [SYSTEM_PROMPT] + turns(2)
+    await store(memory, conversation)
+    client = FakeSummarizer()
+    compactor = ConversationCompactor(memory, client, max_summary_tokens=100)
+
+    assert not await compactor.maybe_compact(SESSION)
+
+    assert client.prompts == []
+    assert (await memory.get_compaction_state(SESSION))[0] is None
+    assert await memory.get_history(SESSION) == conversation
+
+
+async def test_llm_failure_leaves_history_unchanged(memory):
+    await store(memory, [SYSTEM_PROMPT] + turns(12))
+    before = await memory.get_history(SESSION)
+    client = FakeSummarizer(fail=True)
+    compactor = ConversationCompactor(memory, client, max_summary_tokens=100)
+
+    assert not await compactor.maybe_compact(SESSION)
+
+    assert len(client.prompts) == 1
+    assert (await memory.get_compaction_state(SESSION))[0] is None
+    assert await memory.get_history(SESSION) == before
@@ -0,0 +1,152 @@
+"""Pruning strategies keep what the original history pruning kept."""
+
+import itertools
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from src.memory.pruning import (
+    CallableStrategy, FirstTurnPlusTailStrategy, NewestNStrategy, TokenWindowStrategy
+)
+
+Message = Dict[str, Any]
+
+_ids = itertools.count()
+
+
+def count_tokens(msg: Message) -> int:
+    """Token count stored with the message."""
+    return msg["tokens"]
+
+
+def legacy_prune(
+    messages: List[Message],
+    count_tokens=count_tokens,
+    max_tokens: Optional[int] = None,
+    max_turns: Optional[int] = None
+) -> List[Message]:
+    """
+    ``RedisConversationMemory._prune_messages`` from before pruning strategies.
+
+    Kept verbatim (apart from taking the token counter as an argument) as
+    the reference the strategies are checked against.
+    """
+    if not messages:
+        return messages
+
+    # Separate system messages from conversation
+    system_messages = [msg for msg in messages if msg.get("role") == "system"]
+    conversation_messages = [msg for msg in messages if msg.get("role") != "system"]
+
+    # Apply turn limit if specified
+    if max_turns and len(conversation_messages) > max_turns * 2:
+        # Each turn = 1 user + 1 assistant message
+        conversation_messages = conversation_messages[-(max_turns * 2):]
+
+    # Apply token limit if specified
+    if max_tokens:
+        current_tokens = sum(count_tokens(msg) for msg in system_messages + conversation_messages)
+
+        while current_tokens > max_tokens and conversation_messages:
+            # Remove oldest conversation message
+            removed = conversation_messages.pop(0)
+            current_tokens -= count_tokens(removed)
+
+    # Reconstruct with system messages first
+    return system_messages + conversation_messages
+
+
+def message(role: str, tokens: int) -> Message:
+    """Build a uniquely worded message with a token count."""
+    return {"role": role, "content": f"{role} message {next(_ids)}", "tokens": tokens}
+
+
+def turns(count: int, user_tokens: int = 12, assistant_tokens: int = 30) -> List[Message]:
+    """Build user/assistant turns whose sizes vary a little."""
+    messages = []
+    for index in range(count):
+        messages.append(message("user", user_tokens + index % 3))
+        messages.append(message("assistant", assistant_tokens + index % 5))
+    return messages
+
+
+HISTORIES = {
+    "empty": [],
+    "no_system": turns(5),
+    "system_first": [message("system", 20)] + turns(8),
+    "system_interleaved": [message("system", 20)] + turns(3) + [message("system", 15)] + turns(4),
+    "starts_with_assistant": [message("assistant", 25)] + turns(4),
+    "over_budget": [message("system", 10)] + turns(30, 40, 90),
+    "system_over_budget": [message("system", 500)] + turns(3),
+}
+
+# (max_tokens, max_turns)
+LIMITS = [(None, None), (150, None), (None, 3), (150, 3), (1000, 2), (100, 20)]
+
+CASES = pytest.mark.parametrize(
+    "history, limits",
+    [(HISTORIES[name], limits) for name in HISTORIES for limits in LIMITS],
+    ids=[f"{name}-{limits[0]}-{limits[1]}" for name in HISTORIES for limits in LIMITS]
+)
+
+
+def pin_first_turn(messages: List[Message], max_tokens: Optional[int], max_turns: Optional[int]) -> List[Message]:
+    """Expected first-turn-plus-tail result: the first turn, then the legacy pruning of the rest."""
+    system = [msg for msg in messages if msg["role"] == "system"]
+    conversation = [msg for msg in messages if msg["role"] != "system"]
+    first_user = next((i for i, msg in enumerate(conversation) if msg["role"] == "user"), None)
+    if first_user is None:
+        return legacy_prune(messages, count_tokens, max_tokens, max_turns)
+
+    head = conversation[first_user:first_user + 2]
+    head_tokens = sum(count_tokens(msg) for msg in system + head)
+    if (max_tokens and head_tokens > max_tokens) or (max_turns and max_turns < 1):
+        # The first turn does not fit: plain token window
+        return legacy_prune(messages, count_tokens, max_tokens, max_turns)
+
+    rest = legacy_prune(
+        system + conversation[first_user + 2:],
+        count_tokens,
+        max_tokens - sum(count_tokens(msg) for msg in head) if max_tokens else None,
+        max_turns - 1 if max_turns else None
+    )
+    return system + head + rest[len(system):]
+
+
+@CASES
+def test_token_window_matches_legacy(history, limits):
+    expected = legacy_prune(list(history), count_tokens, *limits)
+
+    assert TokenWindowStrategy().prune(list(history), count_tokens, *limits) == expected
+
+
+@CASES
+def test_newest_n_matches_legacy_turn_limit(history, limits):
+    max_tokens, max_turns = limits
+    expected = legacy_prune(list(history), count_tokens, None, max_turns)
+
+    assert NewestNStrategy().prune(list(history), count_tokens, max_tokens, max_turns) == expected
+
+
+@CASES
+def test_first_turn_plus_tail_matches_legacy(history, limits):
+    expected = pin_first_turn(list(history), *limits)
+
+    assert FirstTurnPlusTailStrategy().prune(list(history), count_tokens, *limits) == expected
+
+
+@CASES
+def test_callable_strategy_matches_legacy(history, limits):
+    expected = legacy_prune(list(history), count_tokens, *limits)
+
+    assert CallableStrategy(legacy_prune).prune(list(history), count_tokens, *limits) == expected
+
+
+def test_over_budget_history_is_pruned():
+    history = HISTORIES["over_budget"]
+
+    pruned = TokenWindowStrategy().prune(list(history), count_tokens, 1000, 20)
+
+    assert pruned[0]["role"] == "system"
+    assert 0 < len(pruned) < len(history)
+    assert sum(count_tokens(msg) for msg in pruned) <= 1000
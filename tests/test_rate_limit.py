@@ -0,0 +1,69 @@
+"""Token-bucket rate limiting through the Redis script."""
+
+import pytest
+
+from src.api import rate_limit
+from src.api.rate_limit import TOKEN_BUCKET_SCRIPT, RateLimiter
+from src.core.config import settings
+
+pytestmark = pytest.mark.asyncio
+
+
+class RedisMemory:
+    """Stands in for a Redis-backed conversation memory."""
+
+    def __init__(self, shards):
+        self.shards = shards
+
+    def redis_shards(self):
+        return self.shards
+
+
+@pytest.fixture
+def limiter(redis_shards, monkeypatch) -> RateLimiter:
+    """Limiter on the fake Redis with 3 requests per session and 4 per client."""
+    monkeypatch.setattr(rate_limit, "memory", RedisMemory(redis_shards))
+    monkeypatch.setattr(settings, "rate_limit_session_requests_per_minute", 3)
+    monkeypatch.setattr(settings, "rate_limit_session_tokens_per_minute", 0)
+    monkeypatch.setattr(settings, "rate_limit_client_requests_per_minute", 4)
+    monkeypatch.setattr(settings, "rate_limit_client_tokens_per_minute", 0)
+    return RateLimiter()
+
+
+async def tokens_left(redis_client, key: str) -> float:
+    """Return the tokens stored in a bucket."""
+    return float(await redis_client.hget(key, "tokens"))
+
+
+async def test_script_takes_from_all_buckets_or_none(redis_client):
+    script = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+    keys = ["bucket:a", "bucket:b"]
+    rate = 1 / 60000
+
+    # Capacity 10 and 2: a cost of 3 fits the first bucket only
+    allowed, wait = await script(keys=keys, args=[10, rate, 3, 2, rate, 3])
+    assert allowed == 0 and wait > 0
+    assert await redis_client.exists(*keys) == 0
+
+    allowed, _ = await script(keys=keys, args=[10, rate, 2, 2, rate, 2])
+    assert allowed == 1
+    assert await tokens_left(redis_client, "bucket:a") == pytest.approx(8, abs=0.01)
+    assert await tokens_left(redis_client, "bucket:b") == pytest.approx(0, abs=0.01)
+
+
+async def test_session_limit_holds_across_clients(limiter):
+    for client_id in ("client-a", "client-b", "client-c"):
+        assert await limiter.check(client_id, {"shared": (1, 10)}) == 0
+
+    assert await limiter.check("client-d", {"shared": (1, 10)}) > 0
+
+
+async def test_rejected_request_refunds_session_buckets(limiter, redis_client):
+    for index in range(4):
+        assert await limiter.check("client-a", {f"session-{index}": (1, 10)}) == 0
+
+    # The session bucket is charged first, then the client bucket rejects
+    assert await limiter.check("client-a", {"fresh": (1, 10)}) > 0
+
+    assert await tokens_left(redis_client, "ratelimit:session:fresh:requests") == pytest.approx(3, abs=0.01)
+    assert await tokens_left(redis_client, "ratelimit:client:client-a:requests") == pytest.approx(0, abs=0.01)
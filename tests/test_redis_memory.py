@@ -0,0 +1,100 @@
+"""Windowed and full history reads of the Redis memory agree."""
+
+import pytest
+
+from src.core.config import settings
+from src.memory.redis_memory import RedisConversationMemory
+
+pytestmark = pytest.mark.asyncio
+
+SESSION = "session-1"
+
+# (role, content) of a session whose system prompt is followed by a long chat
+CONVERSATION = [("system", "You are a terse assistant.")] + [
+    (role, f"{role} message {index} " + "word " * (index % 7 + 3))
+    for index in range(24)
+    for role in ("user", "assistant")
+]
+
+
+@pytest.fixture
+def memory(redis_shards, monkeypatch) -> RedisConversationMemory:
+    """Redis memory on the fake server, reading in small chunks."""
+    monkeypatch.setattr(settings, "history_read_chunk_size", 4)
+    memory = RedisConversationMemory()
+    memory.shards = redis_shards
+    return memory
+
+
+async def read_both(memory, monkeypatch, **limits):
+    """Return (windowed, full) history of the session."""
+    monkeypatch.setattr(settings, "history_read_mode", "windowed")
+    windowed = await memory.get_history(SESSION, **limits)
+    monkeypatch.setattr(settings, "history_read_mode", "full")
+    full = await memory.get_history(SESSION, **limits)
+    return windowed, full
+
+
+async def write_legacy_session(memory, redis_client, session_id: str = SESSION) -> None:
+    """Store the conversation the way it was stored before the system index."""
+    records = [memory.codec.encode(memory._build_message(role, content)) for role, content in CONVERSATION]
+    await redis_client.rpush(memory._get_key(session_id), *records)
+    await redis_client.expire(memory._get_key(session_id), settings.redis_ttl_seconds)
+
+
+@pytest.mark.parametrize("limits", [
+    {"max_tokens": 120, "max_turns": 20},
+    {"max_tokens": 10_000, "max_turns": 3},
+])
+async def test_legacy_session_keeps_system_prompt(memory, redis_client, monkeypatch, limits):
+    await write_legacy_session(memory, redis_client)
+
+    windowed, full = await read_both(memory, monkeypatch, **limits)
+
+    assert windowed == full
+    assert windowed[0] == {"role": "system", "content": "You are a terse assistant."}
+
+
+async def test_expired_index_keeps_system_prompt(memory, redis_client, monkeypatch):
+    await memory.add_messages(SESSION, CONVERSATION)
+    # The index outlived by the history, as before its TTL was refreshed on every append
+    await redis_client.delete(memory._get_system_key(SESSION), memory._get_system_marker_key(SESSION))
+
+    windowed, full = await read_both(memory, monkeypatch, max_tokens=120, max_turns=20)
+
+    assert windowed == full
+    assert windowed[0]["role"] == "system"
+
+
+async def test_legacy_session_append_returns_prior_history(memory, redis_client, monkeypatch):
+    await write_legacy_session(memory, redis_client, "windowed")
+    await write_legacy_session(memory, redis_client, "full")
+
+    monkeypatch.setattr(settings, "history_read_mode", "windowed")
+    windowed = await memory.get_history_and_append("windowed", "user", "new question", max_tokens=120)
+    monkeypatch.setattr(settings, "history_read_mode", "full")
+    full = await memory.get_history_and_append("full", "user", "new question", max_tokens=120)
+
+    assert windowed == full
+    assert windowed[0]["role"] == "system"
+    assert (await memory.get_history("windowed"))[-1] == {"role": "user", "content": "new question"}
+
+
+async def test_indexed_session_reads_window(memory, monkeypatch):
+    await memory.add_messages(SESSION, CONVERSATION)
+
+    windowed, full = await read_both(memory, monkeypatch, max_tokens=120, max_turns=20)
+
+    assert windowed == full
+    assert windowed[0]["role"] == "system"
+
+
+async def test_append_refreshes_index_ttl(memory, redis_client):
+    await memory.add_messages(SESSION, CONVERSATION[:3])
+    system_key = memory._get_system_key(SESSION)
+    await redis_client.expire(system_key, 5)
+
+    await memory.add_message(SESSION, "user", "still here")
+
+    assert await redis_client.ttl(system_key) > 5
+    assert await redis_client.ttl(memory._get_system_marker_key(SESSION)) > 5
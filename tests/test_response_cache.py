@@ -0,0 +1,86 @@
+"""Response cache hits, misses and the temperature bypass."""
+
+import asyncio
+from typing import Any, Dict
+
+import pytest
+
+from src.core.config import settings
+from src.llm.fake_client import FakeLLMClient
+from src.llm.response_cache import CachedLLMClient
+
+pytestmark = pytest.mark.asyncio
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+class SampledFakeClient(FakeLLMClient):
+    """Fake client reporting a sampling temperature."""
+
+    def __init__(self, temperature: float):
+        super().__init__(reply_tokens=6, chunk_tokens=2, first_token_delay=0.0, token_delay=0.0)
+        self.temperature = temperature
+
+    def model_settings(self) -> Dict[str, Any]:
+        return {**super().model_settings(), "temperature": self.temperature}
+
+
+async def stream(cache: CachedLLMClient, messages=MESSAGES) -> str:
+    """Stream a reply and wait for it to be stored."""
+    reply = "".join([chunk async for chunk in cache.generate_stream(messages)])
+    await asyncio.gather(*cache._pending)
+    return reply
+
+
+@pytest.fixture
+def cache_limit(monkeypatch):
+    """Cache requests sampled at up to 0.2."""
+    monkeypatch.setattr(settings, "response_cache_max_temperature", 0.2)
+
+
+async def test_repeated_request_hits(redis_shards, cache_limit):
+    inner = SampledFakeClient(temperature=0.0)
+    cache = CachedLLMClient(inner, redis_shards)
+
+    first = await stream(cache)
+    second = await stream(cache)
+
+    assert second == first
+    assert inner.calls == 1
+    assert (cache.misses, cache.local_hits) == (1, 1)
+
+    # A new replica (empty local tier) hits in Redis
+    other_replica = CachedLLMClient(inner, redis_shards)
+    assert await other_replica.generate(MESSAGES) == first
+    assert (other_replica.redis_hits, inner.calls) == (1, 1)
+
+
+async def test_different_conversation_misses(redis_shards, cache_limit):
+    inner = SampledFakeClient(temperature=0.0)
+    cache = CachedLLMClient(inner, redis_shards)
+
+    await stream(cache)
+    await stream(cache, [{"role": "user", "content": "something else"}])
+
+    assert inner.calls == 2
+    assert cache.misses == 2
+
+
+async def test_sampled_requests_bypass_cache(redis_shards, redis_client, cache_limit):
+    inner = SampledFakeClient(temperature=0.7)
+    cache = CachedLLMClient(inner, redis_shards)
+
+    await stream(cache)
+    await stream(cache)
+    await cache.generate(MESSAGES)
+
+    assert inner.calls == 3
+    assert cache.bypassed == 3
+    assert (cache.misses, cache.stores, len(cache.local)) == (0, 0, 0)
+    assert await redis_client.keys("llm:cache:*") == []
+
+    # An explicit temperature within the limit is cached again
+    await cache.generate(MESSAGES, temperature=0.0)
+    await asyncio.gather(*cache._pending)
+    await cache.generate(MESSAGES, temperature=0.0)
+    assert inner.calls == 4
@@ -0,0 +1,114 @@
+"""Latency-aware routing and circuit breaking across LLM backends."""
+
+import asyncio
+import random
+
+import pytest
+
+from src.core.config import settings
+from src.llm.fake_client import FakeLLMClient
+from src.llm.router import CLOSED, HALF_OPEN, OPEN, RoutedLLMClient
+
+pytestmark = pytest.mark.asyncio
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+def fake(first_token_delay: float, error_rate: float = 0.0) -> FakeLLMClient:
+    """Fake backend answering after a fixed time to first token."""
+    return FakeLLMClient(
+        reply_tokens=2, chunk_tokens=2, first_token_delay=first_token_delay,
+        token_delay=0.0, error_rate=error_rate, midstream_error_rate=0.0
+    )
+
+
+def backend(router: RoutedLLMClient, name: str):
+    """Return the router's state of a backend."""
+    return next(backend for backend in router.backends if backend.name == name)
+
+
+async def complete(router: RoutedLLMClient, calls: int) -> None:
+    """Stream ``calls`` replies one after the other."""
+    for _ in range(calls):
+        reply = "".join([chunk async for chunk in router.generate_stream(MESSAGES)])
+        assert reply
+
+
+@pytest.fixture(autouse=True)
+def seeded_random():
+    """Make the router's sampling reproducible."""
+    random.seed(0)
+
+
+async def test_prefers_backend_with_lower_ttft():
+    router = RoutedLLMClient({
+        "fast": fake(0.001),
+        "medium": fake(0.01),
+        "slow": fake(0.03),
+    })
+
+    await complete(router, 60)
+
+    fast, medium, slow = (backend(router, name) for name in ("fast", "medium", "slow"))
+    assert fast.ttft < medium.ttft < slow.ttft
+    # Each pick compares two backends, so the slowest one loses every
+    # comparison once measured and the fastest wins all it takes part in
+    assert slow.requests <= 2
+    assert fast.requests > medium.requests > slow.requests
+
+
+async def test_ejects_failing_backend(monkeypatch):
+    monkeypatch.setattr(settings, "llm_router_failure_threshold", 3)
+    monkeypatch.setattr(settings, "llm_router_open_seconds", 60.0)
+    router = RoutedLLMClient({"flaky": fake(0.0, error_rate=1.0), "healthy": fake(0.002)})
+    flaky = backend(router, "flaky")
+
+    # Calls to the failing backend fail over, so every call succeeds
+    for _ in range(50):
+        await complete(router, 1)
+        if flaky.state == OPEN:
+            break
+    assert flaky.state == OPEN
+    assert flaky.ejections == 1
+    assert flaky.requests == flaky.errors == 3
+    assert router.failovers == 3
+
+    await complete(router, 20)
+    assert flaky.requests == 3
+
+
+async def test_recovered_backend_ramps_back_in(monkeypatch):
+    monkeypatch.setattr(settings, "llm_router_failure_threshold", 1)
+    monkeypatch.setattr(settings, "llm_router_open_seconds", 0.05)
+    monkeypatch.setattr(settings, "llm_router_ramp_seconds", 100.0)
+    router = RoutedLLMClient({"flaky": fake(0.0, error_rate=1.0), "healthy": fake(0.002)})
+    flaky = backend(router, "flaky")
+
+    while flaky.state != OPEN:
+        await complete(router, 1)
+    flaky.client.error_rate = 0.0
+
+    # Still ejected until the cooldown has passed
+    requests = flaky.requests
+    await complete(router, 5)
+    assert flaky.requests == requests
+
+    # One probe call closes the circuit again
+    await asyncio.sleep(settings.llm_router_open_seconds)
+    while flaky.state != CLOSED:
+        await complete(router, 1)
+        assert flaky.state in (HALF_OPEN, CLOSED)
+    assert flaky.readmitted_at is not None
+
+    # At the start of the ramp the (faster) backend gets a small share ...
+    requests = flaky.requests
+    await complete(router, 100)
+    early_share = (flaky.requests - requests) / 100
+    assert 0.02 <= early_share <= 0.3
+
+    # ... and once the ramp has passed, all the traffic it wins on latency
+    flaky.readmitted_at -= settings.llm_router_ramp_seconds
+    requests = flaky.requests
+    await complete(router, 50)
+    assert flaky.readmitted_at is None
+    assert flaky.requests - requests >= 45
@@ -0,0 +1,93 @@
+"""Distributed session leases against Redis."""
+
+import asyncio
+
+import pytest
+
+from src.core.config import settings
+from src.memory.redis_memory import RedisConversationMemory
+from src.memory.session_lock import SessionBusy, SessionLeaseLost, SessionLockManager
+from src.memory.sharding import RedisShardRouter
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def lease_seconds(monkeypatch) -> float:
+    """Short leases, so renewal is exercised within the test."""
+    monkeypatch.setattr(settings, "session_lock_lease_seconds", 0.3)
+    return 0.3
+
+
+async def test_acquire_renew_release(redis_shards, redis_client, lease_seconds, monkeypatch):
+    async def from_settings():
+        return redis_shards
+
+    # Not connected up front: the first acquire connects
+    monkeypatch.setattr(RedisShardRouter, "from_settings", from_settings)
+    manager = SessionLockManager(distributed=True)
+    other_replica = SessionLockManager(redis_shards, distributed=True)
+
+    lease = await manager.acquire("s1")
+    key = manager._get_key("s1")
+    assert lease.fence == 1
+    assert int(await redis_client.get(key)) == lease.fence
+
+    # Held past its original expiry because it is renewed
+    await asyncio.sleep(lease_seconds * 2)
+    assert int(await redis_client.get(key)) == lease.fence
+    assert not lease.lost
+    with pytest.raises(SessionBusy):
+        await other_replica.acquire("s1", timeout=0.1)
+
+    await lease.release()
+    assert await redis_client.get(key) is None
+
+    taken_over = await other_replica.acquire("s1", timeout=0)
+    assert taken_over.fence == 2
+    await taken_over.release()
+
+
+async def test_expired_lease_is_lost(redis_shards, redis_client, lease_seconds):
+    manager = SessionLockManager(redis_shards, distributed=True)
+    lease = await manager.acquire("s1")
+    # Another holder takes over while this one is paused
+    await redis_client.set(manager._get_key("s1"), lease.fence + 1)
+
+    await asyncio.sleep(lease_seconds)
+
+    assert lease.lost
+    await lease.release()
+    # The new holder's lease is left alone
+    assert int(await redis_client.get(manager._get_key("s1"))) == lease.fence + 1
+
+
+@pytest.mark.parametrize("history_read_mode", ["windowed", "full"])
+async def test_superseded_holder_cannot_write(redis_shards, redis_client, monkeypatch, history_read_mode):
+    monkeypatch.setattr(settings, "history_read_mode", history_read_mode)
+    manager = SessionLockManager(redis_shards, distributed=True)
+    other_replica = SessionLockManager(redis_shards, distributed=True)
+    memory = RedisConversationMemory()
+    memory.shards = redis_shards
+
+    lease = await manager.acquire("s1")
+    await memory.get_history_and_append("s1", "user", "hello", fence=lease.fence)
+    await memory.add_message("s1", "assistant", "hi", lease.fence)
+
+    # The lease expires during a pause and another replica takes the session
+    await redis_client.delete(manager._get_key("s1"))
+    taken_over = await other_replica.acquire("s1")
+
+    with pytest.raises(SessionLeaseLost):
+        await memory.add_message("s1", "assistant", "stale reply", lease.fence)
+    with pytest.raises(SessionLeaseLost):
+        await memory.get_history_and_append("s1", "user", "stale question", fence=lease.fence)
+    assert await memory.get_history("s1") == [
+        {"role": "user", "content": "hello"},
+        {"role": "assistant", "content": "hi"},
+    ]
+
+    await memory.add_message("s1", "user", "new holder", taken_over.fence)
+    assert (await memory.get_history("s1"))[-1]["content"] == "new holder"
+    await taken_over.release()
+    await lease.release()
@@ -0,0 +1,55 @@
+"""Resuming a buffered reply stream from Last-Event-ID."""
+
+import asyncio
+
+import pytest
+
+from src.core.config import settings
+from src.memory.stream_buffer import RedisStreamBuffer, parse_event_id
+
+pytestmark = pytest.mark.asyncio
+
+CHUNKS = [f"chunk {index} " for index in range(20)]
+
+
+async def produce(buffer: RedisStreamBuffer, stream_id: str) -> None:
+    """Buffer a reply chunk by chunk, as a live response does."""
+    writer = await buffer.open(stream_id, "session-1")
+    for chunk in CHUNKS:
+        writer.append("chunk", chunk)
+        await asyncio.sleep(0.005)
+    writer.append("done")
+    await writer.close()
+
+
+async def test_resume_after_disconnect_loses_and_repeats_nothing(redis_shards, monkeypatch):
+    monkeypatch.setattr(settings, "stream_resume_idle_timeout_seconds", 2.0)
+    buffer = RedisStreamBuffer(redis_shards)
+    producer = asyncio.create_task(produce(buffer, "request-1"))
+
+    # The client follows the live stream, then its connection drops
+    received = []
+    async for seq, kind, data in buffer.read("request-1"):
+        received.append((seq, kind, data))
+        if len(received) == 5:
+            break
+    last_event_id = f"request-1:{received[-1][0]}"
+
+    # It reconnects while the reply is still being generated
+    stream_id, last_seq = parse_event_id(last_event_id)
+    assert await buffer.get_session(stream_id) == "session-1"
+    async for event in buffer.read(stream_id, last_seq):
+        received.append(event)
+    await producer
+
+    seqs = [seq for seq, _, _ in received]
+    assert seqs == list(range(seqs[0], seqs[0] + len(CHUNKS) + 1))
+    assert [data for _, kind, data in received if kind == "chunk"] == CHUNKS
+    assert received[-1][1] == "done"
+
+
+async def test_unknown_stream_has_no_session(redis_shards):
+    buffer = RedisStreamBuffer(redis_shards)
+
+    assert await buffer.get_session("missing") is None
+    assert parse_event_id("no-sequence") is None